@@ -0,0 +1,310 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from datetime import datetime
+
+from labman.db import base
+from labman.db.sql_connection import TRN
+from labman.db.user import User
+from labman.db.study import Study
+from labman.db.plate import PlateConfiguration
+from labman.db.process import SamplePlatingProcess
+from labman.benchmark import workflows
+
+
+def check_test_environment():
+    """Makes sure that the database is a test database
+
+    Raises
+    ------
+    RuntimeError
+        If the database is a production database
+    """
+    with TRN:
+        TRN.add("SELECT test FROM settings")
+        if not TRN.execute_fetchlast():
+            raise RuntimeError(
+                "Working on a production environment. Not generating the "
+                "benchmark dataset to protect the production database.")
+
+
+def create_studies(num_studies, tag, template_study_id=1):
+    """Creates studies copying the information of an existing study
+
+    Parameters
+    ----------
+    num_studies : int
+        The number of studies to create
+    tag : str
+        Tag added to the study titles, to make them unique
+    template_study_id : int, optional
+        The study to copy the information from. Default: 1
+
+    Returns
+    -------
+    list of int
+        The ids of the new studies
+    """
+    with TRN:
+        # Qiita owns the study table, so copy all the columns of an existing
+        # study instead of hardcoding them
+        sql = """SELECT column_name
+                 FROM information_schema.columns
+                 WHERE table_schema = 'qiita' AND table_name = 'study'
+                    AND column_name != 'study_id'
+                 ORDER BY ordinal_position"""
+        TRN.add(sql)
+        columns = TRN.execute_fetchflatten()
+        overrides = {
+            'study_title': "'Benchmark study ' || g || ' ' || %(tag)s",
+            'study_alias': "'BENCH' || g",
+            'study_description': "'Benchmark study ' || g"}
+        values = [overrides.get(c, c) for c in columns]
+        sql = """INSERT INTO qiita.study ({})
+                 SELECT {}
+                 FROM qiita.study, generate_series(1, %(num)s) AS g
+                 WHERE study_id = %(template)s
+                 RETURNING study_id""".format(', '.join(columns),
+                                              ', '.join(values))
+        TRN.add(sql, {'tag': tag, 'num': num_studies,
+                      'template': template_study_id})
+        return sorted(TRN.execute_fetchflatten())
+
+
+def create_samples(study_ids, samples_per_study):
+    """Creates the samples of the studies
+
+    Parameters
+    ----------
+    study_ids : list of int
+        The studies
+    samples_per_study : int
+        The number of samples of each study
+
+    Returns
+    -------
+    list of str
+        The ids of the new samples
+    """
+    with TRN:
+        sql = """INSERT INTO qiita.study_sample (sample_id, study_id)
+                 SELECT study_id || '.BENCH.' || g, study_id
+                 FROM unnest(%s::integer[]) AS s (study_id),
+                      generate_series(1, %s) AS g
+                 RETURNING sample_id, study_id"""
+        TRN.add(sql, [study_ids, samples_per_study])
+        return [s for s, _ in sorted(TRN.execute_fetchindex(),
+                                     key=lambda x: (x[1], x[0]))]
+
+
+def create_sample_plates(user, samples, plate_config):
+    """Plates the samples, leaving the last column of each plate for blanks
+
+    Parameters
+    ----------
+    user : labman.db.user.User
+        The user plating the samples
+    samples : list of str
+        The samples to plate
+    plate_config : labman.db.plate.PlateConfiguration
+        The configuration of the sample plates
+
+    Returns
+    -------
+    list of labman.db.process.SamplePlatingProcess
+        The plating processes
+    """
+    num_rows = plate_config.num_rows
+    num_cols = plate_config.num_columns - 1
+    per_plate = num_rows * num_cols
+    processes = []
+    for idx, start in enumerate(range(0, len(samples), per_plate)):
+        plate_samples = samples[start:start + per_plate]
+        with TRN:
+            process = SamplePlatingProcess.create(
+                user, plate_config,
+                'Benchmark plate %s %s' % (idx + 1, datetime.now()))
+            # The samples are new and plated only once, so set the contents
+            # of all the wells at once instead of using update_well
+            positions = [divmod(i, num_cols)
+                         for i in range(len(plate_samples))]
+            sql = """UPDATE qiita.sample_composition sc
+                        SET sample_composition_type_id = %s,
+                            sample_id = v.sample_id,
+                            content = v.sample_id
+                     FROM qiita.composition c
+                        JOIN qiita.well w USING (container_id),
+                        (SELECT unnest(%s::integer[]) AS row_num,
+                                unnest(%s::integer[]) AS col_num,
+                                unnest(%s::varchar[]) AS sample_id) AS v
+                     WHERE sc.composition_id = c.composition_id
+                        AND w.plate_id = %s
+                        AND w.row_num = v.row_num
+                        AND w.col_num = v.col_num"""
+            TRN.add(sql, [
+                base.get_lookup_id('qiita.sample_composition_type',
+                                   'experimental sample'),
+                [r + 1 for r, _ in positions], [c + 1 for _, c in positions],
+                plate_samples, process.plate.id])
+            TRN.execute()
+        processes.append(process)
+    return processes
+
+
+def amplicon_run(user, sample_plate):
+    """Runs the amplicon workflow, from gDNA extraction to sequencing
+
+    Parameters
+    ----------
+    user : labman.db.user.User
+        The user running the workflow
+    sample_plate : labman.db.plate.Plate
+        The sample plate
+
+    Returns
+    -------
+    dict
+        The ids of the objects created by each step
+    """
+    ext_process, gdna_plate = workflows.create_gdna_extraction_process(
+        user, sample_plate)
+    amplicon_process, amplicon_plate = workflows.create_amplicon_prep(
+        user, gdna_plate)
+    quant_process = workflows.create_quantification_process(
+        user, amplicon_plate)
+    plate_pool_process = workflows.create_plate_pool_process(
+        user, quant_process, amplicon_plate,
+        {'function': 'amplicon',
+         'parameters': {"dna_amount": 240, "min_val": 1, "max_val": 15,
+                        "blank_volume": 2, "robot": 6, "destination": 1}})
+    pool_quant_process = workflows.create_pool_quantification_process(
+        user, [plate_pool_process.pool])
+    seq_pool_process = workflows.create_pools_pool_process(
+        user, pool_quant_process, [plate_pool_process.pool])
+    seq_process = workflows.create_sequencing_process(
+        user, [seq_pool_process.pool])
+    return {'sample_plate': sample_plate.id,
+            'gdna_plate': gdna_plate.id,
+            'amplicon_plate': amplicon_plate.id,
+            'amplicon_quantification_process': quant_process.id,
+            'amplicon_pool': plate_pool_process.pool.id,
+            'pool_quantification_process': pool_quant_process.id,
+            'amplicon_sequencing_process': seq_process.id}
+
+
+def shotgun_run(user, sample_plate):
+    """Runs the shotgun workflow, from gDNA extraction to sequencing
+
+    Parameters
+    ----------
+    user : labman.db.user.User
+        The user running the workflow
+    sample_plate : labman.db.plate.Plate
+        The sample plate
+
+    Returns
+    -------
+    dict
+        The ids of the objects created by each step
+    """
+    ext_process, gdna_plate = workflows.create_gdna_extraction_process(
+        user, sample_plate)
+    comp_process, compressed_plate = workflows.create_compression_process(
+        user, [gdna_plate])
+    comp_quant_process = workflows.create_quantification_process(
+        user, compressed_plate)
+    norm_process, norm_plate = workflows.create_normalization_process(
+        user, comp_quant_process)
+    shotgun_process, shotgun_plate = workflows.create_shotgun_process(
+        user, norm_plate)
+    quant_process = workflows.create_quantification_process(
+        user, shotgun_plate)
+    pool_process = workflows.create_plate_pool_process(
+        user, quant_process, shotgun_plate,
+        {'function': 'equal', 'parameters': {'total_vol': 60, 'size': 500}})
+    seq_process = workflows.create_sequencing_process(
+        user, [pool_process.pool])
+    return {'sample_plate': sample_plate.id,
+            'gdna_plate': gdna_plate.id,
+            'compressed_plate': compressed_plate.id,
+            'compressed_quantification_process': comp_quant_process.id,
+            'normalized_plate': norm_plate.id,
+            'shotgun_plate': shotgun_plate.id,
+            'shotgun_quantification_process': quant_process.id,
+            'shotgun_pool': pool_process.pool.id,
+            'shotgun_sequencing_process': seq_process.id}
+
+
+def generate_dataset(num_studies=2000, samples_per_study=100, num_runs=2000,
+                     user_email='test@foo.bar', plate_config_id=1,
+                     progress=None):
+    """Populates the test database with a large synthetic dataset
+
+    With the default values the dataset has 2000 studies, 200000 samples,
+    more than 2000 sample plates and 2000 sequencing runs, each with its own
+    pools. Generating it takes hours, so use smaller values for quick checks.
+
+    Parameters
+    ----------
+    num_studies : int, optional
+        The number of studies to create. Default: 2000
+    samples_per_study : int, optional
+        The number of samples of each study. Default: 100
+    num_runs : int, optional
+        The number of sample plates processed all the way to sequencing,
+        alternating the amplicon and shotgun workflows. Default: 2000
+    user_email : str, optional
+        The user running the processes. Default: test@foo.bar
+    plate_config_id : int, optional
+        The configuration of the sample plates. Default: 1 (96-well plate)
+    progress : callable, optional
+        Function called with a message after each step
+
+    Returns
+    -------
+    dict
+        The manifest of the dataset: the parameters used, the number of
+        objects created and the ids of the objects created by the last
+        amplicon and shotgun runs, used by the benchmark scenarios
+    """
+    progress = progress if progress is not None else (lambda msg: None)
+    check_test_environment()
+    user = User(user_email)
+    plate_config = PlateConfiguration(plate_config_id)
+    tag = datetime.now().strftime('%Y%m%d%H%M%S')
+
+    study_ids = create_studies(num_studies, tag)
+    progress('Created %d studies' % len(study_ids))
+    samples = create_samples(study_ids, samples_per_study)
+    progress('Created %d samples' % len(samples))
+    plating_processes = create_sample_plates(user, samples, plate_config)
+    # The samples have been plated directly in the database, so the progress
+    # counters of the studies are not up to date
+    Study.refresh_progress(study_ids)
+    progress('Created %d sample plates' % len(plating_processes))
+
+    runs = {'amplicon': None, 'shotgun': None}
+    for idx, process in enumerate(plating_processes[:num_runs]):
+        if idx % 2 == 0:
+            runs['amplicon'] = amplicon_run(user, process.plate)
+        else:
+            runs['shotgun'] = shotgun_run(user, process.plate)
+        progress('Processed %d of %d sample plates'
+                 % (idx + 1, min(num_runs, len(plating_processes))))
+
+    return {'created': str(datetime.now()),
+            'user': user_email,
+            'plate_configuration': plate_config_id,
+            'num_studies': len(study_ids),
+            'num_samples': len(samples),
+            'num_sample_plates': len(plating_processes),
+            'num_runs': min(num_runs, len(plating_processes)),
+            'studies': study_ids[:10],
+            'samples': samples[:plate_config.num_rows],
+            'sample_plating_process': plating_processes[-1].id,
+            'runs': runs}
@@ -0,0 +1,186 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from datetime import datetime
+from json import dump, load
+from statistics import mean, median
+from time import perf_counter
+
+from labman.db.sql_connection import TRN
+from labman.benchmark.scenarios import SCENARIOS, WebServer
+
+
+def time_scenario(func, args, repeat=5, warmup=1):
+    """Times the execution of a scenario
+
+    Parameters
+    ----------
+    func : callable
+        The scenario
+    args : list
+        The arguments to pass to the scenario
+    repeat : int, optional
+        The number of timed executions. Default: 5
+    warmup : int, optional
+        The number of executions before the timed ones. Default: 1
+
+    Returns
+    -------
+    dict
+        The times, in seconds, of each execution, their min, median, mean
+        and max, and the median number of queries executed
+    """
+    for _ in range(warmup):
+        func(*args)
+
+    times = []
+    queries = []
+    for _ in range(repeat):
+        trn = TRN.current
+        count = trn.query_count
+        start = perf_counter()
+        res = func(*args)
+        times.append(perf_counter() - start)
+        queries.append(res if res is not None else trn.query_count - count)
+
+    return {'times': times,
+            'min': min(times),
+            'median': median(times),
+            'mean': mean(times),
+            'max': max(times),
+            'queries': median(queries)}
+
+
+def run_benchmarks(manifest, names=None, repeat=5, warmup=1, progress=None):
+    """Runs the benchmark scenarios on the dataset
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest of the dataset, as returned by
+        `labman.benchmark.generator.generate_dataset`
+    names : list of str, optional
+        The scenarios to run. Default: all of them
+    repeat : int, optional
+        The number of timed executions of each scenario. Default: 5
+    warmup : int, optional
+        The number of executions of each scenario before the timed ones.
+        Default: 1
+    progress : callable, optional
+        Function called with the name of each scenario before running it
+
+    Returns
+    -------
+    dict
+        The results of the scenarios, along with the dataset description
+
+    Raises
+    ------
+    ValueError
+        If any of the scenarios doesn't exist
+    """
+    names = list(SCENARIOS) if names is None else names
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError('Unknown scenarios: %s' % ', '.join(sorted(unknown)))
+    progress = progress if progress is not None else (lambda name: None)
+
+    webserver = None
+    if any(SCENARIOS[name][2] for name in names):
+        webserver = WebServer(manifest['user'])
+        webserver.start()
+
+    results = []
+    try:
+        for name in names:
+            func, requires, gui = SCENARIOS[name]
+            if requires is not None and manifest['runs'][requires] is None:
+                results.append({'name': name,
+                                'skipped': 'The dataset has no %s runs'
+                                           % requires})
+                continue
+            progress(name)
+            args = [manifest, webserver] if gui else [manifest]
+            result = time_scenario(func, args, repeat=repeat, warmup=warmup)
+            result['name'] = name
+            results.append(result)
+    finally:
+        if webserver is not None:
+            webserver.stop()
+
+    dataset = {k: manifest[k] for k in ('num_studies', 'num_samples',
+                                        'num_sample_plates', 'num_runs')}
+    return {'timestamp': str(datetime.now()),
+            'repeat': repeat,
+            'dataset': dataset,
+            'scenarios': results}
+
+
+def compare_results(baseline, current):
+    """Compares the median times of two benchmark results
+
+    Parameters
+    ----------
+    baseline : dict
+        The results of the reference run, as returned by `run_benchmarks`
+    current : dict
+        The results to compare, as returned by `run_benchmarks`
+
+    Returns
+    -------
+    list of dict
+        The name of the scenarios present in both results, their median
+        times and number of queries, and the ratio of the median times
+        (current / baseline)
+    """
+    base = {r['name']: r for r in baseline['scenarios'] if 'median' in r}
+    comparison = []
+    for res in current['scenarios']:
+        ref = base.get(res['name'])
+        if ref is None or 'median' not in res:
+            continue
+        comparison.append({
+            'name': res['name'],
+            'baseline': ref['median'],
+            'current': res['median'],
+            'ratio': (res['median'] / ref['median']
+                      if ref['median'] else None),
+            'baseline_queries': ref['queries'],
+            'current_queries': res['queries']})
+    return comparison
+
+
+def write_json(obj, fp):
+    """Writes the object to a JSON file
+
+    Parameters
+    ----------
+    obj : dict
+        The manifest or the results to write
+    fp : str
+        The path to the JSON file
+    """
+    with open(fp, 'w') as f:
+        dump(obj, f, indent=4, sort_keys=True)
+
+
+def read_json(fp):
+    """Reads a manifest or benchmark results JSON file
+
+    Parameters
+    ----------
+    fp : str
+        The path to the JSON file
+
+    Returns
+    -------
+    dict
+        The manifest or results
+    """
+    with open(fp) as f:
+        return load(f)
@@ -0,0 +1,348 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Thread
+from urllib.request import Request, urlopen
+
+import numpy as np
+from tornado.escape import json_encode
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+from tornado.web import create_signed_value
+
+from labman.db.settings import labman_settings
+from labman.db.sql_connection import TRN
+from labman.db.user import User
+from labman.db.plate import Plate, PlateConfiguration
+from labman.db.study import Study
+from labman.db.equipment import Equipment
+from labman.db.composition import ReagentComposition, PoolComposition
+from labman.db.process import (
+    SamplePlatingProcess, GDNAExtractionProcess, GDNAPlateCompressionProcess,
+    LibraryPrep16SProcess, NormalizationProcess, LibraryPrepShotgunProcess,
+    QuantificationProcess, PoolingProcess, SequencingProcess)
+
+
+# Maps the scenario names to the functions implementing them
+SCENARIOS = OrderedDict()
+
+
+def scenario(name, requires=None, gui=False):
+    """Registers a benchmark scenario
+
+    A scenario is a function that receives the dataset manifest (see
+    `labman.benchmark.generator.generate_dataset`) and executes the operation
+    being measured. It can return the number of queries executed, if they
+    were not executed in the current thread.
+
+    Parameters
+    ----------
+    name : str
+        The name of the scenario
+    requires : str, optional
+        The workflow ('amplicon' or 'shotgun') that the dataset should have
+        run for the scenario to be executed
+    gui : bool, optional
+        Whether the scenario performs requests to the webserver. If true,
+        the function also receives the `WebServer` serving the requests.
+        Default: False
+    """
+    def decorator(func):
+        SCENARIOS[name] = (func, requires, gui)
+        return func
+    return decorator
+
+
+@contextmanager
+def rolled_back():
+    """Runs the code inside the context in a transaction that is rolled back
+
+    The processes created by the scenarios are not committed, so all the
+    repetitions of a scenario run on the same dataset
+    """
+    with TRN:
+        try:
+            yield
+        finally:
+            TRN.rollback()
+
+
+def _run(manifest, workflow, key):
+    return manifest['runs'][workflow][key]
+
+
+def _name(prefix):
+    return '%s %s' % (prefix, datetime.now())
+
+
+# Process creation scenarios
+@scenario('SamplePlatingProcess.create')
+def sample_plating_create(manifest):
+    with rolled_back():
+        SamplePlatingProcess.create(
+            User(manifest['user']),
+            PlateConfiguration(manifest['plate_configuration']),
+            _name('Benchmark plating'))
+
+
+@scenario('SamplePlatingProcess.update_wells')
+def sample_plating_update_wells(manifest):
+    plate_config = PlateConfiguration(manifest['plate_configuration'])
+    samples = manifest['samples']
+    with rolled_back():
+        process = SamplePlatingProcess.create(
+            User(manifest['user']), plate_config, _name('Benchmark plating'))
+        process.update_wells(
+            [(i + 1, j + 1, samples[(i * plate_config.num_columns + j) %
+                                    len(samples)])
+             for i in range(plate_config.num_rows)
+             for j in range(plate_config.num_columns)])
+
+
+@scenario('GDNAExtractionProcess.create', requires='amplicon')
+def gdna_extraction_create(manifest):
+    with rolled_back():
+        GDNAExtractionProcess.create(
+            User(manifest['user']),
+            Plate(_run(manifest, 'amplicon', 'sample_plate')),
+            Equipment(11), Equipment(6), Equipment(15),
+            ReagentComposition(1), 100, _name('Benchmark gDNA'))
+
+
+@scenario('GDNAPlateCompressionProcess.create', requires='amplicon')
+def gdna_compression_create(manifest):
+    with rolled_back():
+        GDNAPlateCompressionProcess.create(
+            User(manifest['user']),
+            [Plate(_run(manifest, 'amplicon', 'gdna_plate'))],
+            _name('Benchmark compression'), Equipment(6))
+
+
+@scenario('LibraryPrep16SProcess.create', requires='amplicon')
+def library_prep_16s_create(manifest):
+    with rolled_back():
+        LibraryPrep16SProcess.create(
+            User(manifest['user']),
+            Plate(_run(manifest, 'amplicon', 'gdna_plate')), Plate(11),
+            _name('Benchmark amplicon'), Equipment(6), Equipment(16),
+            Equipment(17), ReagentComposition(2), ReagentComposition(3), 75)
+
+
+@scenario('QuantificationProcess.create', requires='amplicon')
+def quantification_create(manifest):
+    plate = Plate(_run(manifest, 'amplicon', 'amplicon_plate'))
+    pc = plate.plate_configuration
+    concentrations = np.around(np.random.rand(pc.num_rows, pc.num_columns), 6)
+    with rolled_back():
+        QuantificationProcess.create(
+            User(manifest['user']), plate, concentrations)
+
+
+@scenario('NormalizationProcess.create', requires='shotgun')
+def normalization_create(manifest):
+    with rolled_back():
+        NormalizationProcess.create(
+            User(manifest['user']),
+            QuantificationProcess(_run(manifest, 'shotgun',
+                                       'compressed_quantification_process')),
+            ReagentComposition(3), _name('Benchmark normalization'))
+
+
+@scenario('LibraryPrepShotgunProcess.create', requires='shotgun')
+def library_prep_shotgun_create(manifest):
+    with rolled_back():
+        LibraryPrepShotgunProcess.create(
+            User(manifest['user']),
+            Plate(_run(manifest, 'shotgun', 'normalized_plate')),
+            _name('Benchmark shotgun'), ReagentComposition(4),
+            ReagentComposition(5), 4000, Plate(19), Plate(20))
+
+
+@scenario('PoolingProcess.create', requires='shotgun')
+def pooling_create(manifest):
+    quant_process = QuantificationProcess(
+        _run(manifest, 'shotgun', 'shotgun_quantification_process'))
+    input_compositions = [
+        {'composition': comp, 'input_volume': 1,
+         'percentage_of_output': 1 / 384.0}
+        for comp, _, _ in quant_process.concentrations]
+    with rolled_back():
+        PoolingProcess.create(
+            User(manifest['user']), quant_process, _name('Benchmark pool'),
+            4, input_compositions,
+            {'function': 'equal',
+             'parameters': {'total_vol': 60, 'size': 500}},
+            robot=Equipment(8))
+
+
+@scenario('SequencingProcess.create', requires='shotgun')
+def sequencing_create(manifest):
+    with rolled_back():
+        SequencingProcess.create(
+            User(manifest['user']),
+            [PoolComposition(_run(manifest, 'shotgun', 'shotgun_pool'))],
+            _name('Benchmark run'), _name('Benchmark experiment'),
+            Equipment(18), 151, 151, User('admin@foo.bar'),
+            contacts=[User('test@foo.bar')])
+
+
+# Retrieval scenarios
+@scenario('Plate.layout')
+def plate_layout(manifest):
+    plate = SamplePlatingProcess(manifest['sample_plating_process']).plate
+    plate.layout
+
+
+@scenario('Plate.search')
+def plate_search(manifest):
+    Plate.search(samples=manifest['samples'])
+
+
+@scenario('Plate.list_plates')
+def plate_list_plates(manifest):
+    Plate.list_plates(include_study_titles=True)
+
+
+@scenario('Plate.list_plates (page)')
+def plate_list_plates_page(manifest):
+    Plate.list_plates(include_study_titles=True, search='Benchmark',
+                      order_by='external_id', limit=50, offset=50)
+
+
+@scenario('Study.sample_numbers_summary')
+def study_sample_numbers_summary(manifest):
+    Study(manifest['studies'][0]).sample_numbers_summary
+
+
+@scenario('SequencingProcess.generate_prep_information (amplicon)',
+          requires='amplicon')
+def generate_prep_information_amplicon(manifest):
+    SequencingProcess(_run(manifest, 'amplicon',
+                           'amplicon_sequencing_process')
+                      ).generate_prep_information()
+
+
+@scenario('SequencingProcess.generate_prep_information (shotgun)',
+          requires='shotgun')
+def generate_prep_information_shotgun(manifest):
+    SequencingProcess(_run(manifest, 'shotgun',
+                           'shotgun_sequencing_process')
+                      ).generate_prep_information()
+
+
+@scenario('SequencingProcess.generate_sample_sheet (shotgun)',
+          requires='shotgun')
+def generate_sample_sheet_shotgun(manifest):
+    SequencingProcess(_run(manifest, 'shotgun',
+                           'shotgun_sequencing_process')
+                      ).generate_sample_sheet()
+
+
+class WebServer(object):
+    """Runs the labman webserver in a background thread
+
+    Parameters
+    ----------
+    user_email : str
+        The user used to authenticate the requests
+    """
+    def __init__(self, user_email):
+        # Imported here so the webserver is only loaded if needed
+        from labman.gui.webserver import Application
+
+        self._sockets = bind_sockets(0, '127.0.0.1')
+        self.port = self._sockets[0].getsockname()[1]
+        self._cookie = create_signed_value(
+            labman_settings.cookie_secret, 'user',
+            json_encode(user_email)).decode('ascii')
+        self._app = Application(debug=False)
+        self._ioloop = None
+        self._thread = None
+
+    def _serve(self, started):
+        self._ioloop = IOLoop()
+        self._ioloop.make_current()
+        server = HTTPServer(self._app)
+        server.add_sockets(self._sockets)
+        self._ioloop.add_callback(started.append, True)
+        self._ioloop.start()
+        server.stop()
+        self._ioloop.close(all_fds=True)
+
+    def start(self):
+        """Starts the webserver"""
+        started = []
+        self._thread = Thread(target=self._serve, args=(started, ))
+        self._thread.daemon = True
+        self._thread.start()
+        while not started:
+            self._thread.join(0.01)
+
+    def stop(self):
+        """Stops the webserver"""
+        self._ioloop.add_callback(self._ioloop.stop)
+        self._thread.join()
+
+    def get(self, path):
+        """Performs an authenticated GET request
+
+        Parameters
+        ----------
+        path : str
+            The path of the request
+
+        Returns
+        -------
+        int
+            The number of queries executed by the webserver to serve the
+            request, as reported in the Server-Timing header
+        """
+        request = Request('http://127.0.0.1:%d%s' % (self.port, path),
+                          headers={'Cookie': 'user=%s' % self._cookie})
+        with urlopen(request) as response:
+            response.read()
+            timing = response.headers.get('Server-Timing', '')
+        for metric in timing.split(','):
+            name, _, params = metric.strip().partition(';')
+            if name == 'queries':
+                return int(params.split('"')[1])
+        return None
+
+
+# The paths requested by the GUI scenarios, and the workflow that they
+# require. The paths are formatted with the study ids and the amplicon and
+# shotgun runs of the manifest
+GUI_ENDPOINTS = [
+    ('/plate_list', None),
+    ('/plate_list?draw=1&start=0&length=50', None),
+    ('/plate/{amplicon[sample_plate]}/', 'amplicon'),
+    ('/plate/{amplicon[sample_plate]}/layout', 'amplicon'),
+    ('/pool_list', None),
+    ('/sequence_run_list', None),
+    ('/study_list', None),
+    ('/study/{studies[0]}/summary', None),
+    ('/process/sequencing/{shotgun[shotgun_sequencing_process]}/sample_sheet',
+     'shotgun'),
+    ('/process/sequencing/{shotgun[shotgun_sequencing_process]}/'
+     'preparation_sheets', 'shotgun')]
+
+
+def _gui_scenario(path):
+    def func(manifest, webserver):
+        return webserver.get(path.format(studies=manifest['studies'],
+                                         **manifest['runs']))
+    return func
+
+
+for _path, _requires in GUI_ENDPOINTS:
+    scenario('GET %s' % _path, requires=_requires, gui=True)(
+        _gui_scenario(_path))
@@ -0,0 +1,73 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import main, TestCase
+from tempfile import NamedTemporaryFile
+
+from labman.benchmark.scenarios import SCENARIOS
+from labman.benchmark.runner import (
+    time_scenario, run_benchmarks, compare_results, write_json, read_json)
+
+
+class TestRunner(TestCase):
+    def test_time_scenario(self):
+        calls = []
+
+        def func(arg):
+            calls.append(arg)
+            return 3
+
+        obs = time_scenario(func, ['foo'], repeat=3, warmup=2)
+        self.assertEqual(calls, ['foo'] * 5)
+        self.assertEqual(len(obs['times']), 3)
+        self.assertEqual(obs['queries'], 3)
+        self.assertLessEqual(obs['min'], obs['median'])
+        self.assertLessEqual(obs['median'], obs['max'])
+
+    def test_run_benchmarks_skipped(self):
+        manifest = {'num_studies': 1, 'num_samples': 2,
+                    'num_sample_plates': 1, 'num_runs': 0,
+                    'runs': {'amplicon': None, 'shotgun': None}}
+        obs = run_benchmarks(manifest, names=['SequencingProcess.create'])
+        self.assertEqual(obs['dataset'], {'num_studies': 1, 'num_samples': 2,
+                                          'num_sample_plates': 1,
+                                          'num_runs': 0})
+        self.assertEqual(obs['scenarios'], [
+            {'name': 'SequencingProcess.create',
+             'skipped': 'The dataset has no shotgun runs'}])
+
+        with self.assertRaises(ValueError):
+            run_benchmarks(manifest, names=['Unknown scenario'])
+
+    def test_scenarios(self):
+        self.assertIn('Plate.layout', SCENARIOS)
+        self.assertIn('GET /plate/{amplicon[sample_plate]}/', SCENARIOS)
+        self.assertTrue(SCENARIOS['GET /plate_list'][2])
+        self.assertFalse(SCENARIOS['Plate.search'][2])
+
+    def test_compare_results(self):
+        baseline = {'scenarios': [
+            {'name': 'a', 'median': 2.0, 'queries': 10},
+            {'name': 'b', 'median': 1.0, 'queries': 5},
+            {'name': 'c', 'skipped': 'No runs'}]}
+        current = {'scenarios': [
+            {'name': 'a', 'median': 1.0, 'queries': 4},
+            {'name': 'c', 'median': 1.0, 'queries': 1}]}
+        obs = compare_results(baseline, current)
+        self.assertEqual(obs, [{'name': 'a', 'baseline': 2.0, 'current': 1.0,
+                                'ratio': 0.5, 'baseline_queries': 10,
+                                'current_queries': 4}])
+
+    def test_write_read_json(self):
+        with NamedTemporaryFile(suffix='.json') as f:
+            write_json({'scenarios': []}, f.name)
+            self.assertEqual(read_json(f.name), {'scenarios': []})
+
+
+if __name__ == '__main__':
+    main()
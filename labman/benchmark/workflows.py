@@ -0,0 +1,195 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+"""Steps of the amplicon and shotgun workflows
+
+Each function runs one process on the objects of the test database, so the
+workflows can be exercised end to end by the integration tests and the
+benchmark dataset generator.
+"""
+
+from datetime import datetime
+from itertools import chain
+
+import numpy as np
+
+from labman.db.process import (
+    GDNAExtractionProcess, GDNAPlateCompressionProcess, LibraryPrep16SProcess,
+    NormalizationProcess, QuantificationProcess, LibraryPrepShotgunProcess,
+    PoolingProcess, SequencingProcess)
+from labman.db.user import User
+from labman.db.plate import Plate
+from labman.db.equipment import Equipment
+from labman.db.composition import ReagentComposition
+
+
+def create_gdna_extraction_process(user, plate):
+    """Extracts the gDNA of a sample plate
+
+    Returns
+    -------
+    tuple of (GDNAExtractionProcess, Plate)
+        The process and the gDNA plate
+    """
+    kingfisher = Equipment(11)
+    epmotion = Equipment(6)
+    epmotion_tool = Equipment(15)
+    extraction_kit = ReagentComposition(1)
+    ext_process = GDNAExtractionProcess.create(
+        user, plate, kingfisher, epmotion, epmotion_tool, extraction_kit, 100,
+        'GDNA test plate %s' % datetime.now())
+    gdna_plate = ext_process.plates[0]
+    return ext_process, gdna_plate
+
+
+def create_amplicon_prep(user, plate):
+    """Prepares the 16S libraries of a gDNA plate
+
+    Returns
+    -------
+    tuple of (LibraryPrep16SProcess, Plate)
+        The process and the library plate
+    """
+    primer_plate = Plate(11)
+    epmotion = Equipment(6)
+    master_mix = ReagentComposition(2)
+    water_lot = ReagentComposition(3)
+    epmotion_tool_tm300 = Equipment(16)
+    epmotion_tool_tm50 = Equipment(17)
+    amplicon_process = LibraryPrep16SProcess.create(
+        user, plate, primer_plate, 'Amplicon test plate %s' % datetime.now(),
+        epmotion, epmotion_tool_tm300, epmotion_tool_tm50, master_mix,
+        water_lot, 75,)
+    amplicon_plate = amplicon_process.plates[0]
+    return amplicon_process, amplicon_plate
+
+
+def create_compression_process(user, gdna_plates):
+    """Compresses gDNA plates into a 384-well plate
+
+    Returns
+    -------
+    tuple of (GDNAPlateCompressionProcess, Plate)
+        The process and the compressed plate
+    """
+    comp_process = GDNAPlateCompressionProcess.create(
+        user, gdna_plates, 'Compressed test plate %s' % datetime.now(),
+        Equipment(6))
+    compressed_plate = comp_process.plates[0]
+    return comp_process, compressed_plate
+
+
+def create_quantification_process(user, plate):
+    """Quantifies a plate with random concentrations
+
+    Returns
+    -------
+    QuantificationProcess
+    """
+    plate_config = plate.plate_configuration
+    concentrations = np.around(
+        np.random.rand(plate_config.num_rows, plate_config.num_columns), 6)
+    quant_process = QuantificationProcess.create(user, plate, concentrations)
+    return quant_process
+
+
+def create_pool_quantification_process(user, pools):
+    """Quantifies pools with random concentrations
+
+    Returns
+    -------
+    QuantificationProcess
+    """
+    concentrations = np.around(np.random.rand(len(pools)), 6)
+    concentrations = [{'composition': p, 'concentration': c}
+                      for p, c in zip(pools, concentrations)]
+    return QuantificationProcess.create_manual(user, concentrations)
+
+
+def create_normalization_process(user, quant_process):
+    """Normalizes a quantified compressed gDNA plate
+
+    Returns
+    -------
+    tuple of (NormalizationProcess, Plate)
+        The process and the normalized plate
+    """
+    water = ReagentComposition(3)
+    norm_process = NormalizationProcess.create(
+        user, quant_process, water,
+        'Normalized test plate %s' % datetime.now())
+    norm_plate = norm_process.plates[0]
+    return norm_process, norm_plate
+
+
+def create_shotgun_process(user, norm_plate):
+    """Prepares the shotgun libraries of a normalized plate
+
+    Returns
+    -------
+    tuple of (LibraryPrepShotgunProcess, Plate)
+        The process and the library plate
+    """
+    kappa = ReagentComposition(4)
+    stub = ReagentComposition(5)
+    shotgun_process = LibraryPrepShotgunProcess.create(
+        user, norm_plate, 'Test Shotgun Library %s' % datetime.now(), kappa,
+        stub, 4000, Plate(19), Plate(20))
+    shotgun_plate = shotgun_process.plates[0]
+    return shotgun_process, shotgun_plate
+
+
+def create_plate_pool_process(user, quant_process, plate, func_data):
+    """Pools all the wells of a library plate
+
+    Returns
+    -------
+    PoolingProcess
+    """
+    input_compositions = []
+    echo = Equipment(8)
+    for well in chain.from_iterable(plate.layout):
+        if well is not None:
+            input_compositions.append({
+                'composition': well.composition, 'input_volume': 1,
+                'percentage_of_output': 1/9.0})
+    pool_process = PoolingProcess.create(
+        user, quant_process, 'New test pool name %s' % datetime.now(),
+        4, input_compositions, func_data, robot=echo)
+    return pool_process
+
+
+def create_pools_pool_process(user, quant_process, pools):
+    """Pools the given pools into a sequencing pool
+
+    Returns
+    -------
+    PoolingProcess
+    """
+    input_compositions = [
+        {'composition': p, 'input_volume': 1, 'percentage_of_output': 1/9.0}
+        for p in pools]
+    pool_process = PoolingProcess.create(
+        user, quant_process, 'New pool name %s' % datetime.now(), 5,
+        input_compositions, {"function": "amplicon_pool", "parameters": {}})
+    return pool_process
+
+
+def create_sequencing_process(user, pools):
+    """Sequences the given pools
+
+    Returns
+    -------
+    SequencingProcess
+    """
+    seq_process = SequencingProcess.create(
+        user, pools, 'New sequencing run %s' % datetime.now(),
+        'Run experiment %s' % datetime.now(), Equipment(18), 151, 151,
+        User('admin@foo.bar'),
+        contacts=[User('test@foo.bar'), User('demo@microbio.me')])
+    return seq_process
@@ -10,6 +10,280 @@ from . import exceptions
 from . import sql_connection
 
 
+# Process-wide cache of the static lookup tables (e.g. composition_type),
+# keyed by (table, key column). Each table is stored as a {key: id} dict
+_LOOKUP_TABLES = {}
+
+
+def get_lookup_id(table, key, key_column='description', reload_missing=True):
+    """Returns the id of the row of a lookup table with the given key
+
+    The lookup tables rarely change, so the full table is loaded the first
+    time that it is accessed and cached for the lifetime of the process
+
+    Parameters
+    ----------
+    table : str
+        The lookup table (e.g. qiita.composition_type)
+    key : str
+        The key value to look for
+    key_column : str, optional
+        The column holding the key. Default: description
+    reload_missing : bool, optional
+        If true and the key is not in the cached table, reload the table
+        before giving up, in case the row has been added by another process.
+        Default: True
+
+    Returns
+    -------
+    int or None
+        The id of the row, or None if the key does not exist in the table
+    """
+    cache_key = (table, key_column)
+    values = _LOOKUP_TABLES.get(cache_key)
+    if values is None or (reload_missing and key not in values):
+        with sql_connection.TRN as TRN:
+            sql = "SELECT {}, {}_id FROM {}".format(
+                key_column, table.split('.')[-1], table)
+            TRN.add(sql)
+            values = dict(TRN.execute_fetchindex())
+        _LOOKUP_TABLES[cache_key] = values
+    return values.get(key)
+
+
+def clear_lookup_tables():
+    """Empties the lookup table cache
+
+    This needs to be called every time that a row is added to one of the
+    lookup tables, so it is loaded again from the database
+    """
+    _LOOKUP_TABLES.clear()
+
+
+# Process-wide cache of the SQL types of the table columns, keyed by
+# (table, column). The schema does not change while the system is running
+_COLUMN_TYPES = {}
+
+
+def get_column_types(table, columns):
+    """Returns the SQL types of the given columns of a table
+
+    Parameters
+    ----------
+    table : str
+        The table (e.g. qiita.sample_composition)
+    columns : list of str
+        The column names
+
+    Returns
+    -------
+    list of str
+        The SQL types of the columns (e.g. integer), in `columns` order
+
+    Raises
+    ------
+    ValueError
+        If any of the columns does not exist in the table
+    """
+    missing = [c for c in columns if (table, c) not in _COLUMN_TYPES]
+    if missing:
+        with sql_connection.TRN as TRN:
+            sql = """SELECT attname, format_type(atttypid, atttypmod)
+                     FROM pg_catalog.pg_attribute
+                     WHERE attrelid = %s::regclass AND attname IN %s
+                        AND NOT attisdropped"""
+            TRN.add(sql, [table, tuple(missing)])
+            for column, col_type in TRN.execute_fetchindex():
+                _COLUMN_TYPES[(table, column)] = col_type
+        unknown = [c for c in missing if (table, c) not in _COLUMN_TYPES]
+        if unknown:
+            raise ValueError('Unknown columns of %s: %s'
+                             % (table, ', '.join(unknown)))
+    return [_COLUMN_TYPES[(table, c)] for c in columns]
+
+
+# Cache of the SQL queries used to resolve the subclass of the objects, keyed
+# by the base table. The queries only depend on the classes in the code
+_FACTORY_SQL = {}
+
+
+def _factory_many(ids, table, id_column, type_column, classes):
+    """Initializes the correct subclass of each of the given ids
+
+    The type and the subclass id of all the objects are retrieved in a single
+    query, by left-joining the base table with the tables of all the
+    subclasses
+
+    Parameters
+    ----------
+    ids : iterable of int
+        The ids in the base table
+    table : str
+        The base table (e.g. qiita.composition)
+    id_column : str
+        The id column of the base table (e.g. composition_id)
+    type_column : str
+        The column of the base table pointing to the type table
+        (e.g. composition_type_id)
+    classes : dict of {str: type}
+        The subclass implementing each type description
+
+    Returns
+    -------
+    list of LabmanObject
+        The instances of the subclasses, in the same order as `ids`
+
+    Raises
+    ------
+    LabmanUnknownIdError
+        If any of the ids does not exist in the base table
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+
+    sql = _FACTORY_SQL.get(table)
+    if sql is None:
+        sub_tables = sorted({c._table: c._id_column for c in classes.values()
+                             if c._table != table}.items())
+        joins = ''.join('\n    LEFT JOIN {} USING ({})'.format(t, id_column)
+                        for t, _ in sub_tables)
+        sub_ids = ''.join('{}.{}, '.format(t, c) for t, c in sub_tables)
+        sql = """SELECT {0}.{1}, type_table.description,
+                        COALESCE({2}{0}.{1})
+                 FROM {0}
+                    JOIN {0}_type type_table USING ({3}){4}
+                 WHERE {0}.{1} IN %s""".format(table, id_column, sub_ids,
+                                               type_column, joins)
+        _FACTORY_SQL[table] = sql
+
+    with sql_connection.TRN as TRN:
+        TRN.add(sql, [tuple(set(ids))])
+        res = {obj_id: (desc, sub_id)
+               for obj_id, desc, sub_id in TRN.execute_fetchindex()}
+
+    result = []
+    for obj_id in ids:
+        if obj_id not in res:
+            raise exceptions.LabmanUnknownIdError(table, obj_id)
+        desc, sub_id = res[obj_id]
+        result.append(classes[desc]._from_id(sub_id))
+    return result
+
+
+class ListPage(list):
+    """The rows of a page of a listing
+
+    Attributes
+    ----------
+    total : int
+        The number of rows of the listing, ignoring the search
+    filtered : int
+        The number of rows of the listing matching the search
+    """
+    def __init__(self, rows, total, filtered):
+        super(ListPage, self).__init__(rows)
+        self.total = total
+        self.filtered = filtered
+
+
+def _escape_like(term):
+    """Escapes the LIKE wildcards of a search term"""
+    return (term.replace('\\', '\\\\').replace('%', '\\%')
+            .replace('_', '\\_'))
+
+
+def list_page(sql, sql_args, id_column, columns, search=None, order_by=None,
+              descending=False, limit=None, offset=None, after=None):
+    """Retrieves a page of the rows of a listing query
+
+    The page is retrieved sorting and filtering the rows in the database, so
+    only the rows of the page are transferred
+
+    Parameters
+    ----------
+    sql : str
+        The query listing all the rows
+    sql_args : list or None
+        The arguments of `sql`
+    id_column : str
+        The column of `sql` that uniquely identifies each row. It is used to
+        break the ties when sorting, so the order of the rows is stable
+    columns : list of str
+        The columns of `sql` that can be searched and sorted
+    search : str, optional
+        If provided, only the rows in which any of `columns` contains the
+        term (case insensitive) are returned
+    order_by : str, optional
+        The column used to sort the rows. Default: `id_column`
+    descending : bool, optional
+        Whether to sort the rows in descending order. Default: False
+    limit : int, optional
+        The maximum number of rows to return. Default: all of them
+    offset : int, optional
+        The number of rows to skip. Ignored if `after` is provided
+    after : list, optional
+        The values of `order_by` and `id_column` of the last row of the
+        previous page. If provided, the page starts right after that row
+        (keyset pagination), so the cost of retrieving a page does not depend
+        on its position. The `order_by` column should not be NULL.
+
+    Returns
+    -------
+    ListPage
+        The rows of the page, as dicts
+
+    Raises
+    ------
+    ValueError
+        If `order_by` is not one of the columns of the listing
+    """
+    order_by = id_column if order_by is None else order_by
+    if order_by != id_column and order_by not in columns:
+        raise ValueError('Unknown column to sort by: %s' % order_by)
+    direction = 'DESC' if descending else 'ASC'
+
+    search_sql = 'TRUE'
+    search_args = []
+    if search:
+        search_sql = ' OR '.join(
+            'CAST({} AS text) ILIKE %s'.format(c) for c in columns)
+        search_args = ['%%%s%%' % _escape_like(search)] * len(columns)
+
+    sql_args = list(sql_args) if sql_args is not None else []
+    with sql_connection.TRN as TRN:
+        page_args = sql_args + search_args
+        keyset_sql = ''
+        if after is not None:
+            keyset_sql = 'AND ({0}, {1}) {2} (%s, %s)'.format(
+                order_by, id_column, '<' if descending else '>')
+            page_args.extend(after)
+        sql_page = """SELECT *
+                      FROM ({0}) AS q
+                      WHERE ({1}) {2}
+                      ORDER BY {3} {4}, {5} {4}""".format(
+            sql, search_sql, keyset_sql, order_by, direction, id_column)
+        if limit is not None:
+            sql_page += ' LIMIT %s'
+            page_args.append(limit)
+        if offset and after is None:
+            sql_page += ' OFFSET %s'
+            page_args.append(offset)
+        TRN.add(sql_page, page_args)
+        rows = [dict(r) for r in TRN.execute_fetchindex()]
+
+        if limit is None and not (search or offset or after):
+            # All the rows have been retrieved, no need to count them
+            total = filtered = len(rows)
+        else:
+            sql_count = """SELECT COUNT(*),
+                                  COUNT(CASE WHEN {} THEN 1 END)
+                           FROM ({}) AS q""".format(search_sql, sql)
+            TRN.add(sql_count, search_args + sql_args)
+            total, filtered = TRN.execute_fetchindex()[0]
+    return ListPage(rows, total, filtered)
+
+
 class LabmanObject(object):
     """Base class for any Labman object
 
@@ -17,6 +291,9 @@ class LabmanObject(object):
     ----------
     id_: int
         The object id
+    bypass_cache: bool, optional
+        If true, do not reuse the instance cached in the current transaction
+        and check again that the object exists in the database. Default: False
 
     Attributes
     ----------
@@ -30,15 +307,60 @@ class LabmanObject(object):
     ------
     LabmanUnknownIdError
         If the id does not reference a known object
+
+    Notes
+    -----
+    Inside a transaction, instantiating the same object (same class and id)
+    multiple times returns the same instance, so the existence of the object
+    is only checked once per transaction.
     """
 
     _table = None
     _id_column = None
 
-    def __init__(self, id_):
+    def __new__(cls, id_=None, bypass_cache=False):
+        if not bypass_cache:
+            instance = sql_connection.TRN.get_cached_object(cls, id_)
+            if instance is not None:
+                return instance
+        return super(LabmanObject, cls).__new__(cls)
+
+    def __init__(self, id_, bypass_cache=False):
+        if hasattr(self, '_id'):
+            # The instance has been retrieved from the transaction cache and
+            # it is already initialized
+            return
         if not self.exists(id_):
             raise exceptions.LabmanUnknownIdError(self._table, id_)
         self._id = id_
+        sql_connection.TRN.cache_object(self)
+
+    @classmethod
+    def _from_id(cls, id_):
+        """Returns the object with the given id without checking its existence
+
+        Parameters
+        ----------
+        id_ : int
+            The object id
+
+        Returns
+        -------
+        LabmanObject
+            The object with the given id
+
+        Notes
+        -----
+        This should only be used with ids that have just been retrieved from
+        the database (e.g. the ids returned by a bulk INSERT), as it skips the
+        existence check performed when instantiating the object
+        """
+        instance = sql_connection.TRN.get_cached_object(cls, id_)
+        if instance is None:
+            instance = super(LabmanObject, cls).__new__(cls)
+            instance._id = id_
+            sql_connection.TRN.cache_object(instance)
+        return instance
 
     @classmethod
     def _attr_exists(cls, attr, value):
@@ -62,6 +384,47 @@ class LabmanObject(object):
             TRN.add(sql, [value])
             return TRN.execute_fetchlast()
 
+    def _get_row_attr(self, attr, join_table=None, join_column=None):
+        """Returns the value of the given attribute from the object row
+
+        The first time an attribute is accessed within a transaction, the
+        whole row of the object is retrieved and cached in the transaction,
+        so accessing any other attribute of the object does not require
+        another query.
+
+        Parameters
+        ----------
+        attr : str
+            The attribute to retrieve
+        join_table : str, optional
+            A table to join with the object table to build the row
+        join_column : str, optional
+            The column used to join `join_table` and the object table
+
+        Returns
+        -------
+        Object
+            The attribute
+        """
+        with sql_connection.TRN as TRN:
+            row = TRN.get_cached_row(self._table, self.id, join_table)
+            if row is None:
+                if join_table is None or join_table == self._table:
+                    sql = "SELECT * FROM {} WHERE {} = %s".format(
+                        self._table, self._id_column)
+                else:
+                    sql = """SELECT *
+                             FROM {}
+                                JOIN {} USING ({})
+                             WHERE {} = %s""".format(
+                                join_table, self._table, join_column,
+                                self._id_column)
+                TRN.add(sql, [self.id])
+                res = TRN.execute_fetchindex()
+                row = dict(res[0]) if res else {}
+                TRN.cache_row(self._table, self.id, row, join_table)
+            return row[attr] if row else None
+
     def _get_attr(self, attr):
         """Returns the value of the given attribute
 
@@ -75,11 +438,7 @@ class LabmanObject(object):
         Object
             The attribute
         """
-        with sql_connection.TRN as TRN:
-            sql = "SELECT {} FROM {} WHERE {} = %s".format(attr, self._table,
-                                                           self._id_column)
-            TRN.add(sql, [self.id])
-            return TRN.execute_fetchlast()
+        return self._get_row_attr(attr)
 
     def _set_attr(self, attr, value):
         """Sets the value of the given attribute
@@ -96,6 +455,7 @@ class LabmanObject(object):
                 self._table, attr, self._id_column)
             TRN.add(sql, [value, self.id])
             TRN.execute()
+            TRN.update_cached_rows(self._table, self.id, attr, value)
 
     @classmethod
     def exists(cls, id_):
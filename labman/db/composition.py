@@ -6,6 +6,8 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from collections import defaultdict
+
 from . import base
 from . import sql_connection
 from . import process
@@ -39,46 +41,32 @@ class Composition(base.LabmanObject):
         -------
         An instance of a subclass of Composition
         """
-        factory_classes = {
-            'reagent': ReagentComposition,
-            'primer set': PrimerSetComposition,
-            'primer': PrimerComposition,
-            'sample': SampleComposition,
-            'gDNA': GDNAComposition,
-            '16S library prep': LibraryPrep16SComposition,
-            'compressed gDNA': CompressedGDNAComposition,
-            'normalized gDNA': NormalizedGDNAComposition,
-            'shotgun library prep': LibraryPrepShotgunComposition,
-            'pool': PoolComposition}
+        return Composition.factory_many([composition_id])[0]
 
-        with sql_connection.TRN as TRN:
-            sql = """SELECT description
-                     FROM qiita.composition_type
-                        JOIN qiita.composition USING (composition_type_id)
-                     WHERE composition_id = %s"""
-            TRN.add(sql, [composition_id])
-            c_type = TRN.execute_fetchlast()
-            constructor = factory_classes[c_type]
+    @staticmethod
+    def factory_many(composition_ids):
+        """Initializes the correct composition subclass of multiple ids
 
-            sql = """SELECT {}
-                     FROM {}
-                     WHERE composition_id = %s""".format(
-                        constructor._id_column, constructor._table)
-            TRN.add(sql, [composition_id])
-            subclass_id = TRN.execute_fetchlast()
-            instance = constructor(subclass_id)
+        Parameters
+        ----------
+        composition_ids : list of int
+            The composition ids
 
-        return instance
+        Returns
+        -------
+        list of instances of subclasses of Composition
+            The compositions, in the same order as `composition_ids`
+        """
+        return base._factory_many(
+            composition_ids, 'qiita.composition', 'composition_id',
+            'composition_type_id', _COMPOSITION_CLASSES)
 
     @classmethod
     def _common_creation_steps(cls, process, container, volume):
         """"""
         with sql_connection.TRN as TRN:
-            sql = """SELECT composition_type_id
-                     FROM qiita.composition_type
-                     WHERE description = %s"""
-            TRN.add(sql, [cls._composition_type])
-            ct_id = TRN.execute_fetchlast()
+            ct_id = base.get_lookup_id(
+                'qiita.composition_type', cls._composition_type)
 
             sql = """INSERT INTO qiita.composition
                         (composition_type_id, upstream_process_id,
@@ -90,6 +78,142 @@ class Composition(base.LabmanObject):
             composition_id = TRN.execute_fetchlast()
         return composition_id
 
+    @classmethod
+    def _create_many(cls, process, volume, container_ids, columns):
+        """Creates multiple compositions of this type using a single query
+
+        Parameters
+        ----------
+        process : labman.db.process.Process
+            The process creating the compositions
+        volume : float
+            The initial volume of the compositions
+        container_ids : list of int
+            The ids of the containers holding the new compositions
+        columns : dict of {str: list}
+            The values of the columns of the composition subtype table, in
+            the same order as `container_ids`
+
+        Returns
+        -------
+        list of int
+            The ids of the newly created compositions, sorted
+        """
+        if not container_ids:
+            return []
+
+        names = sorted(columns)
+        with sql_connection.TRN as TRN:
+            # The composition ids are drawn from the sequence beforehand so
+            # the composition and subtype rows can be inserted in the same
+            # query. The arrays are cast to the column types, as an array
+            # holding only NULLs can't be typed otherwise
+            sql = """WITH new_compositions AS (
+                        SELECT nextval(pg_get_serial_sequence(
+                                    'qiita.composition', 'composition_id'))
+                                AS composition_id, v.*
+                        FROM (SELECT unnest(%s::bigint[]) AS container_id,
+                                     {arrays}) AS v),
+                     base_compositions AS (
+                        INSERT INTO qiita.composition
+                            (composition_id, composition_type_id,
+                             upstream_process_id, container_id, total_volume)
+                        SELECT composition_id, %s, %s, container_id, %s
+                        FROM new_compositions)
+                     INSERT INTO {table} (composition_id, {names})
+                     SELECT composition_id, {names}
+                     FROM new_compositions
+                     RETURNING {id_column}""".format(
+                        arrays=', '.join(
+                            'unnest(%%s::%s[]) AS %s' % (t, n)
+                            for t, n in zip(
+                                base.get_column_types(cls._table, names),
+                                names)),
+                        names=', '.join(names), table=cls._table,
+                        id_column=cls._id_column)
+            sql_args = [list(container_ids)]
+            sql_args.extend(list(columns[name]) for name in names)
+            sql_args.extend([
+                base.get_lookup_id(
+                    'qiita.composition_type', cls._composition_type),
+                process.process_id, volume])
+            TRN.add(sql, sql_args)
+            return sorted(TRN.execute_fetchflatten())
+
+    @staticmethod
+    def _add_lineage(composition_id, parent):
+        """Adds the lineage of a new composition derived from `parent`
+
+        Parameters
+        ----------
+        composition_id : int
+            The composition id of the new composition
+        parent : labman.db.composition.Composition
+            The composition the new composition has been derived from
+
+        Notes
+        -----
+        The query is queued in the transaction, so it is executed together
+        with the next query
+        """
+        with sql_connection.TRN as TRN:
+            sql = """INSERT INTO qiita.composition_lineage
+                        (composition_id, sample_composition_id, depth)
+                     SELECT %s, l.sample_composition_id, l.depth + 1
+                     FROM qiita.composition_lineage l
+                        JOIN {} p USING (composition_id)
+                     WHERE p.{} = %s""".format(parent._table,
+                                               parent._id_column)
+            TRN.add(sql, [composition_id, parent.id])
+
+    @staticmethod
+    def get_root_samples(compositions):
+        """Returns the sample compositions the compositions are derived from
+
+        The rows of the sample compositions are cached in the transaction, so
+        accessing their attributes (e.g. content or sample_id) within the
+        same transaction context does not require more queries
+
+        Parameters
+        ----------
+        compositions : list of labman.db.composition.Composition
+            The compositions
+
+        Returns
+        -------
+        list of SampleComposition or None
+            The sample composition each composition is derived from, in the
+            same order as `compositions`. None for the compositions that are
+            not derived from a single sample (e.g. reagents or pools)
+        """
+        ids_by_class = defaultdict(set)
+        for comp in compositions:
+            ids_by_class[type(comp)].add(comp.id)
+
+        roots = {}
+        with sql_connection.TRN as TRN:
+            # Usually all the compositions are of the same type, so this is
+            # a single query
+            for comp_cls, ids in ids_by_class.items():
+                sql = """SELECT c.{0} AS lineage_composition_id, sc.*
+                         FROM {1} c
+                            JOIN qiita.composition_lineage l
+                                USING (composition_id)
+                            JOIN qiita.sample_composition sc
+                                ON l.sample_composition_id =
+                                    sc.sample_composition_id
+                         WHERE c.{0} IN %s""".format(comp_cls._id_column,
+                                                     comp_cls._table)
+                TRN.add(sql, [tuple(ids)])
+                for r in TRN.execute_fetchindex():
+                    row = dict(r)
+                    comp_id = row.pop('lineage_composition_id')
+                    sc_id = row['sample_composition_id']
+                    TRN.cache_row(SampleComposition._table, sc_id, row)
+                    roots[(comp_cls, comp_id)] = SampleComposition._from_id(
+                        sc_id)
+        return [roots.get((type(comp), comp.id)) for comp in compositions]
+
     def _get_composition_attr(self, attr):
         """Returns the value of the given composition attribute
 
@@ -103,14 +227,7 @@ class Composition(base.LabmanObject):
         Object
             The attribute
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT {}
-                     FROM qiita.composition
-                        JOIN {} USING (composition_id)
-                     WHERE {} = %s""".format(attr, self._table,
-                                             self._id_column)
-            TRN.add(sql, [self.id])
-            return TRN.execute_fetchlast()
+        return self._get_row_attr(attr, 'qiita.composition', 'composition_id')
 
     def _set_composition_attr(self, attr, value):
         """Sets the value of the given composition attribute
@@ -127,6 +244,7 @@ class Composition(base.LabmanObject):
                      SET {} = %s
                      WHERE composition_id = %s""".format(attr)
             TRN.add(sql, [value, self.composition_id])
+            TRN.update_cached_rows(self._table, self.id, attr, value)
 
     @property
     def upstream_process(self):
@@ -165,6 +283,17 @@ class Composition(base.LabmanObject):
         # it should overwritte this property
         return None
 
+    @property
+    def root_sample(self):
+        """The sample composition this composition is derived from
+
+        Returns
+        -------
+        SampleComposition or None
+            None if the composition is not derived from a single sample
+        """
+        return Composition.get_root_samples([self])[0]
+
 
 class ReagentComposition(Composition):
     """Reagent composition class
@@ -277,11 +406,8 @@ class ReagentComposition(Composition):
             composition_id = cls._common_creation_steps(
                 process, container, volume)
             # Get the reagent composition type
-            sql = """SELECT reagent_composition_type_id
-                     FROM qiita.reagent_composition_type
-                     WHERE description = %s"""
-            TRN.add(sql, [reagent_type])
-            rct_id = TRN.execute_fetchlast()
+            rct_id = base.get_lookup_id(
+                'qiita.reagent_composition_type', reagent_type)
 
             # Add the row into the reagent composition table
             sql = """INSERT INTO qiita.reagent_composition
@@ -416,6 +542,10 @@ class SampleComposition(Composition):
                      VALUES (%s, %s)"""
             TRN.add(sql, [external_id, description])
             TRN.execute()
+            # Make sure that the new type is available in the lookup cache,
+            # and that it is not kept in there if the transaction fails
+            base.clear_lookup_tables()
+            TRN.add_post_rollback_func(base.clear_lookup_tables)
 
     @staticmethod
     def get_control_samples(term=None):
@@ -470,13 +600,8 @@ class SampleComposition(Composition):
         int
             The id of the sample composition type
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT sample_composition_type_id
-                     FROM qiita.sample_composition_type
-                     WHERE external_id = %s"""
-            TRN.add(sql, [compostion_type])
-            sct_id = TRN.execute_fetchlast()
-        return sct_id
+        return base.get_lookup_id(
+            'qiita.sample_composition_type', compostion_type, 'external_id')
 
     @classmethod
     def create(cls, process, container, volume):
@@ -513,8 +638,62 @@ class SampleComposition(Composition):
                           'blank.%s.%s' % (container.plate.id,
                                            container.well_id)])
             sc_id = TRN.execute_fetchlast()
+
+            # The sample composition is the root of its own lineage
+            sql = """INSERT INTO qiita.composition_lineage
+                        (composition_id, sample_composition_id, depth)
+                     VALUES (%s, %s, 0)"""
+            TRN.add(sql, [composition_id, sc_id])
         return cls(sc_id)
 
+    @classmethod
+    def create_many(cls, process, wells, volume):
+        """Creates a blank sample composition in each of the given wells
+
+        Parameters
+        ----------
+        process: labman.db.process.Process
+            The process creating the SampleCompositions
+        wells: list of labman.db.container.Well
+            The wells where the sample compositions are going to be held
+        volume: float
+            The initial sample composition volume
+
+        Returns
+        -------
+        list of SampleComposition
+            The newly created sample compositions, sorted by id
+        """
+        if not wells:
+            return []
+
+        with sql_connection.TRN as TRN:
+            sql = """SELECT container_id, plate_id, row_num, col_num
+                     FROM qiita.well
+                     WHERE well_id IN %s
+                     ORDER BY well_id"""
+            TRN.add(sql, [tuple(w.id for w in wells)])
+            well_info = TRN.execute_fetchindex()
+
+            sct_id = cls._get_sample_composition_type_id('blank')
+            container_ids = [c_id for c_id, _, _, _ in well_info]
+            contents = [
+                'blank.%s.%s' % (p_id, container_mod._format_well_id(r, c))
+                for _, p_id, r, c in well_info]
+            sc_ids = cls._create_many(
+                process, volume, container_ids,
+                {'sample_composition_type_id': [sct_id] * len(contents),
+                 'content': contents})
+
+            # The sample compositions are the root of their own lineage
+            sql = """INSERT INTO qiita.composition_lineage
+                        (composition_id, sample_composition_id, depth)
+                     SELECT composition_id, sample_composition_id, 0
+                     FROM qiita.sample_composition
+                     WHERE sample_composition_id IN %s"""
+            TRN.add(sql, [tuple(sc_ids)])
+        return [cls._from_id(sc_id) for sc_id in sc_ids]
+
     @property
     def sample_id(self):
         """The sample id"""
@@ -559,111 +738,29 @@ class SampleComposition(Composition):
         ----------
         content: str
             The new contents of the SampleComposition
+
+        Returns
+        -------
+        str, bool
+            The new content of the composition, and whether it is a control
+            or a known sample
+
+        Notes
+        -----
+        The contents are updated in the database by the
+        qiita.update_sample_compositions function, which also renames the
+        samples duplicated in the plate and updates the progress counters of
+        the studies of the samples involved
         """
         with sql_connection.TRN as TRN:
-            # First check if the previous content matches the new one. If the
-            # previous content is a experimental sample, then to be the same
-            # content the sample_id mush match. If it is not an experimental
-            # sample, then the sample composition type must match
-            sc_type = self.sample_composition_type
-            contents_ok = True
-            if not ((sc_type == 'experimental sample' and
-                     self.content == content) or (sc_type == content)):
-                # The contents are different, we need to update
-                # Identify if the content is a control or experimental sample
-                sql = """SELECT sample_composition_type_id
-                         FROM qiita.sample_composition_type
-                         WHERE external_id = %s"""
-                TRN.add(sql, [content])
-                res = TRN.execute_fetchindex()
-                well = self.container
-                if res:
-                    # The content is a control
-                    # res[0][0] -> Only 1 row and 1 column as result from the
-                    # previous SQL query
-                    sc_type_id = res[0][0]
-                    content = '%s.%s.%s' % (content, well.plate.id,
-                                            well.well_id)
-                    sql_args = [sc_type_id, None, content, self.id]
-                else:
-                    # The content is a sample
-                    es_sci = self._get_sample_composition_type_id(
-                        'experimental sample')
-                    # Check if the sample exists in the DB
-                    sql = """SELECT EXISTS(SELECT *
-                                           FROM qiita.study_sample
-                                           WHERE sample_id = %s)"""
-                    TRN.add(sql, [content])
-                    if TRN.execute_fetchlast():
-                        # Check if the sample has been plated in the same
-                        # plate before or not
-                        sql = """SELECT well_id, sample_composition_id,
-                                        sample_id
-                                 FROM qiita.well
-                                    JOIN qiita.composition USING (container_id)
-                                    JOIN qiita.sample_composition
-                                        USING (composition_id)
-                                 WHERE plate_id = %s AND sample_id = %s"""
-                        TRN.add(sql, [well.plate.id, content])
-                        res = TRN.execute_fetchindex()
-                        if res:
-                            # Update the content values to include the
-                            # plate and well id
-                            sql = """UPDATE qiita.sample_composition
-                                        SET content = %s
-                                        WHERE sample_composition_id = %s"""
-                            for well_id, sc_id, s_id in res:
-                                w = container_mod.Well(well_id)
-                                TRN.add(sql, ['%s.%s.%s' % (
-                                    s_id, w.plate.id, w.well_id), sc_id])
-                            orig_content = content
-                            content = '%s.%s.%s' % (content, well.plate.id,
-                                                    well.well_id)
-                            sql_args = [es_sci, orig_content, content, self.id]
-                        else:
-                            # There is no need to update the content value
-                            sql_args = [es_sci, content, content, self.id]
-                    else:
-                        # If it doesn't exist put the sample in the content
-                        # but do not put it on the sample_id
-                        contents_ok = False
-                        sql_args = [es_sci, None, content, self.id]
-
-                old_sample = self.sample_id
-
-                sql = """UPDATE qiita.sample_composition
-                         SET sample_composition_type_id = %s,
-                             sample_id = %s,
-                             content = %s
-                         WHERE sample_composition_id = %s"""
-                TRN.add(sql, sql_args)
-                TRN.execute()
-
-                if old_sample is not None:
-                    # This means that we had another experimental sample
-                    # in this plate before, check if the sample appears in
-                    # any other well
-                    sql = """SELECT sample_composition_id
-                             FROM qiita.well
-                                JOIN qiita.composition USING (container_id)
-                                JOIN qiita.sample_composition
-                                    USING (composition_id)
-                                WHERE plate_id = %s AND sample_id = %s"""
-                    TRN.add(sql, [well.plate.id, old_sample])
-                    res = TRN.execute_fetchflatten()
-                    if len(res) == 1:
-                        # The sample is present in another well AND only in
-                        # a single other other well (hence the check == 1)
-                        # This means that we can revert the content of the
-                        # other well to match the sample_id
-                        sql = """UPDATE qiita.sample_composition
-                                    SET content = sample_id
-                                    WHERE sample_composition_id = %s"""
-                        TRN.add(sql, [res[0]])
-                        TRN.execute()
-            else:
-                # cover the case in which the first thing plate is a blank
-                content = self.content
+            sql = """SELECT content, sample_ok
+                     FROM qiita.update_sample_compositions(
+                        %s::bigint[], %s::varchar[])"""
+            TRN.add(sql, [[self.id], [content]])
+            content, contents_ok = TRN.execute_fetchindex()[0]
+            # The rows of this and other sample compositions may have been
+            # updated, make sure that they are not read from the cache
+            TRN.clear_row_cache()
         return content, contents_ok
 
 
@@ -709,6 +806,7 @@ class GDNAComposition(Composition):
                      RETURNING gdna_composition_id"""
             TRN.add(sql, [composition_id, sample_composition.id])
             gdnac_id = TRN.execute_fetchlast()
+            cls._add_lineage(composition_id, sample_composition)
         return cls(gdnac_id)
 
     @property
@@ -772,6 +870,7 @@ class LibraryPrep16SComposition(Composition):
             TRN.add(sql, [composition_id, gdna_composition.id,
                           primer_composition.id])
             lp16sc_id = TRN.execute_fetchlast()
+            cls._add_lineage(composition_id, gdna_composition)
         return cls(lp16sc_id)
 
     @property
@@ -833,6 +932,7 @@ class CompressedGDNAComposition(Composition):
                      RETURNING compressed_gdna_composition_id"""
             TRN.add(sql, [composition_id, gdna_composition.id])
             cgdna_id = TRN.execute_fetchlast()
+            cls._add_lineage(composition_id, gdna_composition)
         return cls(cgdna_id)
 
     @property
@@ -898,6 +998,7 @@ class NormalizedGDNAComposition(Composition):
             TRN.add(sql, [composition_id, compressed_gdna_composition.id,
                           dna_vol, water_vol])
             ngdnac_id = TRN.execute_fetchlast()
+            cls._add_lineage(composition_id, compressed_gdna_composition)
         return cls(ngdnac_id)
 
     @property
@@ -974,6 +1075,7 @@ class LibraryPrepShotgunComposition(Composition):
             TRN.add(sql, [composition_id, norm_gdna_composition.id,
                           i5_composition.id, i7_composition.id])
             lpsc_id = TRN.execute_fetchlast()
+            cls._add_lineage(composition_id, norm_gdna_composition)
         return cls(lpsc_id)
 
     @property
@@ -1012,23 +1114,46 @@ class PoolComposition(Composition):
     _composition_type = 'pool'
 
     @staticmethod
-    def list_pools():
+    def list_pools(search=None, order_by=None, descending=False, limit=None,
+                   offset=None, after=None):
         """Generates a list of pools with some information about them
 
+        Parameters
+        ----------
+        search : str, optional
+            If provided, return only the pools whose id or external id
+            contain the given term
+        order_by : {'pool_composition_id', 'external_id'}, optional
+            The column used to sort the pools. Default: pool_composition_id
+        descending : bool, optional
+            Whether to sort the pools in descending order. Default: False
+        limit : int, optional
+            The maximum number of pools to return. Default: all of them
+        offset : int, optional
+            The number of pools to skip
+        after : list, optional
+            The values of `order_by` and pool_composition_id of the last pool
+            of the previous page
+
         Returns
         -------
-        list of dicts
+        labman.db.base.ListPage of dicts
             The list of pool information with the structure:
             [{'pool_id': int, 'external_id': string}]
+
+        See Also
+        --------
+        labman.db.base.list_page
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT pool_composition_id, external_id
-                     FROM qiita.pool_composition
-                        JOIN qiita.composition USING (composition_id)
-                        JOIN qiita.tube USING (container_id)
-                     ORDER BY pool_composition_id"""
-            TRN.add(sql)
-            return [dict(r) for r in TRN.execute_fetchindex()]
+        sql = """SELECT pool_composition_id, external_id
+                 FROM qiita.pool_composition
+                    JOIN qiita.composition USING (composition_id)
+                    JOIN qiita.tube USING (container_id)"""
+        return base.list_page(
+            sql, [], 'pool_composition_id',
+            ['pool_composition_id', 'external_id'], search=search,
+            order_by=order_by, descending=descending, limit=limit,
+            offset=offset, after=after)
 
     @classmethod
     def create(cls, process, container, volume):
@@ -1068,13 +1193,13 @@ class PoolComposition(Composition):
                      FROM qiita.pool_composition_components
                      WHERE output_pool_composition_id = %s"""
             TRN.add(sql, [self.id])
-            result = []
-            for res in TRN.execute_fetchindex():
-                result.append(
-                    {'composition': Composition.factory(
-                        res['input_composition_id']),
-                     'input_volume': res['volume'],
-                     'percentage_of_output': res['percentage']})
+            res = TRN.execute_fetchindex()
+            comps = Composition.factory_many(
+                [r['input_composition_id'] for r in res])
+            result = [{'composition': comp,
+                       'input_volume': r['volume'],
+                       'percentage_of_output': r['percentage']}
+                      for comp, r in zip(comps, res)]
         return result
 
     @property
@@ -1222,7 +1347,8 @@ class ShotgunPrimerSet(base.LabmanObject):
 
                 # Add the objects to the result list
                 result.extend([
-                    (PrimerSetComposition(r[0]), PrimerSetComposition(r[1]))
+                    (PrimerSetComposition._from_id(r[0]),
+                     PrimerSetComposition._from_id(r[1]))
                     for r in records])
 
                 # Compute the new index and update the database
@@ -1231,8 +1357,24 @@ class ShotgunPrimerSet(base.LabmanObject):
                          SET current_combo_index = %s
                          WHERE shotgun_primer_set_id = %s"""
                 TRN.add(sql, [new_idx, self.id])
+                TRN.update_cached_rows(
+                    self._table, self.id, 'current_combo_index', new_idx)
 
                 # Update n (loop invariant)
                 n = n - len(records)
 
         return result
+
+
+# Maps the composition type descriptions to the classes implementing them
+_COMPOSITION_CLASSES = {
+    'reagent': ReagentComposition,
+    'primer set': PrimerSetComposition,
+    'primer': PrimerComposition,
+    'sample': SampleComposition,
+    'gDNA': GDNAComposition,
+    '16S library prep': LibraryPrep16SComposition,
+    'compressed gDNA': CompressedGDNAComposition,
+    'normalized gDNA': NormalizedGDNAComposition,
+    'shotgun library prep': LibraryPrepShotgunComposition,
+    'pool': PoolComposition}
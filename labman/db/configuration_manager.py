@@ -10,6 +10,8 @@ from os import environ
 from os.path import expanduser, exists
 from datetime import datetime
 from configparser import ConfigParser
+from base64 import b64encode
+from uuid import uuid4
 
 
 class ConfigurationManager(object):
@@ -38,8 +40,19 @@ class ConfigurationManager(object):
         The host where the database lives
     port : int
         The port used to connect to the postgres database in the previous host
+    query_log : bool
+        If true, the executed queries are recorded
+    slow_query_threshold : float
+        The duration, in milliseconds, from which a query is logged as slow
+    pool_size : int
+        The maximum number of connections to the database opened by each
+        process
     qiita_server_cert : str
         If qiita enabled, the qiita server certificate
+    workers : int
+        The number of threads used by the webserver to run the heavy requests
+    cookie_secret : str
+        The secret used by the webserver to sign the cookies
 
     Raises
     ------
@@ -49,7 +62,8 @@ class ConfigurationManager(object):
     @staticmethod
     def create(config_fp, test_env, db_host, db_port, db_name, db_user,
                db_password, db_admin_user, db_admin_password, log_dir,
-               qiita_server_cert):
+               qiita_server_cert, workers=4, cookie_secret=None,
+               query_log=False, slow_query_threshold=500, pool_size=None):
         """Creates a new labman configuration file
 
         Parameters
@@ -78,7 +92,25 @@ class ConfigurationManager(object):
             Path to the log directory
         qiita_server_cert : str
             The qiita server certificate (for testing)
+        workers : int, optional
+            The number of threads used by the webserver to run the heavy
+            requests. Default: 4
+        cookie_secret : str, optional
+            The secret used by the webserver to sign the cookies. Default: a
+            new random secret
+        query_log : bool, optional
+            If true, the executed queries are recorded. Default: False
+        slow_query_threshold : float, optional
+            The duration, in milliseconds, from which a query is logged as
+            slow. Default: 500
+        pool_size : int, optional
+            The maximum number of connections to the database opened by each
+            process. Default: one per worker thread, plus one for the thread
+            serving the requests
         """
+        if cookie_secret is None:
+            cookie_secret = _generate_cookie_secret()
+
         with open(config_fp, 'w') as f:
             f.write(CONFIG_TEMPLATE % {
                 'test': test_env,
@@ -91,7 +123,12 @@ class ConfigurationManager(object):
                 'host': db_host,
                 'port': db_port,
                 'logdir': log_dir,
-                'qiita_cert': qiita_server_cert})
+                'qiita_cert': qiita_server_cert,
+                'workers': workers,
+                'cookie_secret': cookie_secret,
+                'query_log': query_log,
+                'slow_query_threshold': slow_query_threshold,
+                'pool_size': pool_size if pool_size is not None else ''})
 
     def __init__(self):
         # If conf_fp is None, we default to the test configuration file
@@ -119,6 +156,7 @@ class ConfigurationManager(object):
         self._get_main(config)
         self._get_postgres(config)
         self._get_qiita(config)
+        self._get_web(config)
 
     def _get_main(self, config):
         """Get the main configuration"""
@@ -141,10 +179,45 @@ class ConfigurationManager(object):
         self.database = config.get('postgres', 'DATABASE')
         self.host = config.get('postgres', 'HOST')
         self.port = config.getint('postgres', 'PORT')
+        # The query log options were added later, default to the previous
+        # behavior if the configuration file doesn't have them
+        self.query_log = config.getboolean(
+            'postgres', 'QUERY_LOG', fallback=False)
+        self.slow_query_threshold = config.getfloat(
+            'postgres', 'SLOW_QUERY_THRESHOLD', fallback=500)
 
     def _get_qiita(self, config):
         self.qiita_server_cert = config.get('qiita', 'SERVER_CERT')
 
+    def _get_web(self, config):
+        """Get the configuration of the web section"""
+        # The web section was added later, default to the previous behavior
+        # if the configuration file doesn't have it
+        self.workers = config.getint('web', 'WORKERS', fallback=4)
+        if self.workers < 1:
+            raise ValueError('The number of workers should be at least 1. '
+                             'Found: %s' % self.workers)
+        # If the secret is not in the configuration file, the users are logged
+        # out every time that the webserver is restarted
+        self.cookie_secret = (config.get('web', 'COOKIE_SECRET', fallback='')
+                              or _generate_cookie_secret())
+
+        # Each worker thread and the thread serving the requests use their
+        # own connection, so the pool can't be smaller than that
+        min_pool_size = self.workers + 1
+        pool_size = config.get('postgres', 'POOL_SIZE', fallback='')
+        self.pool_size = int(pool_size) if pool_size else min_pool_size
+        if self.pool_size < min_pool_size:
+            raise ValueError(
+                'The connection pool size should be at least the number of '
+                'workers plus one (%s). Found: %s'
+                % (min_pool_size, self.pool_size))
+
+
+def _generate_cookie_secret():
+    """Generates a new random secret to sign the cookies"""
+    return b64encode(uuid4().bytes + uuid4().bytes).decode('ascii')
+
 
 CONFIG_TEMPLATE = """# Configuration file generated by labman on %(date)s
 
@@ -162,8 +235,17 @@ ADMIN_PASSWORD=%(admin_password)s
 DATABASE=%(database)s
 HOST=%(host)s
 PORT=%(port)s
+QUERY_LOG=%(query_log)s
+SLOW_QUERY_THRESHOLD=%(slow_query_threshold)s
+# Maximum number of connections of each process. Default: WORKERS + 1
+POOL_SIZE=%(pool_size)s
 
 # ------------------------- QIITA SETTINGS ----------------------------------
 [qiita]
 SERVER_CERT=%(qiita_cert)s
+
+# ------------------------- WEB SETTINGS ------------------------------------
+[web]
+WORKERS=%(workers)s
+COOKIE_SECRET=%(cookie_secret)s
 """
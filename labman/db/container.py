@@ -16,6 +16,29 @@ from . import composition as composition_module
 LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
 
+def _format_well_id(row, col):
+    """Formats the well position in the "A1","H12" form
+
+    Parameters
+    ----------
+    row : int
+        The row number of the well, starting at 1
+    col : int
+        The column number of the well, starting at 1
+
+    Returns
+    -------
+    str
+        The well id
+    """
+    # Adapted from https://stackoverflow.com/a/19169180/3746629
+    result = []
+    while row:
+        row, rem = divmod(row-1, 26)
+        result[:0] = LETTERS[rem]
+    return ''.join(result) + str(col)
+
+
 class Container(base.LabmanObject):
     """Container object
 
@@ -39,35 +62,31 @@ class Container(base.LabmanObject):
         -------
         An instance of a subclass of Container
         """
-        factory_classes = {'tube': Tube, 'well': Well}
+        return Container.factory_many([container_id])[0]
 
-        with sql_connection.TRN as TRN:
-            sql = """SELECT description
-                     FROM qiita.container_type
-                        JOIN qiita.container USING (container_type_id)
-                     WHERE container_id = %s"""
-            TRN.add(sql, [container_id])
-            c_type = TRN.execute_fetchlast()
-            constructor = factory_classes[c_type]
-
-            sql = """SELECT {}
-                     FROM {}
-                     WHERE container_id = %s""".format(
-                        constructor._id_column, constructor._table)
-            TRN.add(sql, [container_id])
-            subclass_id = TRN.execute_fetchlast()
-            instance = constructor(subclass_id)
-
-        return instance
+    @staticmethod
+    def factory_many(container_ids):
+        """Initializes the correct container subclass of multiple ids
+
+        Parameters
+        ----------
+        container_ids : list of int
+            The container ids
+
+        Returns
+        -------
+        list of instances of subclasses of Container
+            The containers, in the same order as `container_ids`
+        """
+        return base._factory_many(
+            container_ids, 'qiita.container', 'container_id',
+            'container_type_id', _CONTAINER_CLASSES)
 
     @classmethod
     def _common_creation_steps(cls, process, remaining_volume):
         with sql_connection.TRN as TRN:
-            sql = """SELECT container_type_id
-                     FROM qiita.container_type
-                     WHERE description = %s"""
-            TRN.add(sql, [cls._container_type])
-            ct_id = TRN.execute_fetchlast()
+            ct_id = base.get_lookup_id(
+                'qiita.container_type', cls._container_type)
 
             sql = """INSERT INTO qiita.container
                         (container_type_id, latest_upstream_process_id,
@@ -92,14 +111,7 @@ class Container(base.LabmanObject):
         Object
             The attribute
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT {}
-                     FROM qiita.container
-                        JOIN {} USING (container_id)
-                     WHERE {} = %s""".format(attr, self._table,
-                                             self._id_column)
-            TRN.add(sql, [self.id])
-            return TRN.execute_fetchlast()
+        return self._get_row_attr(attr, 'qiita.container', 'container_id')
 
     @property
     def remaining_volume(self):
@@ -251,6 +263,57 @@ class Well(Container):
             well_id = TRN.execute_fetchlast()
         return cls(well_id)
 
+    @classmethod
+    def create_many(cls, plate, process, volume, positions):
+        """Creates multiple wells in a plate using a single query
+
+        Parameters
+        ----------
+        plate: labman.db.Plate
+            The plate to which the wells belong to
+        process: labman.db.Process
+            The process that generated the wells
+        volume : float
+            The initial volume of the wells
+        positions : list of (int, int)
+            The (row, column) positions of the new wells
+
+        Returns
+        -------
+        list of labman.db.Well
+            The newly created wells, sorted by id
+        """
+        if not positions:
+            return []
+
+        rows, cols = zip(*positions)
+        with sql_connection.TRN as TRN:
+            # The container ids are drawn from the sequence beforehand so
+            # the container and well rows can be inserted in the same query
+            sql = """WITH new_wells AS (
+                        SELECT nextval(pg_get_serial_sequence(
+                                    'qiita.container', 'container_id'))
+                                AS container_id, row_num, col_num
+                        FROM (SELECT unnest(%s::integer[]) AS row_num,
+                                     unnest(%s::integer[]) AS col_num) AS p),
+                     new_containers AS (
+                        INSERT INTO qiita.container
+                            (container_id, container_type_id,
+                             latest_upstream_process_id, remaining_volume)
+                        SELECT container_id, %s, %s, %s
+                        FROM new_wells)
+                     INSERT INTO qiita.well
+                        (container_id, plate_id, row_num, col_num)
+                     SELECT container_id, %s, row_num, col_num
+                     FROM new_wells
+                     RETURNING well_id"""
+            ct_id = base.get_lookup_id(
+                'qiita.container_type', cls._container_type)
+            TRN.add(sql, [list(rows), list(cols), ct_id, process.process_id,
+                          volume, plate.id])
+            well_ids = sorted(TRN.execute_fetchflatten())
+        return [cls._from_id(well_id) for well_id in well_ids]
+
     @property
     def plate(self):
         """The plate the well belongs to"""
@@ -269,11 +332,8 @@ class Well(Container):
     @property
     def well_id(self):
         """The well id in the "A1","H12" form"""
-        row = self.row
-        col = self.column
-        # Adapted from https://stackoverflow.com/a/19169180/3746629
-        result = []
-        while row:
-            row, rem = divmod(row-1, 26)
-            result[:0] = LETTERS[rem]
-        return ''.join(result) + str(col)
+        return _format_well_id(self.row, self.column)
+
+
+# Maps the container type descriptions to the classes implementing them
+_CONTAINER_CLASSES = {'tube': Tube, 'well': Well}
@@ -93,6 +93,10 @@ class Equipment(base.LabmanObject):
             sql = "INSERT INTO qiita.equipment_type (description) VALUES (%s)"
             TRN.add(sql, [description])
             TRN.execute()
+            # Make sure that the new type is available in the lookup cache,
+            # and that it is not kept in there if the transaction fails
+            base.clear_lookup_tables()
+            TRN.add_post_rollback_func(base.clear_lookup_tables)
 
     @classmethod
     def create(cls, equipment_type, external_id, notes=None):
@@ -121,19 +125,9 @@ class Equipment(base.LabmanObject):
         """
         with sql_connection.TRN as TRN:
             # Check if the equipment type exists by getting his id
-            sql = """SELECT equipment_type_id
-                     FROM qiita.equipment_type
-                     WHERE description = %s"""
-            TRN.add(sql, [equipment_type])
-            res = TRN.execute_fetchindex()
-            if res:
-                # Fetchindex returns a list of results. If the previous call
-                # didn't return anything the list would be empty, and accessing
-                # to this values would've generated and IndexError. By the DB
-                # constraints, the above query can at most return one result
-                # with a single value, hence the [0][0]
-                equipment_type_id = res[0][0]
-            else:
+            equipment_type_id = base.get_lookup_id(
+                'qiita.equipment_type', equipment_type)
+            if equipment_type_id is None:
                 raise exceptions.LabmanUnknownIdError(
                     'Equipment type', equipment_type)
 
@@ -0,0 +1,184 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import sys
+import logging
+from collections import deque
+from datetime import datetime
+from json import dumps
+from os.path import dirname, abspath, join, relpath
+from threading import Lock
+
+from . import settings
+
+
+_LABMAN_DIR = dirname(dirname(abspath(__file__)))
+# The frames of these files are skipped when looking for the call site of a
+# query, as they are executing the queries on behalf of other labman code
+_SKIP_FILES = {join(_LABMAN_DIR, 'db', 'sql_connection.py'),
+               join(_LABMAN_DIR, 'db', 'base.py'),
+               abspath(__file__)}
+
+
+def get_call_site():
+    """Returns the labman code that is executing the current query
+
+    Returns
+    -------
+    str or None
+        The call site, in the form "file:line (function)". None if the query
+        is not executed from labman's code
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if (filename.startswith(_LABMAN_DIR) and
+                filename not in _SKIP_FILES and
+                not (code.co_name.startswith('_get_') and
+                     code.co_name.endswith('attr'))):
+            return '%s:%d (%s)' % (relpath(filename, _LABMAN_DIR),
+                                   frame.f_lineno, code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class QueryLog(object):
+    """Records the queries executed by the transactions of the process
+
+    The log keeps the most recent queries, the slowest queries and
+    aggregated statistics per call site and per request, so the places that
+    execute too many queries (e.g. N+1 patterns) can be found. The slow
+    queries are also sent to the "labman.queries" logger as JSON.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether the queries should be recorded
+    slow_query_threshold : float
+        The duration, in milliseconds, from which a query is considered slow
+    maxlen : int, optional
+        The maximum number of queries, slow queries and requests kept.
+        Default: 200
+    """
+    def __init__(self, enabled, slow_query_threshold, maxlen=200):
+        self.enabled = enabled
+        self.slow_query_threshold = slow_query_threshold
+        self._maxlen = maxlen
+        self._lock = Lock()
+        self._logger = logging.getLogger('labman.queries')
+        self.reset()
+
+    def reset(self):
+        """Removes all the recorded information"""
+        with self._lock:
+            self._queries = deque(maxlen=self._maxlen)
+            self._slow_queries = deque(maxlen=self._maxlen)
+            self._requests = deque(maxlen=self._maxlen)
+            self._call_sites = {}
+
+    def record_query(self, sql, duration, rows, call_site, count=1):
+        """Records the execution of a query
+
+        Parameters
+        ----------
+        sql : str
+            The query
+        duration : float
+            The time spent executing the query, in seconds
+        rows : int
+            The number of rows returned or affected by the query
+        call_site : str
+            The labman code that executed the query
+        count : int, optional
+            The number of queries executed, if the query was executed in a
+            batch. Default: 1
+        """
+        duration = duration * 1000
+        entry = {'timestamp': datetime.now().isoformat(),
+                 'sql': ' '.join(sql.split()),
+                 'duration_ms': round(duration, 3),
+                 'rows': rows,
+                 'count': count,
+                 'call_site': call_site}
+        slow = duration >= self.slow_query_threshold
+        with self._lock:
+            self._queries.append(entry)
+            stats = self._call_sites.get(call_site)
+            if stats is None:
+                stats = self._call_sites[call_site] = {
+                    'call_site': call_site, 'count': 0, 'total_ms': 0.0,
+                    'max_ms': 0.0, 'rows': 0}
+            stats['count'] += count
+            stats['total_ms'] += duration
+            stats['max_ms'] = max(stats['max_ms'], duration)
+            stats['rows'] += max(rows, 0)
+            if slow:
+                self._slow_queries.append(entry)
+
+        if slow:
+            self._logger.warning(dumps(dict(entry, event='slow_query')))
+
+    def record_request(self, method, path, status, queries, db_time):
+        """Records the queries executed during an HTTP request
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the request
+        path : str
+            The path of the request
+        status : int
+            The HTTP status of the response
+        queries : int
+            The number of queries executed during the request
+        db_time : float
+            The time spent executing the queries, in seconds
+        """
+        entry = {'timestamp': datetime.now().isoformat(),
+                 'method': method,
+                 'path': path,
+                 'status': status,
+                 'queries': queries,
+                 'db_time_ms': round(db_time * 1000, 3)}
+        with self._lock:
+            self._requests.append(entry)
+        self._logger.info(dumps(dict(entry, event='request')))
+
+    def summary(self, limit=50):
+        """Returns the information recorded
+
+        Parameters
+        ----------
+        limit : int, optional
+            The maximum number of elements of each list. Default: 50
+
+        Returns
+        -------
+        dict
+            The call sites sorted by number of queries, the slowest queries,
+            and the most recent queries and requests
+        """
+        with self._lock:
+            call_sites = sorted(self._call_sites.values(),
+                                key=lambda x: (-x['count'], -x['total_ms']))
+            slow_queries = sorted(self._slow_queries,
+                                  key=lambda x: -x['duration_ms'])
+            queries = list(self._queries)[::-1]
+            requests = list(self._requests)[::-1]
+        return {'enabled': self.enabled,
+                'slow_query_threshold': self.slow_query_threshold,
+                'call_sites': [dict(cs) for cs in call_sites[:limit]],
+                'slow_queries': slow_queries[:limit],
+                'queries': queries[:limit],
+                'requests': requests[:limit]}
+
+
+# Singleton pattern, create the query log for the entire process
+QUERY_LOG = QueryLog(settings.labman_settings.query_log,
+                     settings.labman_settings.slow_query_threshold)
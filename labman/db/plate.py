@@ -8,11 +8,52 @@
 
 from collections import defaultdict
 
+import numpy as np
+
 from . import base
 from . import sql_connection
 from . import container as container_module
 from . import exceptions as exceptions_module
 from . import process as process_module
+from . import composition as composition_module
+from . import study as study_module
+
+
+def _get_plates_studies(plate_ids):
+    """Returns the studies of the samples contained in the given plates
+
+    The studies are found through the lineage of the compositions of the
+    plates, so the same query works for all plate types
+
+    Parameters
+    ----------
+    plate_ids : list of int
+        The plate ids
+
+    Returns
+    -------
+    dict of {int: list of (int, str)}
+        The study id and title of the studies in each plate, sorted by title.
+        Plates without studies are not included in the dict
+    """
+    if not plate_ids:
+        return {}
+    with sql_connection.TRN as TRN:
+        sql = """SELECT DISTINCT plate_id, study_id, study_title
+                 FROM qiita.well
+                    JOIN qiita.composition USING (container_id)
+                    JOIN qiita.composition_lineage l USING (composition_id)
+                    JOIN qiita.sample_composition sc
+                        ON l.sample_composition_id = sc.sample_composition_id
+                    JOIN qiita.study_sample USING (sample_id)
+                    JOIN qiita.study USING (study_id)
+                 WHERE plate_id IN %s
+                 ORDER BY plate_id, study_title"""
+        TRN.add(sql, [tuple(plate_ids)])
+        res = defaultdict(list)
+        for plate_id, study_id, title in TRN.execute_fetchindex():
+            res[plate_id].append((study_id, title))
+        return dict(res)
 
 
 class PlateConfiguration(base.LabmanObject):
@@ -110,9 +151,14 @@ class Plate(base.LabmanObject):
 
     @staticmethod
     def search(samples=None, plate_notes=None, well_notes=None,
-               query_type='INTERSECT'):
+               query_type='INTERSECT', partial_sample_match=False,
+               limit=None, offset=None):
         """Search plates
 
+        The plates are sorted by relevance: the fraction of the samples
+        found in the plate plus the full-text rank of the plate and well
+        notes matching the keywords.
+
         Parameters
         ----------
         samples: list of str, optional
@@ -124,6 +170,19 @@ class Plate(base.LabmanObject):
         query_type : {INTERSECT, UNION}
             Whether to return the results that fullfill all of the search
             restrictions or just one of them. Defaul: INTERSECT
+        partial_sample_match : bool, optional
+            If true, find the plates with samples whose id contains any of
+            the strings in `samples`, rather than the exact ids.
+            Default: False
+        limit : int, optional
+            The maximum number of plates to return. Default: all of them
+        offset : int, optional
+            The number of plates to skip
+
+        Returns
+        -------
+        labman.db.base.ListPage of labman.db.plate.Plate
+            The plates found, with the total number of plates found
         """
         if samples is None and plate_notes is None and well_notes is None:
             raise ValueError(
@@ -135,45 +194,89 @@ class Plate(base.LabmanObject):
                              ' %s' % query_type)
 
         with sql_connection.TRN as TRN:
+            # Each query returns the plates matching one of the restrictions
+            # and their rank. The notes are searched through the tsvector
+            # columns (GIN indexes) and the partial sample ids through the
+            # trigram index of sample_composition.sample_id
             sql_queries = []
             sql_args = []
             if samples:
+                if partial_sample_match:
+                    sql_where = ' OR '.join(
+                        ['sample_id ILIKE %s'] * len(samples))
+                    where_args = ['%%%s%%' % base._escape_like(s)
+                                  for s in samples]
+                else:
+                    sql_where = 'sample_id IN %s'
+                    where_args = [tuple(samples)]
                 sql_queries.append(
-                    """SELECT DISTINCT plate_id
-                       FROM qiita.well
-                            JOIN qiita.composition USING (container_id)
-                            JOIN qiita.sample_composition
-                                USING (composition_id)
-                       WHERE sample_id IN %s""")
-                sql_args.append(tuple(samples))
+                    """SELECT plate_id,
+                              COUNT(DISTINCT sample_id)::real / %s AS rank
+                       FROM qiita.sample_composition
+                            JOIN qiita.composition USING (composition_id)
+                            JOIN qiita.well USING (container_id)
+                       WHERE {}
+                       GROUP BY plate_id""".format(sql_where))
+                sql_args.append(len(samples))
+                sql_args.extend(where_args)
             if plate_notes:
                 sql_queries.append(
-                    """SELECT plate_id
-                       FROM qiita.plate
-                       WHERE notes @@ to_tsquery(%s)""")
-                sql_args.append(
-                    ' & '.join([w for w in plate_notes.split()]))
+                    """SELECT plate_id, ts_rank(notes_tsv, q) AS rank
+                       FROM qiita.plate,
+                            plainto_tsquery('english', %s) AS q
+                       WHERE notes_tsv @@ q""")
+                sql_args.append(plate_notes)
             if well_notes:
                 sql_queries.append(
-                    """SELECT plate_id
-                       FROM qiita.well
-                            JOIN qiita.composition USING (container_id)
-                       WHERE notes @@ to_tsquery(%s)""")
-                sql_args.append(
-                    ' & '.join([w for w in well_notes.split()]))
-
-            if len(sql_queries) > 1:
-                sql = (" %s " % query_type).join(sql_queries)
+                    """SELECT plate_id, MAX(ts_rank(notes_tsv, q)) AS rank
+                       FROM qiita.composition
+                            JOIN qiita.well USING (container_id),
+                            plainto_tsquery('english', %s) AS q
+                       WHERE notes_tsv @@ q
+                       GROUP BY plate_id""")
+                sql_args.append(well_notes)
+
+            if not sql_queries:
+                return base.ListPage([], 0, 0)
+
+            sql_having = ''
+            if query_type == 'INTERSECT':
+                sql_having = 'HAVING COUNT(*) = %s'
+                sql_args.append(len(sql_queries))
+            sql = """SELECT plate_id, SUM(rank) AS rank
+                     FROM ({}) AS matches
+                     GROUP BY plate_id
+                     {}""".format(' UNION ALL '.join(sql_queries),
+                                  sql_having)
+            sql_page = """SELECT plate_id, COUNT(*) OVER () AS total
+                          FROM ({}) AS plates
+                          ORDER BY rank DESC, plate_id""".format(sql)
+            page_args = list(sql_args)
+            if limit is not None:
+                sql_page += ' LIMIT %s'
+                page_args.append(limit)
+            if offset:
+                sql_page += ' OFFSET %s'
+                page_args.append(offset)
+            TRN.add(sql_page, page_args)
+            res = TRN.execute_fetchindex()
+            if res:
+                total = res[0]['total']
+            elif offset:
+                # The page is past the last plate found
+                TRN.add("SELECT COUNT(*) FROM ({}) AS plates".format(sql),
+                        sql_args)
+                total = TRN.execute_fetchlast()
             else:
-                sql = sql_queries[0]
-            TRN.add(sql, sql_args)
-            res = [Plate(pid) for pid in TRN.execute_fetchflatten()]
-        return res
+                total = 0
+            return base.ListPage([Plate._from_id(pid) for pid, _ in res],
+                                 total, total)
 
     @staticmethod
     def list_plates(plate_types=None, only_quantified=False,
                     include_discarded=False,
-                    include_study_titles=False):
+                    include_study_titles=False, search=None, order_by=None,
+                    descending=False, limit=None, offset=None, after=None):
         """Generates a list of plates with some information about them
 
         Parameters
@@ -188,58 +291,77 @@ class Plate(base.LabmanObject):
             included in this list, otherwise they won't.
         include_study_titles: bool, optional
             If true, return also the studies included in each plate
+        search : str, optional
+            If provided, return only the plates whose id or external id
+            contain the given term
+        order_by : {'plate_id', 'external_id'}, optional
+            The column used to sort the plates. Default: plate_id
+        descending : bool, optional
+            Whether to sort the plates in descending order. Default: False
+        limit : int, optional
+            The maximum number of plates to return. Default: all of them
+        offset : int, optional
+            The number of plates to skip
+        after : list, optional
+            The values of `order_by` and plate_id of the last plate of the
+            previous page
 
         Returns
         -------
-        list of dicts
+        labman.db.base.ListPage of dicts
             The list of plate information with the structure:
             [{'plate_id': int, 'external_id': string}]
+
+        See Also
+        --------
+        labman.db.base.list_page
         """
-        with sql_connection.TRN as TRN:
-            sql_where, sql_discard, sql_plate_types = '', '', ''
+        with sql_connection.TRN:
+            sql_conditions = ['w.plate_id = p.plate_id']
             sql_args = []
             sql_join = ''
+            sql_discard = ''
 
             # do not include discarded plates
             if not include_discarded:
-                sql_discard = 'discarded = FALSE '
+                sql_discard = 'discarded = FALSE AND'
 
             # Not using if plate_type is not None cause I also want to cover
             # the case in which the list is empty
-            sql_studies = ''
             if plate_types:
-                sql_plate_types = 'description IN %s'
+                sql_conditions.append('description IN %s')
                 sql_args.append(tuple(plate_types))
 
-            # The WHERE clause is only needed if we have to filter plates
-            # (which may depend on multiple conditions)
-            if sql_discard != '' or sql_plate_types != '':
-                sql_where = 'WHERE '
-                if sql_discard != '' and sql_plate_types != '':
-                    sql_where += sql_discard + ' AND ' + sql_plate_types
-                else:
-                    sql_where += sql_discard + ' ' + sql_plate_types
-
             if only_quantified:
                 sql_join = ("JOIN qiita.concentration_calculation "
                             "ON quantitated_composition_id = composition_id")
+
+            # The contents of the plates are checked with EXISTS, so the
+            # plates can be read in order without checking all their wells
+            sql = """SELECT plate_id, external_id
+                     FROM qiita.plate p
+                     WHERE {} EXISTS (
+                        SELECT 1
+                        FROM qiita.well w
+                            JOIN qiita.composition USING (container_id)
+                            JOIN qiita.composition_type
+                                USING (composition_type_id)
+                            {}
+                        WHERE {})""".format(sql_discard, sql_join,
+                                            ' AND '.join(sql_conditions))
+            res = base.list_page(
+                sql, sql_args, 'plate_id', ['plate_id', 'external_id'],
+                search=search, order_by=order_by, descending=descending,
+                limit=limit, offset=offset, after=after)
+
             if include_study_titles:
-                sql_studies = (', qiita.get_plate_studies(p.plate_id) '
-                               'AS studies')
-
-            sql = """SELECT p.plate_id, p.external_id {}
-                        FROM (SELECT DISTINCT plate_id, external_id
-                              FROM qiita.plate
-                                JOIN qiita.well USING (plate_id)
-                                JOIN qiita.composition USING (container_id)
-                                JOIN qiita.composition_type USING
-                                    (composition_type_id)
-                                {}
-                             {}) AS p
-                     ORDER BY plate_id""".format(sql_studies, sql_join,
-                                                 sql_where)
-            TRN.add(sql, sql_args)
-            return [dict(r) for r in TRN.execute_fetchindex()]
+                # The studies of all the plates are retrieved at once, rather
+                # than walking the lineage of each plate separately
+                studies = _get_plates_studies([r['plate_id'] for r in res])
+                for r in res:
+                    titles = [t for _, t in studies.get(r['plate_id'], [])]
+                    r['studies'] = titles if titles else None
+            return res
 
     @staticmethod
     def external_id_exists(external_id):
@@ -339,10 +461,38 @@ class Plate(base.LabmanObject):
             TRN.add(sql, [self.id])
 
             for well_id, row, col in TRN.execute_fetchindex():
-                layout[row-1][col-1] = container_module.Well(well_id)
+                layout[row-1][col-1] = container_module.Well._from_id(well_id)
 
         return layout
 
+    def layout_view(self):
+        """Returns an array-backed view of the layout of the plate
+
+        All the information of the wells is retrieved in a single query, and
+        the Well objects are only created when requested
+
+        Returns
+        -------
+        PlateLayoutView
+        """
+        with sql_connection.TRN as TRN:
+            pc = self.plate_configuration
+            sql = """SELECT well_id, row_num, col_num, container_id,
+                            composition_id, ct.description, sample_id,
+                            content, c.notes
+                     FROM qiita.well
+                        LEFT JOIN qiita.composition c USING (container_id)
+                        LEFT JOIN qiita.composition_type ct
+                            USING (composition_type_id)
+                        LEFT JOIN qiita.sample_composition
+                            USING (composition_id)
+                     WHERE plate_id = %s
+                     ORDER BY row_num, col_num"""
+            TRN.add(sql, [self.id])
+            data = np.array([tuple(r) for r in TRN.execute_fetchindex()],
+                            dtype=PlateLayoutView.dtype)
+            return PlateLayoutView(pc.num_rows, pc.num_columns, data)
+
     @property
     def studies(self):
         """The studies present in the plate
@@ -351,15 +501,8 @@ class Plate(base.LabmanObject):
         -------
         set of labman.db.study.Study
         """
-        with sql_connection.TRN as TRN:
-            sql = "SELECT well_id FROM qiita.well WHERE plate_id = %s"
-            TRN.add(sql, [self.id])
-            res = set(container_module.Well(well_id).composition.study
-                      for well_id in TRN.execute_fetchflatten())
-            # If there are controls, those return None as the study, remove it
-            # from the list
-            res.discard(None)
-        return res
+        studies = _get_plates_studies([self.id]).get(self.id, [])
+        return set(study_module.Study(s_id) for s_id, _ in studies)
 
     @property
     def process(self):
@@ -510,29 +653,255 @@ class Plate(base.LabmanObject):
 
         Returns
         -------
-        dict of {well: list of plates}
-            The wells that contain samples that have been previously plated
-            and the plates in which they're found
+        list of (int, int, int, str)
+            The row and column of the wells that contain samples that have
+            been plated in other plates, and the id and external id of the
+            other plate. A well is listed once for each of the other plates,
+            sorted by row, column and plate id
         """
         with sql_connection.TRN as TRN:
-            sql = """SELECT plate_id, array_agg(sample_id)
-                     FROM qiita.sample_composition
-                        JOIN qiita.composition USING (composition_id)
-                        JOIN qiita.well USING (container_id)
-                     WHERE plate_id <> %s AND sample_id IN (
-                        SELECT sample_id
-                        FROM qiita.sample_composition
-                            JOIN qiita.composition USING (composition_id)
-                            JOIN qiita.well USING (container_id)
-                            WHERE plate_id = %s)
-                     GROUP BY plate_id"""
+            # The other wells of the samples are found through the index on
+            # sample_composition.sample_id
+            sql = """SELECT DISTINCT w.row_num, w.col_num, ow.plate_id,
+                                     p.external_id
+                     FROM qiita.well w
+                        JOIN qiita.composition c USING (container_id)
+                        JOIN qiita.sample_composition sc USING (composition_id)
+                        JOIN qiita.sample_composition osc
+                            ON osc.sample_id = sc.sample_id
+                        JOIN qiita.composition oc
+                            ON oc.composition_id = osc.composition_id
+                        JOIN qiita.well ow ON ow.container_id = oc.container_id
+                        JOIN qiita.plate p ON p.plate_id = ow.plate_id
+                     WHERE w.plate_id = %s AND ow.plate_id <> %s
+                     ORDER BY w.row_num, w.col_num, ow.plate_id"""
             TRN.add(sql, [self.id, self.id])
-            prev_plated = TRN.execute_fetchindex()
-            res = defaultdict(list)
-            for plate_id, samples in prev_plated:
-                plate = Plate(plate_id)
-                for sample in samples:
-                    for well in self.get_wells_by_sample(sample):
-                        res[well].append(plate)
-            res = {well: list(set(plates)) for well, plates in res.items()}
-        return res
+            return [tuple(r) for r in TRN.execute_fetchindex()]
+
+    def summary(self):
+        """Returns the information shown in the plate editor
+
+        All the information is retrieved in a single query, and no Well or
+        Plate objects are created
+
+        Returns
+        -------
+        dict
+            The plate information, with the keys:
+            - 'plate_id': int
+            - 'external_id': str
+            - 'discarded': bool
+            - 'notes': str or None
+            - 'plate_configuration': (int, str, int, int), the id,
+            description, number of rows and number of columns of the
+            plate configuration
+            - 'studies': list of int, the sorted ids of the studies present
+            in the plate
+            - 'duplicates': list of (int, int, str), the row, column and
+            content of the wells with duplicated samples, sorted by sample,
+            row and column
+            - 'previous_plates': list of (int, int, int, str), the same as
+            `get_previously_plated_wells`
+            - 'unknowns': list of (int, int), the row and column of the
+            wells holding unknown samples
+        """
+        with sql_connection.TRN as TRN:
+            sql = """WITH wells AS (
+                        SELECT w.row_num, w.col_num, c.composition_id,
+                               sc.sample_id, sc.content,
+                               sct.external_id AS sample_type
+                        FROM qiita.well w
+                            JOIN qiita.composition c USING (container_id)
+                            LEFT JOIN qiita.sample_composition sc
+                                USING (composition_id)
+                            LEFT JOIN qiita.sample_composition_type sct
+                                USING (sample_composition_type_id)
+                        WHERE w.plate_id = %(plate_id)s),
+                    studies AS (
+                        SELECT DISTINCT ss.study_id
+                        FROM wells
+                            JOIN qiita.composition_lineage l
+                                USING (composition_id)
+                            JOIN qiita.sample_composition lsc
+                                ON l.sample_composition_id =
+                                    lsc.sample_composition_id
+                            JOIN qiita.study_sample ss
+                                ON ss.sample_id = lsc.sample_id),
+                    duplicates AS (
+                        SELECT row_num, col_num, content, sample_id
+                        FROM (SELECT row_num, col_num, content, sample_id,
+                                     COUNT(*) OVER (
+                                        PARTITION BY sample_id) AS num
+                              FROM wells
+                              WHERE sample_id IS NOT NULL) AS d
+                        WHERE num > 1),
+                    previous AS (
+                        SELECT DISTINCT w.row_num, w.col_num, ow.plate_id,
+                                        op.external_id
+                        FROM wells w
+                            JOIN qiita.sample_composition osc
+                                ON osc.sample_id = w.sample_id
+                            JOIN qiita.composition oc
+                                ON oc.composition_id = osc.composition_id
+                            JOIN qiita.well ow
+                                ON ow.container_id = oc.container_id
+                            JOIN qiita.plate op ON op.plate_id = ow.plate_id
+                        WHERE ow.plate_id <> %(plate_id)s)
+                SELECT p.plate_id, p.external_id, p.discarded, p.notes,
+                       pc.plate_configuration_id, pc.description,
+                       pc.num_rows, pc.num_columns,
+                       ARRAY(SELECT study_id FROM studies
+                             ORDER BY study_id) AS studies,
+                       (SELECT json_agg(d ORDER BY d.sample_id, d.row_num,
+                                                   d.col_num)
+                        FROM duplicates d) AS duplicates,
+                       (SELECT json_agg(pw ORDER BY pw.row_num, pw.col_num,
+                                                    pw.plate_id)
+                        FROM previous pw) AS previous_plates,
+                       (SELECT json_agg(u ORDER BY u.row_num, u.col_num)
+                        FROM (SELECT row_num, col_num
+                              FROM wells
+                              WHERE sample_type = 'experimental sample'
+                                AND sample_id IS NULL) AS u) AS unknowns
+                FROM qiita.plate p
+                    JOIN qiita.plate_configuration pc
+                        USING (plate_configuration_id)
+                WHERE p.plate_id = %(plate_id)s"""
+            TRN.add(sql, {'plate_id': self.id})
+            res = TRN.execute_fetchindex()[0]
+
+        # json_agg returns NULL when there are no rows to aggregate
+        return {'plate_id': res['plate_id'],
+                'external_id': res['external_id'],
+                'discarded': res['discarded'],
+                'notes': res['notes'],
+                'plate_configuration': (
+                    res['plate_configuration_id'], res['description'],
+                    res['num_rows'], res['num_columns']),
+                'studies': res['studies'],
+                'duplicates': [(d['row_num'], d['col_num'], d['content'])
+                               for d in res['duplicates'] or []],
+                'previous_plates': [
+                    (p['row_num'], p['col_num'], p['plate_id'],
+                     p['external_id'])
+                    for p in res['previous_plates'] or []],
+                'unknowns': [(u['row_num'], u['col_num'])
+                             for u in res['unknowns'] or []]}
+
+
+class PlateLayoutView(object):
+    """Array-backed view of the layout of a plate
+
+    Parameters
+    ----------
+    num_rows : int
+        The number of rows of the plate
+    num_columns : int
+        The number of columns of the plate
+    data : numpy structured array
+        The information of the wells in the plate, sorted by row and column,
+        with the fields described in `PlateLayoutView.dtype`
+
+    Attributes
+    ----------
+    num_rows
+    num_columns
+    data
+
+    Methods
+    -------
+    get_well
+    get_composition
+    matrix
+    """
+    dtype = np.dtype([('well_id', np.int64), ('row', np.int32),
+                      ('col', np.int32), ('container_id', np.int64),
+                      ('composition_id', object),
+                      ('composition_type', object), ('sample_id', object),
+                      ('content', object), ('notes', object)])
+
+    def __init__(self, num_rows, num_columns, data):
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.data = data
+        self._index = {(r, c): i
+                       for i, (r, c) in enumerate(zip(data['row'],
+                                                      data['col']))}
+        self._wells = {}
+        self._compositions = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def _record(self, row, col):
+        idx = self._index.get((row, col))
+        return None if idx is None else self.data[idx]
+
+    def get_well(self, row, col):
+        """Returns the well in the given position
+
+        Parameters
+        ----------
+        row : int
+            The row of the well, starting at 1
+        col : int
+            The column of the well, starting at 1
+
+        Returns
+        -------
+        labman.db.container.Well or None
+            The well, or None if the position is empty
+        """
+        if (row, col) not in self._wells:
+            rec = self._record(row, col)
+            self._wells[(row, col)] = (
+                None if rec is None
+                else container_module.Well._from_id(int(rec['well_id'])))
+        return self._wells[(row, col)]
+
+    def get_composition(self, row, col):
+        """Returns the composition held in the given position
+
+        Parameters
+        ----------
+        row : int
+            The row of the well, starting at 1
+        col : int
+            The column of the well, starting at 1
+
+        Returns
+        -------
+        labman.db.composition.Composition or None
+            The composition, or None if the position is empty
+        """
+        if (row, col) not in self._compositions:
+            rec = self._record(row, col)
+            comp = None
+            if rec is not None and rec['composition_id'] is not None:
+                comp = composition_module.Composition.factory(
+                    rec['composition_id'])
+            self._compositions[(row, col)] = comp
+        return self._compositions[(row, col)]
+
+    def matrix(self, field, fill=None):
+        """Returns the values of a field as a 2D matrix
+
+        Parameters
+        ----------
+        field : str
+            The field of `PlateLayoutView.dtype` to return
+        fill : object, optional
+            The value used for the empty positions. Default: None
+
+        Returns
+        -------
+        numpy.ndarray
+            A num_rows x num_columns array with the field values
+        """
+        result = np.full((self.num_rows, self.num_columns), fill,
+                         dtype=object)
+        result[self.data['row'] - 1, self.data['col'] - 1] = self.data[field]
+        return result
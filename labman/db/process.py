@@ -6,9 +6,12 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import csv
 from datetime import date, datetime
+from heapq import merge
 from io import StringIO
-from itertools import chain
+from itertools import chain, groupby
+from operator import itemgetter
 import re
 from json import dumps
 
@@ -47,52 +50,32 @@ class Process(base.LabmanObject):
         -------
         An instance of a subclass of Process
         """
-        factory_classes = {
-            # 'primer template creation': TODO,
-            'primer working plate creation': PrimerWorkingPlateCreationProcess,
-            'sample plating': SamplePlatingProcess,
-            'reagent creation': ReagentCreationProcess,
-            'gDNA extraction': GDNAExtractionProcess,
-            '16S library prep': LibraryPrep16SProcess,
-            'shotgun library prep': LibraryPrepShotgunProcess,
-            'quantification': QuantificationProcess,
-            'gDNA normalization': NormalizationProcess,
-            'compress gDNA plates': GDNAPlateCompressionProcess,
-            'pooling': PoolingProcess,
-            'sequencing': SequencingProcess}
+        return Process.factory_many([process_id])[0]
 
-        with sql_connection.TRN as TRN:
-            sql = """SELECT description
-                     FROM qiita.process_type
-                        JOIN qiita.process USING (process_type_id)
-                     WHERE process_id = %s"""
-            TRN.add(sql, [process_id])
-            p_type = TRN.execute_fetchlast()
-            constructor = factory_classes[p_type]
-
-            if constructor._table == 'qiita.process':
-                instance = constructor(process_id)
-            else:
-                sql = """SELECT {}
-                         FROM {}
-                         WHERE process_id = %s""".format(
-                            constructor._id_column, constructor._table)
-                TRN.add(sql, [process_id])
-                subclass_id = TRN.execute_fetchlast()
-                instance = constructor(subclass_id)
+    @staticmethod
+    def factory_many(process_ids):
+        """Initializes the correct Process subclass of multiple ids
 
-        return instance
+        Parameters
+        ----------
+        process_ids : list of int
+            The process ids
+
+        Returns
+        -------
+        list of instances of subclasses of Process
+            The processes, in the same order as `process_ids`
+        """
+        return base._factory_many(
+            process_ids, 'qiita.process', 'process_id', 'process_type_id',
+            _PROCESS_CLASSES)
 
     @classmethod
     def _common_creation_steps(cls, user, process_date=None):
         if process_date is None:
             process_date = date.today()
         with sql_connection.TRN as TRN:
-            sql = """SELECT process_type_id
-                     FROM qiita.process_type
-                     WHERE description = %s"""
-            TRN.add(sql, [cls._process_type])
-            pt_id = TRN.execute_fetchlast()
+            pt_id = base.get_lookup_id('qiita.process_type', cls._process_type)
 
             sql = """INSERT INTO qiita.process
                         (process_type_id, run_date, run_personnel_id)
@@ -102,6 +85,160 @@ class Process(base.LabmanObject):
             p_id = TRN.execute_fetchlast()
         return p_id
 
+    def _derive_plate(self, source_plate, plate, source_cls, composition_cls,
+                      volume, mapping, columns=None):
+        """Derives the contents of plate from the contents of source_plate
+
+        For each well of `source_plate` holding a composition of type
+        `source_cls`, a new well and a new composition of type
+        `composition_cls` pointing to the source composition are created in
+        `plate`. All the wells and compositions are created in a single
+        query, driven by a table mapping the source well positions to the
+        destination well positions. The lineage of the source compositions,
+        if any, is extended to the new compositions.
+
+        Parameters
+        ----------
+        source_plate : labman.db.plate.Plate
+            The plate whose wells are being derived
+        plate : labman.db.plate.Plate
+            The plate where the new wells are created
+        source_cls : subclass of labman.db.composition.Composition
+            The type of the compositions in `source_plate`
+        composition_cls : subclass of labman.db.composition.Composition
+            The type of the new compositions
+        volume : float
+            The initial volume of the new wells and compositions
+        mapping : callable
+            Function receiving the row and column of a source well (starting
+            at 1) and returning the (row, column) of the destination well, or
+            None if the source well should not be derived
+        columns : dict of {str: dict of {(int, int): object}}, optional
+            Values for additional columns of the `composition_cls` table,
+            keyed by the (row, column) of the source well
+
+        Returns
+        -------
+        list of int
+            The ids of the new compositions, sorted
+        """
+        columns = columns if columns is not None else {}
+        names = sorted(columns)
+        plate_config = source_plate.plate_configuration
+
+        src_rows, src_cols, dst_rows, dst_cols = [], [], [], []
+        values = {name: [] for name in names}
+        for i in range(1, plate_config.num_rows + 1):
+            for j in range(1, plate_config.num_columns + 1):
+                dest = mapping(i, j)
+                if dest is None:
+                    continue
+                src_rows.append(i)
+                src_cols.append(j)
+                dst_rows.append(int(dest[0]))
+                dst_cols.append(int(dest[1]))
+                for name in names:
+                    values[name].append(columns[name].get((i, j)))
+
+        if not src_rows:
+            return []
+
+        with sql_connection.TRN as TRN:
+            # The container and composition ids are drawn from the sequences
+            # beforehand so all the rows can be inserted in the same query.
+            # The arrays of the additional columns are cast to the column
+            # types, as an array holding only NULLs can't be typed otherwise
+            sql = """WITH mapping AS (
+                        SELECT m.*, row_number() OVER () AS idx
+                        FROM (SELECT unnest(%s::integer[]) AS src_row,
+                                     unnest(%s::integer[]) AS src_col,
+                                     unnest(%s::integer[]) AS dst_row,
+                                     unnest(%s::integer[]) AS dst_col
+                                     {arrays}) AS m),
+                     source AS (
+                        SELECT m.*, s.{parent_id} AS parent_id,
+                               l.sample_composition_id AS root_id,
+                               l.depth + 1 AS depth
+                        FROM mapping m
+                            JOIN qiita.well w
+                                ON w.row_num = m.src_row
+                                    AND w.col_num = m.src_col
+                            JOIN qiita.composition c
+                                ON c.container_id = w.container_id
+                            JOIN {parent_table} s
+                                ON s.composition_id = c.composition_id
+                            LEFT JOIN qiita.composition_lineage l
+                                ON l.composition_id = c.composition_id
+                        WHERE w.plate_id = %s
+                        ORDER BY m.idx),
+                     new_rows AS (
+                        SELECT nextval(pg_get_serial_sequence(
+                                    'qiita.container', 'container_id'))
+                                AS container_id,
+                               nextval(pg_get_serial_sequence(
+                                    'qiita.composition', 'composition_id'))
+                                AS composition_id,
+                               source.*
+                        FROM source),
+                     new_containers AS (
+                        INSERT INTO qiita.container
+                            (container_id, container_type_id,
+                             latest_upstream_process_id, remaining_volume)
+                        SELECT container_id, %s, %s, %s
+                        FROM new_rows),
+                     new_wells AS (
+                        INSERT INTO qiita.well
+                            (container_id, plate_id, row_num, col_num)
+                        SELECT container_id, %s, dst_row, dst_col
+                        FROM new_rows),
+                     new_compositions AS (
+                        INSERT INTO qiita.composition
+                            (composition_id, composition_type_id,
+                             upstream_process_id, container_id, total_volume)
+                        SELECT composition_id, %s, %s, container_id, %s
+                        FROM new_rows),
+                     new_lineage AS (
+                        INSERT INTO qiita.composition_lineage
+                            (composition_id, sample_composition_id, depth)
+                        SELECT composition_id, root_id, depth
+                        FROM new_rows
+                        WHERE root_id IS NOT NULL)
+                     INSERT INTO {table} (composition_id, {parent_id}{names})
+                     SELECT composition_id, parent_id{names}
+                     FROM new_rows
+                     RETURNING {id_column}""".format(
+                        arrays=''.join(
+                            ', unnest(%%s::%s[]) AS %s' % (t, name)
+                            for t, name in zip(base.get_column_types(
+                                composition_cls._table, names), names)),
+                        names=''.join(', %s' % name for name in names),
+                        parent_id=source_cls._id_column,
+                        parent_table=source_cls._table,
+                        table=composition_cls._table,
+                        id_column=composition_cls._id_column)
+            sql_args = [src_rows, src_cols, dst_rows, dst_cols]
+            sql_args.extend(values[name] for name in names)
+            sql_args.extend([
+                source_plate.id,
+                base.get_lookup_id('qiita.container_type', 'well'),
+                self.process_id, volume, plate.id,
+                base.get_lookup_id('qiita.composition_type',
+                                   composition_cls._composition_type),
+                self.process_id, volume])
+            TRN.add(sql, sql_args)
+            return sorted(TRN.execute_fetchflatten())
+
+    def _refresh_study_progress(self):
+        """Recomputes the progress counters of the studies processed
+
+        The studies are the ones of the samples in the compositions
+        generated by this process, or in the pools sequenced by it
+        """
+        with sql_connection.TRN as TRN:
+            sql = "SELECT qiita.refresh_process_study_progress(%s)"
+            TRN.add(sql, [self.process_id])
+            TRN.execute()
+
     def _get_process_attr(self, attr):
         """Returns the value of the given process attribute
 
@@ -115,14 +252,7 @@ class Process(base.LabmanObject):
         Object
             The attribute
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT {}
-                     FROM qiita.process
-                        JOIN {} USING (process_id)
-                     WHERE {} = %s""".format(attr, self._table,
-                                             self._id_column)
-            TRN.add(sql, [self.id])
-            return TRN.execute_fetchlast()
+        return self._get_row_attr(attr, 'qiita.process', 'process_id')
 
     @property
     def date(self):
@@ -217,13 +347,16 @@ class SamplePlatingProcess(_Process):
             plate = plate_module.Plate.create(plate_ext_id, plate_config)
 
             # By definition, all well plates are blank at the beginning
-            # so populate all the wells in the plate with BLANKS
-            for i in range(plate_config.num_rows):
-                for j in range(plate_config.num_columns):
-                    well = container_module.Well.create(
-                        plate, instance, volume, i + 1, j + 1)
-                    composition_module.SampleComposition.create(
-                        instance, well, volume)
+            # so populate all the wells in the plate with BLANKS. The wells
+            # and compositions are created in bulk to avoid issuing several
+            # queries per well
+            positions = [(i + 1, j + 1)
+                         for i in range(plate_config.num_rows)
+                         for j in range(plate_config.num_columns)]
+            wells = container_module.Well.create_many(
+                plate, instance, volume, positions)
+            composition_module.SampleComposition.create_many(
+                instance, wells, volume)
 
         return instance
 
@@ -265,6 +398,98 @@ class SamplePlatingProcess(_Process):
         """
         return self.plate.get_well(row, col).composition.update(content)
 
+    def update_wells(self, wells):
+        """Updates the content of several wells at once
+
+        The wells are updated as if `update_well` had been called for each
+        of them, but all the contents are validated and updated at once by
+        the qiita.update_sample_compositions database function.
+
+        Parameters
+        ----------
+        wells : list of (int, int, str)
+            The row, column and new contents of each well. If a well is
+            listed more than once, the last content is used
+
+        Returns
+        -------
+        list of dict
+            The new state of each of the given wells, in the same order:
+            {'row': int, 'col': int, 'sample_id': str, 'sample_ok': bool,
+             'previous_plates': [{'plate_id': int, 'plate_name': str}]},
+            where 'sample_id' is the new content of the well and
+            'previous_plates' are the other plates where the sample of the
+            well has been plated
+
+        Raises
+        ------
+        ValueError
+            If the contents of a well are empty or the well is not in the
+            plate
+        """
+        new_contents = {}
+        for row, col, content in wells:
+            if content is None or not content.strip():
+                raise ValueError(
+                    'A new value for the well %s, %s should be provided'
+                    % (row, col))
+            new_contents[(int(row), int(col))] = content
+
+        with sql_connection.TRN as TRN:
+            plate_id = self.plate.id
+            sql = """SELECT row_num, col_num, sample_composition_id
+                     FROM qiita.well
+                        JOIN qiita.composition USING (container_id)
+                        JOIN qiita.sample_composition USING (composition_id)
+                     WHERE plate_id = %s"""
+            TRN.add(sql, [plate_id])
+            sc_ids = {(r, c): sc_id
+                      for r, c, sc_id in TRN.execute_fetchindex()}
+            missing = set(new_contents) - set(sc_ids)
+            if missing:
+                raise ValueError('Wells not found in plate %s: %s' % (
+                    plate_id, ', '.join('%s, %s' % rc
+                                        for rc in sorted(missing))))
+
+            # The contents are validated and updated at once in the database,
+            # including the duplicated samples and the study progress
+            positions = list(new_contents)
+            sql = """SELECT content, sample_id, sample_ok
+                     FROM qiita.update_sample_compositions(
+                        %s::bigint[], %s::varchar[])"""
+            TRN.add(sql, [[sc_ids[rc] for rc in positions],
+                          [new_contents[rc] for rc in positions]])
+            new_state = dict(zip(positions, TRN.execute_fetchindex()))
+            # The rows of the sample compositions have been updated, make
+            # sure that they are not read from the cache
+            TRN.clear_row_cache()
+
+            # The other plates where the samples have been plated
+            plated_samples = {s_id for _, s_id, _ in new_state.values()} - {
+                None}
+            previous_plates = {}
+            if plated_samples:
+                sql = """SELECT DISTINCT sample_id, plate_id, external_id
+                         FROM qiita.sample_composition
+                            JOIN qiita.composition USING (composition_id)
+                            JOIN qiita.well USING (container_id)
+                            JOIN qiita.plate USING (plate_id)
+                         WHERE sample_id IN %s AND plate_id != %s
+                         ORDER BY plate_id"""
+                TRN.add(sql, [tuple(plated_samples), plate_id])
+                for s_id, p_id, p_name in TRN.execute_fetchindex():
+                    previous_plates.setdefault(s_id, []).append(
+                        {'plate_id': p_id, 'plate_name': p_name})
+
+        result = []
+        for row, col, _ in wells:
+            content, s_id, sample_ok = new_state[(int(row), int(col))]
+            result.append(
+                {'row': int(row), 'col': int(col), 'sample_id': content,
+                 'sample_ok': sample_ok,
+                 'previous_plates': previous_plates.get(s_id, [])})
+        return result
+
     def comment_well(self, row, col, comment):
         """Updates the comment of a well
 
@@ -389,13 +614,11 @@ class PrimerWorkingPlateCreationProcess(Process):
                 work_plate = plate_module.Plate.create(
                     plate_name, plate_config)
                 # Add the wells to the new plate
-                for row in ps_plate.layout:
-                    for ps_well in row:
-                        w_well = container_module.Well.create(
-                            work_plate, instance, 10, ps_well.row,
-                            ps_well.column)
-                        composition_module.PrimerComposition.create(
-                            instance, w_well, 10, ps_well.composition)
+                instance._derive_plate(
+                    ps_plate, work_plate,
+                    composition_module.PrimerSetComposition,
+                    composition_module.PrimerComposition, 10,
+                    lambda row, col: (row, col))
 
         return instance
 
@@ -569,16 +792,26 @@ class GDNAExtractionProcess(Process):
             plate_config = plate.plate_configuration
             gdna_plate = plate_module.Plate.create(
                 gdna_plate_name, plate_config)
-            plate_layout = plate.layout
+
+            # Empty wells are not extracted
+            sql = """SELECT row_num, col_num
+                     FROM qiita.well
+                        JOIN qiita.composition USING (container_id)
+                        JOIN qiita.sample_composition USING (composition_id)
+                        JOIN qiita.sample_composition_type
+                            USING (sample_composition_type_id)
+                     WHERE plate_id = %s AND external_id = 'empty'"""
+            TRN.add(sql, [plate.id])
+            empty = {(r, c) for r, c in TRN.execute_fetchindex()}
+
             # Add the wells to the new plate
-            for i in range(plate_config.num_rows):
-                for j in range(plate_config.num_columns):
-                    plated_sample = plate_layout[i][j].composition
-                    if plated_sample.sample_composition_type != 'empty':
-                        well = container_module.Well.create(
-                            gdna_plate, instance, volume, i + 1, j + 1)
-                        composition_module.GDNAComposition.create(
-                            instance, well, volume, plated_sample)
+            instance._derive_plate(
+                plate, gdna_plate, composition_module.SampleComposition,
+                composition_module.GDNAComposition, volume,
+                lambda row, col: None if (row, col) in empty else (row, col))
+
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
 
         return instance
 
@@ -599,21 +832,16 @@ class GDNAPlateCompressionProcess(Process):
 
     def _compress_plate(self, out_plate, in_plate, row_pad, col_pad, volume=1):
         """Compresses the 96-well in_plate into the 384-well out_plate"""
-        with sql_connection.TRN:
-            layout = in_plate.layout
-            for row in layout:
-                for well in row:
-                    if well is not None:
-                        # The row/col pair is stored in the DB starting at 1
-                        # subtract 1 to make it start at 0 so the math works
-                        # and re-add 1 at the end
-                        out_well_row = (((well.row - 1) * 2) + row_pad) + 1
-                        out_well_col = (((well.column - 1) * 2) + col_pad) + 1
-                        out_well = container_module.Well.create(
-                            out_plate, self, volume, out_well_row,
-                            out_well_col)
-                        composition_module.CompressedGDNAComposition.create(
-                            self, out_well, volume, well.composition)
+        def mapping(row, col):
+            # The row/col pair is stored in the DB starting at 1
+            # subtract 1 to make it start at 0 so the math works
+            # and re-add 1 at the end
+            return ((((row - 1) * 2) + row_pad) + 1,
+                    (((col - 1) * 2) + col_pad) + 1)
+
+        self._derive_plate(
+            in_plate, out_plate, composition_module.GDNAComposition,
+            composition_module.CompressedGDNAComposition, volume, mapping)
 
     @classmethod
     def create(cls, user, plates, plate_ext_id, robot):
@@ -666,6 +894,9 @@ class GDNAPlateCompressionProcess(Process):
 
                 instance._compress_plate(plate, in_plate, row_pad, col_pad)
 
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
+
         return instance
 
     @property
@@ -771,17 +1002,26 @@ class LibraryPrep16SProcess(Process):
             plate_config = plate.plate_configuration
             library_plate = plate_module.Plate.create(lib_plate_name,
                                                       plate_config)
-            gdna_layout = plate.layout
-            primer_layout = primer_plate.layout
-            for i in range(plate_config.num_rows):
-                for j in range(plate_config.num_columns):
-                    if gdna_layout[i][j] is not None:
-                        well = container_module.Well.create(
-                            library_plate, instance, volume, i + 1, j + 1)
-                        composition_module.LibraryPrep16SComposition.create(
-                            instance, well, volume,
-                            gdna_layout[i][j].composition,
-                            primer_layout[i][j].composition)
+
+            # Each library well uses the primer on the same position of the
+            # primer plate
+            sql = """SELECT row_num, col_num, primer_composition_id
+                     FROM qiita.well
+                        JOIN qiita.composition USING (container_id)
+                        JOIN qiita.primer_composition USING (composition_id)
+                     WHERE plate_id = %s"""
+            TRN.add(sql, [primer_plate.id])
+            primers = {(r, c): pc_id
+                       for r, c, pc_id in TRN.execute_fetchindex()}
+
+            instance._derive_plate(
+                plate, library_plate, composition_module.GDNAComposition,
+                composition_module.LibraryPrep16SComposition, volume,
+                lambda row, col: (row, col),
+                columns={'primer_composition_id': primers})
+
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
 
         return instance
 
@@ -979,6 +1219,19 @@ class NormalizationProcess(Process):
         NormalizationProcess
         """
         with sql_connection.TRN as TRN:
+            # Retrieve all the concentration values and the position of the
+            # wells they have been measured on
+            sql = """SELECT plate_id, row_num, col_num, raw_concentration
+                     FROM qiita.concentration_calculation cc
+                        JOIN qiita.composition c
+                            ON cc.quantitated_composition_id =
+                                c.composition_id
+                        JOIN qiita.well USING (container_id)
+                     WHERE cc.upstream_process_id = %s
+                     ORDER BY concentration_calculation_id"""
+            TRN.add(sql, [quant_process.id])
+            concs = TRN.execute_fetchindex()
+
             # Add the row to the process table
             process_id = cls._common_creation_steps(user)
 
@@ -997,22 +1250,16 @@ class NormalizationProcess(Process):
                           dumps(func_data)])
             instance = cls(TRN.execute_fetchlast())
 
-            # Retrieve all the concentration values
-            concs = quant_process.concentrations
             # Transform the concentrations to a numpy array
-            np_conc = np.asarray([raw_con for _, raw_con, _ in concs])
+            np_conc = np.asarray([raw_con for _, _, _, raw_con in concs])
             dna_v = NormalizationProcess._calculate_norm_vol(
                 np_conc, ng, min_vol, max_vol, resolution)
             water_v = total_vol - dna_v
+            positions = [(p_id, r, c) for p_id, r, c, _ in concs]
+            dna_vols = {pos: float(v) for pos, v in zip(positions, dna_v)}
+            water_vols = {pos: float(v) for pos, v in zip(positions, water_v)}
 
-            # Create the plate. 3 -> 384-well plate
-            plate_config = plate_module.PlateConfiguration(3)
-            plate = plate_module.Plate.create(plate_name, plate_config)
-            for (comp, _, _), dna_vol, water_vol in zip(concs, dna_v, water_v):
-                comp_well = comp.container
-                row = comp_well.row
-                column = comp_well.column
-
+            def mapping(row, column):
                 if reformat:
                     row = row - 1
                     column = column - 1
@@ -1023,10 +1270,31 @@ class NormalizationProcess(Process):
                     coffset = column % 2 + (row % 2) * 2
                     column = int(coffset * 6 + (column / 2) % 6) + 1
 
-                well = container_module.Well.create(
-                    plate, instance, total_vol, row, column)
-                composition_module.NormalizedGDNAComposition.create(
-                    instance, well, total_vol, comp, dna_vol, water_vol)
+                return row, column
+
+            # Create the plate. 3 -> 384-well plate
+            plate_config = plate_module.PlateConfiguration(3)
+            plate = plate_module.Plate.create(plate_name, plate_config)
+            # The concentrations may have been measured on more than one
+            # plate, so the wells of each of them are derived separately
+            for plate_id in sorted({p_id for p_id, _, _ in positions}):
+                plate_dna = {(r, c): v for (p_id, r, c), v in dna_vols.items()
+                             if p_id == plate_id}
+                plate_water = {(r, c): v
+                               for (p_id, r, c), v in water_vols.items()
+                               if p_id == plate_id}
+                instance._derive_plate(
+                    plate_module.Plate(plate_id), plate,
+                    composition_module.CompressedGDNAComposition,
+                    composition_module.NormalizedGDNAComposition, total_vol,
+                    lambda row, col, measured=plate_dna: (
+                        mapping(row, col) if (row, col) in measured
+                        else None),
+                    columns={'dna_volume': plate_dna,
+                             'water_volume': plate_water})
+
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
 
         return instance
 
@@ -1173,13 +1441,14 @@ class NormalizationProcess(Process):
         water_vols = []
         wells = []
         dest_wells = []
-        sample_names = []
+        compositions = []
         dna_concs = []
         layout = self.plates[0].layout
         for row in layout:
             for well in row:
                 if well:
                     composition = well.composition
+                    compositions.append(composition)
                     dna_vols.append(composition.dna_volume)
                     water_vols.append(composition.water_volume)
                     # For the source well we need to take a look at the
@@ -1187,14 +1456,15 @@ class NormalizationProcess(Process):
                     c_gdna_comp = composition.compressed_gdna_composition
                     wells.append(c_gdna_comp.container.well_id)
                     dest_wells.append(well.well_id)
-                    # For the sample name we need to check the sample
-                    # composition
-                    sample_comp = c_gdna_comp.gdna_composition.\
-                        sample_composition
-                    sample_names.append(sample_comp.content)
                     # For the DNA concentrations we need to look at
                     # the quantification process
                     dna_concs.append(concentrations[c_gdna_comp])
+        # For the sample name we need to check the sample composition, which
+        # is retrieved for all the wells at once from the lineage
+        with sql_connection.TRN:
+            sample_names = [
+                sc.content for sc in
+                composition_module.Composition.get_root_samples(compositions)]
 
         # _format_picklist expects numpy arrays
         dna_vols = np.asarray(dna_vols)
@@ -1294,30 +1564,42 @@ class LibraryPrepShotgunProcess(Process):
                 TRN.execute_fetchlast())
 
             # Get a list of wells that actually contain information
-            wells = [well for well in chain.from_iterable(plate.layout)
-                     if well is not None]
+            sql = """SELECT row_num, col_num
+                     FROM qiita.well
+                     WHERE plate_id = %s
+                     ORDER BY row_num, col_num"""
+            TRN.add(sql, [plate.id])
+            positions = [(r, c) for r, c in TRN.execute_fetchindex()]
             # Get the list of index pairs to use
-            idx_combos = primer_set.get_next_combos(len(wells))
+            idx_combos = primer_set.get_next_combos(len(positions))
 
-            i5_layout = i5_plate.layout
-            i7_layout = i7_plate.layout
+            # The working primer plates hold the primers of the primer set
+            # compositions selected for each combo
+            sql = """SELECT primer_set_composition_id, primer_composition_id
+                     FROM qiita.primer_composition
+                        JOIN qiita.composition USING (composition_id)
+                        JOIN qiita.well USING (container_id)
+                     WHERE plate_id IN %s"""
+            TRN.add(sql, [(i5_plate.id, i7_plate.id)])
+            primers = dict(TRN.execute_fetchindex())
+            i5_comps = {pos: primers[i5.id]
+                        for pos, (i5, _) in zip(positions, idx_combos)}
+            i7_comps = {pos: primers[i7.id]
+                        for pos, (_, i7) in zip(positions, idx_combos)}
 
             # Create the library plate
             lib_plate = plate_module.Plate.create(
                 plate_name, plate.plate_configuration)
-            for well, idx_combo in zip(wells, idx_combos):
-                i5_well = idx_combo[0].container
-                i7_well = idx_combo[1].container
-                i5_comp = i5_layout[
-                    i5_well.row - 1][i5_well.column - 1].composition
-                i7_comp = i7_layout[
-                    i7_well.row - 1][i7_well.column - 1].composition
-
-                lib_well = container_module.Well.create(
-                    lib_plate, instance, volume, well.row, well.column)
-                composition_module.LibraryPrepShotgunComposition.create(
-                    instance, lib_well, volume, well.composition,
-                    i5_comp, i7_comp)
+            instance._derive_plate(
+                plate, lib_plate,
+                composition_module.NormalizedGDNAComposition,
+                composition_module.LibraryPrepShotgunComposition, volume,
+                lambda row, col: (row, col),
+                columns={'i5_primer_composition_id': i5_comps,
+                         'i7_primer_composition_id': i7_comps})
+
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
 
         return instance
 
@@ -1505,7 +1787,7 @@ class LibraryPrepShotgunProcess(Process):
         str
             The echo-formatted pick list
         """
-        sample_names = []
+        lib_comps = []
         sample_wells = []
         indices = {'i5 name': {}, 'i5 plate': {}, 'i5 sequence': {},
                    'i5 well': {}, 'i7 name': {}, 'i7 plate': {},
@@ -1517,12 +1799,8 @@ class LibraryPrepShotgunProcess(Process):
                 continue
             # Add the sample well
             sample_wells.append(well.well_id)
-            # Get the sample name - we need to go back to the SampleComposition
             lib_comp = well.composition
-            sample_comp = lib_comp.normalized_gdna_composition\
-                .compressed_gdna_composition.gdna_composition\
-                .sample_composition
-            sample_names.append(sample_comp.content)
+            lib_comps.append(lib_comp)
             # Retrieve all the information about the indices
             i5_comp = lib_comp.i5_composition.primer_set_composition
             i5_well = i5_comp.container
@@ -1541,7 +1819,11 @@ class LibraryPrepShotgunProcess(Process):
             indices['index combo seq'][idx] = '%s%s' % (
                 indices['i5 sequence'][idx], indices['i7 sequence'][idx])
 
-        sample_names = np.asarray(sample_names)
+        # Get the sample names - we need to go back to the SampleComposition
+        with sql_connection.TRN:
+            sample_names = np.asarray([
+                sc.content for sc in
+                composition_module.Composition.get_root_samples(lib_comps)])
         sample_wells = np.asarray(sample_wells)
         indices = pd.DataFrame(indices)
 
@@ -1752,13 +2034,12 @@ class QuantificationProcess(Process):
                          raw_concentration)
                      VALUES (%s, %s, %s)"""
             sql_args = []
-            layout = plate.layout
+            layout = plate.layout_view().matrix('composition_id')
 
             for p_row, c_row in zip(layout, concentrations):
-                for well, conc in zip(p_row, c_row):
-                    if well is not None:
-                        sql_args.append([well.composition.composition_id,
-                                         instance.id, conc])
+                for comp_id, conc in zip(p_row, c_row):
+                    if comp_id is not None:
+                        sql_args.append([comp_id, instance.id, conc])
 
             if len(sql_args) == 0:
                 raise ValueError('No concentration values have been provided')
@@ -1783,9 +2064,11 @@ class QuantificationProcess(Process):
                      WHERE upstream_process_id = %s
                      ORDER BY concentration_calculation_id"""
             TRN.add(sql, [self._id])
-            return [
-                (composition_module.Composition.factory(comp_id), r_con, c_con)
-                for comp_id, r_con, c_con in TRN.execute_fetchindex()]
+            res = TRN.execute_fetchindex()
+            comps = composition_module.Composition.factory_many(
+                [comp_id for comp_id, _, _ in res])
+            return [(comp, r_con, c_con)
+                    for comp, (_, r_con, c_con) in zip(comps, res)]
 
     def compute_concentrations(self, dna_amount=240, min_val=1, max_val=15,
                                blank_volume=2, size=500):
@@ -1806,7 +2089,8 @@ class QuantificationProcess(Process):
             (Shotgun) The average library molecule size, in bp.
         """
         concentrations = self.concentrations
-        layout = concentrations[0][0].container.plate.layout
+        layout = concentrations[0][0].container.plate.layout_view().matrix(
+            'composition_id')
 
         res = None
         if isinstance(concentrations[0][0],
@@ -1849,10 +2133,9 @@ class QuantificationProcess(Process):
         if res is not None:
             sql_args = []
             for p_row, c_row in zip(layout, res):
-                for well, conc in zip(p_row, c_row):
-                    if well is not None:
-                        sql_args.append([conc, self.id,
-                                         well.composition.composition_id])
+                for comp_id, conc in zip(p_row, c_row):
+                    if comp_id is not None:
+                        sql_args.append([conc, self.id, comp_id])
             sql = """UPDATE qiita.concentration_calculation
                         SET computed_concentration = %s
                         WHERE upstream_process_id = %s AND
@@ -2132,6 +2415,9 @@ class PoolingProcess(Process):
             TRN.add(sql, sql_args, many=True)
             TRN.execute()
 
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
+
         return instance
 
     @property
@@ -2182,8 +2468,10 @@ class PoolingProcess(Process):
                      WHERE upstream_process_id = %s
                      ORDER BY pool_composition_components_id"""
             TRN.add(sql, [self.process_id])
-            return [(composition_module.Composition.factory(comp_id), vol)
-                    for comp_id, vol in TRN.execute_fetchindex()]
+            res = TRN.execute_fetchindex()
+            comps = composition_module.Composition.factory_many(
+                [comp_id for comp_id, _ in res])
+            return [(comp, vol) for comp, (_, vol) in zip(comps, res)]
 
     @property
     def pool(self):
@@ -2334,21 +2622,46 @@ class SequencingProcess(Process):
         'MiSeq': 1, 'MiniSeq': 1, 'NextSeq': 1, 'NovaSeq': 1}
 
     @staticmethod
-    def list_sequencing_runs():
+    def list_sequencing_runs(search=None, order_by=None, descending=False,
+                             limit=None, offset=None, after=None):
         """Generates a list of sequencing runs
 
-        Returns
-        -------
-        list of dicts
+        Parameters
+        ----------
+        search : str, optional
+            If provided, return only the runs whose id, run name, experiment,
+            assay or principal investigator contain the given term
+        order_by : str, optional
+            The column used to sort the runs: 'process_id', 'run_name',
+            'experiment', 'assay' or 'principal_investigator'.
+            Default: process_id
+        descending : bool, optional
+            Whether to sort the runs in descending order. Default: False
+        limit : int, optional
+            The maximum number of runs to return. Default: all of them
+        offset : int, optional
+            The number of runs to skip
+        after : list, optional
+            The values of `order_by` and process_id of the last run of the
+            previous page
+
+        Returns
+        -------
+        labman.db.base.ListPage of dicts
             The list of sequence run information with the structure:
             [{'process_id': int, 'run_name': string, ...}]
+
+        See Also
+        --------
+        labman.db.base.list_page
         """
-        with sql_connection.TRN as TRN:
-            sql = """SELECT *
-                        FROM qiita.sequencing_process
-                     ORDER BY process_id"""
-            TRN.add(sql)
-            return [dict(r) for r in TRN.execute_fetchindex()]
+        sql = "SELECT * FROM qiita.sequencing_process"
+        return base.list_page(
+            sql, [], 'process_id',
+            ['process_id', 'run_name', 'experiment', 'assay',
+             'principal_investigator'],
+            search=search, order_by=order_by, descending=descending,
+            limit=limit, offset=offset, after=after)
 
     @classmethod
     def create(cls, user, pools, run_name, experiment, sequencer,
@@ -2446,6 +2759,9 @@ class SequencingProcess(Process):
                 TRN.add(sql, sql_args, many=True)
                 TRN.execute()
 
+            # Update the progress counters of the studies processed
+            instance._refresh_study_progress()
+
         return instance
 
     @property
@@ -2551,12 +2867,18 @@ class SequencingProcess(Process):
                 'sequencers are: \n' %
                 ' '.join(revcomp_sequencers + other_sequencers))
 
+    # The columns of the [Data] component of the shotgun sample sheets
+    _sample_sheet_data_columns = [
+        'Lane', 'Sample_ID', 'Sample_Name', 'Sample_Plate', 'Sample_Well',
+        'I7_Index_ID', 'index', 'I5_Index_ID', 'index2', 'Sample_Project',
+        'Description']
+
     @staticmethod
-    def _format_sample_sheet_data(sample_ids, i7_name, i7_seq, i5_name, i5_seq,
-                                  wells=None, sample_plates=None,
-                                  sample_proj='', description=None, lanes=[1],
-                                  sep=',', include_header=True):
-        """Creates the [Data] component of the Illumina sample sheet
+    def _sample_sheet_data_lines(sample_ids, i7_name, i7_seq, i5_name, i5_seq,
+                                 wells=None, sample_plates=None,
+                                 sample_proj='', description=None, lanes=[1],
+                                 sep=','):
+        """Creates the lines of the [Data] component of the sample sheet
 
         Parameters
         ----------
@@ -2582,13 +2904,11 @@ class SequencingProcess(Process):
             The lanes in which the pool will be sequenced. Default: [1]
         sep: str, optional
             The file-format separator. Default: ','
-        include_header: bool, optional
-            Wheather to include the header or not. Default: true
 
         Returns
         -------
-        str
-            The formatted [Data] component of the Illumina sample sheet
+        list of str
+            The sorted lines of the [Data] component, without the header
 
         Raises
         ------
@@ -2616,12 +2936,41 @@ class SequencingProcess(Process):
                                  i5_seq[i], sample_proj, description[i]])
                 data.append(line)
 
-        data = sorted(data)
+        return sorted(data)
+
+    @staticmethod
+    def _format_sample_sheet_data(sample_ids, i7_name, i7_seq, i5_name, i5_seq,
+                                  wells=None, sample_plates=None,
+                                  sample_proj='', description=None, lanes=[1],
+                                  sep=',', include_header=True):
+        """Creates the [Data] component of the Illumina sample sheet
+
+        Parameters
+        ----------
+        sample_ids, i7_name, i7_seq, i5_name, i5_seq, wells, sample_plates,
+        sample_proj, description, lanes, sep
+            See `SequencingProcess._sample_sheet_data_lines`
+        include_header: bool, optional
+            Wheather to include the header or not. Default: true
+
+        Returns
+        -------
+        str
+            The formatted [Data] component of the Illumina sample sheet
+
+        Raises
+        ------
+        ValueError
+            If sample_ids, i7_name, i7_seq, i5_name and i5_seq do not have all
+            the same length
+        """
+        data = SequencingProcess._sample_sheet_data_lines(
+            sample_ids, i7_name, i7_seq, i5_name, i5_seq, wells=wells,
+            sample_plates=sample_plates, sample_proj=sample_proj,
+            description=description, lanes=lanes, sep=sep)
         if include_header:
-            data.insert(0, sep.join([
-                'Lane', 'Sample_ID', 'Sample_Name', 'Sample_Plate',
-                'Sample_Well', 'I7_Index_ID', 'index', 'I5_Index_ID', 'index2',
-                'Sample_Project', 'Description']))
+            data.insert(0, sep.join(
+                SequencingProcess._sample_sheet_data_columns))
 
         return '\n'.join(data)
 
@@ -2698,62 +3047,16 @@ class SequencingProcess(Process):
         sample_sheet = template.format(**sample_sheet_dict, **{'sep': sep})
         return sample_sheet
 
-    def _generate_shotgun_sample_sheet(self):
-        """Generates Illumina compatible shotgun sample sheets
+    def _format_sample_sheet_header(self):
+        """Formats the sample sheet up to the [Data] component
 
         Returns
         -------
         str
-            The illumina-formatted sample sheet
+            The comments and the [Header], [Reads] and [Settings] components
+            of the illumina-formatted sample sheet, followed by the [Data]
+            section name
         """
-        bcl2fastq_sample_ids = []
-        i7_names = []
-        i7_sequences = []
-        i5_names = []
-        i5_sequences = []
-        wells = []
-        sample_ids = []
-        sample_plates = []
-        sequencer_type = self.sequencer.equipment_type
-
-        data = []
-        include_header = True
-        for pool, lane in self.pools:
-            for component in pool.components:
-                lp_composition = component['composition']
-                # Get the well information
-                well = lp_composition.container
-                wells.append(well.well_id)
-                # Get the plate information
-                sample_plates.append(well.plate.external_id)
-                # Get the i7 index information
-                i7_comp = lp_composition.i7_composition.primer_set_composition
-                i7_names.append(i7_comp.external_id)
-                i7_sequences.append(i7_comp.barcode)
-                # Get the i5 index information
-                i5_comp = lp_composition.i5_composition.primer_set_composition
-                i5_names.append(i5_comp.external_id)
-                i5_sequences.append(i5_comp.barcode)
-                # Get the sample id
-                sample_id = lp_composition.normalized_gdna_composition.\
-                    compressed_gdna_composition.gdna_composition.\
-                    sample_composition.content
-                sample_ids.append(sample_id)
-            # Transform te sample ids to be bcl2fastq-compatible
-            bcl2fastq_sample_ids = [
-                SequencingProcess._bcl_scrub_name(sid) for sid in sample_ids]
-            # Reverse the i5 sequences if needed based on the sequencer
-            i5_sequences = SequencingProcess._sequencer_i5_index(
-                sequencer_type, i5_sequences)
-            # add the data of the curent pool
-            data.append(SequencingProcess._format_sample_sheet_data(
-                bcl2fastq_sample_ids, i7_names, i7_sequences, i5_names,
-                i5_sequences, wells=wells, sample_plates=sample_plates,
-                description=sample_ids, sample_proj=self.run_name,
-                lanes=[lane], sep=',', include_header=include_header))
-            include_header = False
-
-        data = '\n'.join(data)
         contacts = {c.name: c.email for c in self.contacts}
         pi = self.principal_investigator
         principal_investigator = {pi.name: pi.email}
@@ -2773,70 +3076,189 @@ class SequencingProcess(Process):
             'read1': self.fwd_cycles,
             'read2': self.rev_cycles,
             'ReverseComplement': '0',
-            'data': data}
+            'data': ''}
         return SequencingProcess._format_sample_sheet(sample_sheet_dict)
 
-    def _generate_amplicon_sample_sheet(self):
-        """Generates Illumina compatible sample sheets
+    def _iter_shotgun_sample_sheet_data(self):
+        """Generates the lines of the [Data] component of shotgun sheets
+
+        The information of all the samples in the run is streamed from a
+        single query, sorted by lane and by sample sheet line
 
         Returns
         -------
-        str
-            The illumina-formatted sample sheet
+        generator of str
+            The lines of the [Data] component
+        """
+        sequencer_type = self.sequencer.equipment_type
+        # Fail before generating any line if the sequencer is not recognized
+        SequencingProcess._sequencer_i5_index(sequencer_type, [])
+        run_name = self.run_name
+        with sql_connection.TRN as TRN:
+            # Rationale: the lines of each lane used to be sorted in Python.
+            # The ORDER BY reproduces that order (the sample id is scrubbed
+            # as in SequencingProcess._bcl_scrub_name and the text columns use
+            # the "C" collation to compare as Python does) so the rows can be
+            # formatted as they arrive
+            sql = """SELECT spl.lane_number, sc.content, w.row_num, w.col_num,
+                            p.external_id AS plate,
+                            i7.external_id AS i7_name,
+                            i7.barcode_seq AS i7_seq,
+                            i5.external_id AS i5_name,
+                            i5.barcode_seq AS i5_seq
+                     FROM qiita.sequencing_process_lanes spl
+                        JOIN qiita.pool_composition_components pcc
+                            ON pcc.output_pool_composition_id =
+                                spl.pool_composition_id
+                        JOIN qiita.library_prep_shotgun_composition lp
+                            ON lp.composition_id = pcc.input_composition_id
+                        JOIN qiita.composition c
+                            ON c.composition_id = lp.composition_id
+                        JOIN qiita.well w USING (container_id)
+                        JOIN qiita.plate p USING (plate_id)
+                        JOIN qiita.primer_composition i7c
+                            ON i7c.primer_composition_id =
+                                lp.i7_primer_composition_id
+                        JOIN qiita.primer_set_composition i7
+                            ON i7.primer_set_composition_id =
+                                i7c.primer_set_composition_id
+                        JOIN qiita.primer_composition i5c
+                            ON i5c.primer_composition_id =
+                                lp.i5_primer_composition_id
+                        JOIN qiita.primer_set_composition i5
+                            ON i5.primer_set_composition_id =
+                                i5c.primer_set_composition_id
+                        JOIN qiita.normalized_gdna_composition ngc
+                            ON ngc.normalized_gdna_composition_id =
+                                lp.normalized_gdna_composition_id
+                        JOIN qiita.compressed_gdna_composition cgc
+                            ON cgc.compressed_gdna_composition_id =
+                                ngc.compressed_gdna_composition_id
+                        JOIN qiita.gdna_composition gc
+                            ON gc.gdna_composition_id = cgc.gdna_composition_id
+                        JOIN qiita.sample_composition sc
+                            ON sc.sample_composition_id =
+                                gc.sample_composition_id
+                     WHERE spl.sequencing_process_id = %s
+                     ORDER BY spl.lane_number,
+                              regexp_replace(sc.content, '[^0-9a-zA-Z_-]+',
+                                             '_', 'g') COLLATE "C",
+                              p.external_id COLLATE "C",
+                              qiita.format_well_id(w.row_num, w.col_num)
+                                COLLATE "C",
+                              i7.external_id COLLATE "C",
+                              pcc.pool_composition_components_id"""
+            yield ','.join(SequencingProcess._sample_sheet_data_columns)
+            for row in TRN.execute_iter(sql, [self.id]):
+                sample_id = row['content']
+                # Reverse the i5 sequence if needed based on the sequencer
+                i5_seq = SequencingProcess._sequencer_i5_index(
+                    sequencer_type, [row['i5_seq']])
+                yield from SequencingProcess._sample_sheet_data_lines(
+                    [SequencingProcess._bcl_scrub_name(sample_id)],
+                    [row['i7_name']], [row['i7_seq']], [row['i5_name']],
+                    i5_seq,
+                    wells=[container_module._format_well_id(row['row_num'],
+                                                            row['col_num'])],
+                    sample_plates=[row['plate']], description=[sample_id],
+                    sample_proj=run_name, lanes=[row['lane_number']],
+                    sep=',')
+
+    def _iter_amplicon_sample_sheet_data(self):
+        """Generates the lines of the [Data] component of amplicon sheets
+
+        Returns
+        -------
+        generator of str
+            The lines of the [Data] component
         """
         fixed_run_name = SequencingProcess._bcl_scrub_name(self.run_name)
-        data = (
-            'Sample_ID,Sample_Name,Sample_Plate,Sample_Well,I7_Index_ID,'
-            'index,Sample_Project,Description,,\n'
-            '%s,,,,,NNNNNNNNNNNN,,,,,' % fixed_run_name)
+        yield ('Sample_ID,Sample_Name,Sample_Plate,Sample_Well,I7_Index_ID,'
+               'index,Sample_Project,Description,,')
+        yield '%s,,,,,NNNNNNNNNNNN,,,,,' % fixed_run_name
 
-        contacts = {c.name: c.email for c in self.contacts}
-        pi = self.principal_investigator
-        principal_investigator = {pi.name: pi.email}
-        sample_sheet_dict = {
-            'comments': SequencingProcess._format_sample_sheet_comments(
-                principal_investigator=principal_investigator,
-                contacts=contacts),
-            'IEMFileVersion': '4',
-            'Investigator Name': pi.name,
-            'Experiment Name': self.experiment,
-            'Date': str(self.date),
-            'Workflow': 'GenerateFASTQ',
-            'Application': 'FASTQ Only',
-            'Assay': self.assay,
-            'Description': '',
-            'Chemistry': 'Default',
-            'read1': self.fwd_cycles,
-            'read2': self.rev_cycles,
-            'ReverseComplement': '0',
-            'data': data}
-        return SequencingProcess._format_sample_sheet(sample_sheet_dict)
-
-    def generate_sample_sheet(self):
-        """Generates Illumina compatible sample sheets
+    def iter_sample_sheet(self):
+        """Generates Illumina compatible sample sheets in chunks
 
         Returns
         -------
-        str
-            The illumina-formatted sample sheet
+        generator of str
+            The consecutive chunks of the illumina-formatted sample sheet
         """
         assay = self.assay
         if assay == 'Amplicon':
-            return self._generate_amplicon_sample_sheet()
+            data = self._iter_amplicon_sample_sheet_data()
         elif assay == 'Metagenomics':
-            return self._generate_shotgun_sample_sheet()
+            data = self._iter_shotgun_sample_sheet_data()
+        else:
+            return
 
-    def generate_prep_information(self):
-        """Generates prep information
+        yield self._format_sample_sheet_header()
+        for idx, line in enumerate(data):
+            yield line if idx == 0 else '\n' + line
+
+    def generate_sample_sheet(self):
+        """Generates Illumina compatible sample sheets
 
         Returns
         -------
-        dict labman.db.study.Study: str
-            a dict of the Study and the prep
+        str
+            The illumina-formatted sample sheet
+        """
+        return ''.join(self.iter_sample_sheet())
+
+    @staticmethod
+    def _format_prep_sheet(samples, blanks):
+        """Formats the prep information of a study as tab-separated lines
+
+        Parameters
+        ----------
+        samples : iterable of (str, dict)
+            The sample name and the prep information of the samples of the
+            study, sorted by sample name
+        blanks : list of (str, dict)
+            The sample name and the prep information of the blanks, sorted by
+            sample name
+
+        Returns
+        -------
+        generator of str
+            The header and the lines of the prep information, sorted by
+            sample name. If a sample name is repeated, the last prep
+            information is used, and the blanks take precedence over the
+            samples of the study
+        """
+        merged = merge(((name, 0, info) for name, info in samples),
+                       ((name, 1, info) for name, info in blanks),
+                       key=itemgetter(0, 1))
+        sio = StringIO()
+        writer = csv.writer(sio, delimiter='\t', lineterminator='\n')
+        columns = None
+        for name, group in groupby(merged, key=itemgetter(0)):
+            for _, _, info in group:
+                pass
+            if columns is None:
+                columns = sorted(info)
+                writer.writerow(['sample_name'] + columns)
+            writer.writerow([name] + [info[c] for c in columns])
+            yield sio.getvalue()
+            sio.seek(0)
+            sio.truncate()
+
+    def iter_prep_information(self):
+        """Generates the prep information of each study
+
+        The samples are read in a single pass through a server-side cursor,
+        so the prep information is never held in memory at once
+
+        Returns
+        -------
+        generator of (labman.db.study.Study, generator of str)
+            The studies, sorted by id, and the lines of their tab-separated
+            prep information. The lines of a study should be consumed before
+            moving to the next study
         """
         assay = self.assay
-        data = {}
-        blanks = {}
         if assay == 'Amplicon':
             extra_fields = [
                 # 'e'/'r': equipment/reagent
@@ -2916,9 +3338,8 @@ class SequencingProcess(Process):
                 LEFT JOIN qiita.primer_set_composition psc ON (
                     pc.primer_set_composition_id =
                     psc.primer_set_composition_id)
-                FULL JOIN qiita.study_sample USING (sample_id)
-                WHERE sequencing_process_id = %s
-                ORDER BY study_id, sample_id, row_num, col_num"""
+                FULL JOIN qiita.study_sample USING (sample_id)"""
+            order_by = ''
         elif assay == 'Metagenomics':
             extra_fields = [
                 ('e', 'gepmotion_robot_id', 'gdata_robot'),
@@ -2994,10 +3415,16 @@ class SequencingProcess(Process):
                     w1.container_id = c3.container_id)
                 LEFT JOIN qiita.plate p1 ON (
                     w1.plate_id = p1.plate_id)
-                FULL JOIN qiita.study_sample USING (sample_id)
+                FULL JOIN qiita.study_sample USING (sample_id)"""
+            order_by = ', i5.barcode_seq'
+
+        # The blanks come first, since they are added to the prep information
+        # of all the studies. The samples are sorted by name using the C
+        # collation, which matches the python string order
+        sql += ("""
                 WHERE sequencing_process_id = %s
-                ORDER BY study_id, sample_id, row_num, col_num, i5.barcode_seq
-                """
+                ORDER BY study_id NULLS FIRST, content COLLATE "C",
+                         row_num, col_num""" + order_by)
 
         with sql_connection.TRN as TRN:
             # to simplify the main queries, let's get all the equipment info
@@ -3023,11 +3450,10 @@ class SequencingProcess(Process):
                 rid = row.pop('reagent_composition_id')
                 reagent[rid] = row
 
-            TRN.add(sql, [self.id])
-            for result in TRN.execute_fetchindex():
+            def format_result(result):
                 result = dict(result)
                 study_id = result.pop('study_id')
-                sid = result.pop('sample_id')
+                result.pop('sample_id')
                 content = result.pop('content')
 
                 # format well
@@ -3055,29 +3481,45 @@ class SequencingProcess(Process):
                 result['platform'] = equipment[
                     result.pop('platform_id')]['description']
 
-                if sid is not None and study_id is not None:
-                    study = Study(study_id)
-                    if study not in data:
-                        data[study] = {}
-                    data[study][content] = result
+                if assay == 'Metagenomics':
+                    result['run_prefix'] = \
+                        SequencingProcess._bcl_scrub_name(content)
+
+                return study_id, content, result
 
-                    if assay == 'Metagenomics':
-                        result['run_prefix'] = \
-                            SequencingProcess._bcl_scrub_name(content)
+            blanks = []
+            results = map(format_result, TRN.execute_iter(sql, [self.id]))
+            for study_id, rows in groupby(results, key=itemgetter(0)):
+                rows = ((content, result) for _, content, result in rows)
+                if study_id is None:
+                    blanks = list(rows)
                 else:
-                    if assay == 'Metagenomics':
-                        result['run_prefix'] = \
-                            SequencingProcess._bcl_scrub_name(content)
-                    blanks[content] = result
-
-        # converting from dict to pandas and then to tsv
-        for study, vals in data.items():
-            merged = {**vals, **blanks}
-            df = pd.DataFrame.from_dict(merged, orient='index')
-            df.sort_index(inplace=True)
-            cols = sorted(list(df.columns))
-            sio = StringIO()
-            df[cols].to_csv(sio, sep='\t', index_label='sample_name')
-            data[study] = sio.getvalue()
-
-        return data
+                    yield (Study(study_id),
+                           SequencingProcess._format_prep_sheet(rows, blanks))
+
+    def generate_prep_information(self):
+        """Generates prep information
+
+        Returns
+        -------
+        dict labman.db.study.Study: str
+            a dict of the Study and the prep
+        """
+        return {study: ''.join(lines)
+                for study, lines in self.iter_prep_information()}
+
+
+# Maps the process type descriptions to the classes implementing them
+_PROCESS_CLASSES = {
+    # 'primer template creation': TODO,
+    'primer working plate creation': PrimerWorkingPlateCreationProcess,
+    'sample plating': SamplePlatingProcess,
+    'reagent creation': ReagentCreationProcess,
+    'gDNA extraction': GDNAExtractionProcess,
+    '16S library prep': LibraryPrep16SProcess,
+    'shotgun library prep': LibraryPrepShotgunProcess,
+    'quantification': QuantificationProcess,
+    'gDNA normalization': NormalizationProcess,
+    'compress gDNA plates': GDNAPlateCompressionProcess,
+    'pooling': PoolingProcess,
+    'sequencing': SequencingProcess}
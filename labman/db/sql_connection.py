@@ -10,17 +10,24 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import division
+import re
 from contextlib import contextmanager
-from itertools import chain
+from itertools import chain, groupby
+from operator import itemgetter
 from functools import partial, wraps
 from datetime import date, time, datetime
+from os import getpid
+from threading import local, Lock
+from time import perf_counter
 
 from psycopg2 import (connect, ProgrammingError, Error as PostgresError,
                       OperationalError)
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_batch, execute_values
 from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool
 
 from . import settings
+from . import instrumentation
 
 
 class SQLConnectionHandler(object):
@@ -380,6 +387,134 @@ class SQLConnectionHandler(object):
         return result
 
 
+class ConnectionPool(object):
+    """Pool of connections to the labman database
+
+    The connections are shared by all the threads of the process. The pool is
+    created lazily, and it is re-created in forked processes, as the
+    connections can't be shared across processes.
+
+    Parameters
+    ----------
+    maxconn : int, optional
+        The maximum number of connections open at the same time. Default:
+        the `POOL_SIZE` option of the configuration file
+    """
+    def __init__(self, maxconn=None):
+        self._maxconn = maxconn
+        self._pool = None
+        self._pid = None
+        self._lock = Lock()
+
+    @property
+    def maxconn(self):
+        """The maximum number of connections open at the same time"""
+        if self._maxconn is not None:
+            return self._maxconn
+        return settings.labman_settings.pool_size
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None or self._pid != getpid():
+                # Do not close the connections inherited from the parent
+                # process: closing them would close the parent's sessions
+                self._pool = ThreadedConnectionPool(
+                    0, self.maxconn,
+                    user=settings.labman_settings.user,
+                    password=settings.labman_settings.password,
+                    database=settings.labman_settings.database,
+                    host=settings.labman_settings.host,
+                    port=settings.labman_settings.port)
+                self._pid = getpid()
+            return self._pool
+
+    def getconn(self):
+        """Gets a connection from the pool
+
+        Returns
+        -------
+        psycopg2.connection
+            The connection
+
+        Raises
+        ------
+        psycopg2.pool.PoolError
+            If all the connections of the pool are in use
+        """
+        return self._get_pool().getconn()
+
+    def putconn(self, conn, close=False):
+        """Returns a connection to the pool
+
+        Parameters
+        ----------
+        conn : psycopg2.connection
+            The connection retrieved using `getconn`
+        close : bool, optional
+            Whether to close the connection instead of reusing it.
+            Default: False
+        """
+        with self._lock:
+            # Connections from a parent process are not in the current pool
+            if self._pool is None or self._pid != getpid():
+                return
+            pool = self._pool
+        pool.putconn(conn, close=close or conn.closed != 0)
+
+    def closeall(self):
+        """Closes all the connections of the pool"""
+        with self._lock:
+            if self._pool is not None and self._pid == getpid():
+                self._pool.closeall()
+            self._pool = None
+            self._pid = None
+
+
+# Singleton pattern, create the connection pool for the entire process
+POOL = ConnectionPool()
+
+
+# Maximum number of queries sent to the server in a single batch
+BATCH_PAGE_SIZE = 1000
+# Number of rows fetched in each round trip by the named cursors
+ITER_SIZE = 2000
+
+_BATCHABLE_RE = re.compile(r'^\s*(INSERT|UPDATE|DELETE)\b', re.I)
+_RETURNING_RE = re.compile(r'\bRETURNING\b', re.I)
+# Splits "INSERT INTO ... VALUES (%s, %s)" in the statement and the template
+_VALUES_RE = re.compile(
+    r'^(\s*INSERT\s+INTO\s+.*\bVALUES)\s*(\([^()]*\))\s*;?\s*$', re.I | re.S)
+
+
+def _group_queries(queries):
+    """Groups the consecutive queries that can be executed in a single batch
+
+    A query can be batched if it is an INSERT, UPDATE or DELETE statement
+    that doesn't return any value, and it has been added multiple times in a
+    row with arguments.
+
+    Parameters
+    ----------
+    queries : list of (str, list, tuple or dict)
+        The queries and their arguments
+
+    Returns
+    -------
+    generator of (str, list, bool)
+        The query, its arguments and whether it should be batched. If batched,
+        the arguments are a list with the arguments of each query of the
+        batch
+    """
+    for sql, group in groupby(queries, key=itemgetter(0)):
+        sql_args = [args for _, args in group]
+        if (len(sql_args) > 1 and all(sql_args) and
+                _BATCHABLE_RE.match(sql) and not _RETURNING_RE.search(sql)):
+            yield sql, sql_args, True
+        else:
+            for args in sql_args:
+                yield sql, args, False
+
+
 def _checker(func):
     """Decorator to check that methods are executed inside the context"""
     @wraps(func)
@@ -398,6 +533,13 @@ class Transaction(object):
     A transaction is defined by a series of consecutive queries that need to
     be applied to the database as a single block.
 
+    Attributes
+    ----------
+    query_count : int
+        The number of queries executed by the transaction object
+    query_time : float
+        The time, in seconds, spent executing the queries
+
     Raises
     ------
     RuntimeError
@@ -415,19 +557,25 @@ class Transaction(object):
         self._connection = None
         self._post_commit_funcs = []
         self._post_rollback_funcs = []
+        self._object_cache = {}
+        self._row_cache = {}
+        self.query_count = 0
+        self.query_time = 0.0
+        self._cursor_count = 0
 
     def _open_connection(self):
         # If the connection already exists and is not closed, don't do anything
         if self._connection is not None and self._connection.closed == 0:
             return
 
+        if self._connection is not None:
+            # The connection has been closed (e.g. after a failed commit),
+            # discard it
+            POOL.putconn(self._connection, close=True)
+            self._connection = None
+
         try:
-            self._connection = connect(
-                user=settings.labman_settings.user,
-                password=settings.labman_settings.password,
-                database=settings.labman_settings.database,
-                host=settings.labman_settings.host,
-                port=settings.labman_settings.port)
+            self._connection = POOL.getconn()
         except OperationalError as e:
             # catch three known common exceptions and raise runtime errors
             error_str = str(e)
@@ -460,7 +608,24 @@ class Transaction(object):
 
     def close(self):
         if self._connection is not None:
-            self._connection.close()
+            POOL.putconn(self._connection, close=True)
+            self._connection = None
+
+    def release(self):
+        """Returns the connection of the transaction to the pool
+
+        Raises
+        ------
+        RuntimeError
+            If invoked inside the context manager
+        """
+        if self._contexts_entered != 0:
+            raise RuntimeError(
+                "Operation not permitted. The connection of a transaction "
+                "can't be released within the context manager.")
+        if self._connection is not None:
+            POOL.putconn(self._connection)
+            self._connection = None
 
     @contextmanager
     def _get_cursor(self):
@@ -579,8 +744,23 @@ class Transaction(object):
         that we catch any exception that happens in here and we rollback the
         transaction
         """
+        call_site = (instrumentation.get_call_site()
+                     if instrumentation.QUERY_LOG.enabled else None)
         with self._get_cursor() as cur:
-            for sql, sql_args in self._queries:
+            for sql, sql_args, batch in _group_queries(self._queries):
+                start = perf_counter()
+                if batch:
+                    try:
+                        self._execute_batch(cur, sql, sql_args)
+                    except Exception as e:
+                        self._raise_execution_error(sql, sql_args, e)
+                    self._record_query(sql, perf_counter() - start,
+                                       cur.rowcount, call_site,
+                                       len(sql_args))
+                    # None of the batched queries retrieve values
+                    self._results.extend([None] * len(sql_args))
+                    continue
+
                 # Execute the current SQL command
                 try:
                     cur.execute(sql, sql_args)
@@ -604,6 +784,8 @@ class Transaction(object):
                     # query, so we need to rollback
                     self._raise_execution_error(sql, sql_args, e)
 
+                self._record_query(sql, perf_counter() - start, cur.rowcount,
+                                   call_site)
                 # Store the results of the current query
                 self._results.append(res)
 
@@ -612,6 +794,109 @@ class Transaction(object):
 
         return self._results
 
+    @_checker
+    def execute_iter(self, sql, sql_args=None, itersize=ITER_SIZE):
+        """Executes a query and iterates over its results on the server
+
+        The results are read through a named (server-side) cursor, in
+        batches of `itersize` rows, so they are never held in memory at once.
+        The queries pending in the transaction are executed first.
+
+        Parameters
+        ----------
+        sql : str
+            The sql query
+        sql_args : list, tuple or dict of objects, optional
+            The arguments to the sql query
+        itersize : int, optional
+            The number of rows fetched in each round trip. Default: ITER_SIZE
+
+        Returns
+        -------
+        generator of DictRow
+            The rows of the query
+
+        Raises
+        ------
+        RuntimeError
+            If invoked outside a context
+
+        Notes
+        -----
+        The cursor only exists inside the transaction, so the rows should be
+        consumed before leaving the context and no other queries should be
+        executed in the transaction while iterating
+        """
+        if self._queries:
+            self.execute()
+        self._open_connection()
+        call_site = (instrumentation.get_call_site()
+                     if instrumentation.QUERY_LOG.enabled else None)
+        self._cursor_count += 1
+        name = 'labman_cursor_%d' % self._cursor_count
+        duration = 0.0
+        rows = 0
+        try:
+            with self._connection.cursor(
+                    name=name, cursor_factory=DictCursor) as cur:
+                batch = None
+                while batch is None or batch:
+                    start = perf_counter()
+                    try:
+                        if batch is None:
+                            cur.execute(sql, sql_args)
+                        batch = cur.fetchmany(itersize)
+                    except Exception as e:
+                        self._raise_execution_error(sql, sql_args, e)
+                    finally:
+                        duration += perf_counter() - start
+                    rows += len(batch)
+                    yield from batch
+        finally:
+            self._record_query(sql, duration, rows, call_site)
+
+    def _record_query(self, sql, duration, rows, call_site, count=1):
+        """Records the execution of a query
+
+        Parameters
+        ----------
+        sql : str
+            The query
+        duration : float
+            The time spent executing the query, in seconds
+        rows : int
+            The number of rows returned or affected by the query
+        call_site : str
+            The labman code that executed the query
+        count : int, optional
+            The number of queries, if executed in a batch. Default: 1
+        """
+        self.query_count += count
+        self.query_time += duration
+        if instrumentation.QUERY_LOG.enabled:
+            instrumentation.QUERY_LOG.record_query(
+                sql, duration, rows, call_site, count=count)
+
+    def _execute_batch(self, cur, sql, sql_args):
+        """Executes the same query with multiple arguments in a few round trips
+
+        Parameters
+        ----------
+        cur : psycopg2.cursor
+            The cursor used to execute the queries
+        sql : str
+            The query, which should not retrieve values
+        sql_args : list of list, tuple or dict
+            The arguments of each of the queries
+        """
+        match = _VALUES_RE.match(sql)
+        if match is not None and '%' not in match.group(1):
+            # Simple inserts are sent as a single multi-row INSERT per page
+            execute_values(cur, match.group(1) + ' %s', sql_args,
+                           template=match.group(2), page_size=BATCH_PAGE_SIZE)
+        else:
+            execute_batch(cur, sql, sql_args, page_size=BATCH_PAGE_SIZE)
+
     @_checker
     def execute(self):
         """Executes the transaction
@@ -744,9 +1029,11 @@ class Transaction(object):
         RuntimeError
             If invoked outside a context
         """
-        # Reset the queries, the results and the index
+        # Reset the queries, the results, the index and the object caches
         self._queries = []
         self._results = []
+        self._object_cache = {}
+        self._row_cache = {}
         try:
             self._connection.commit()
         except Exception:
@@ -764,9 +1051,12 @@ class Transaction(object):
         RuntimeError
             If invoked outside a context
         """
-        # Reset the queries, the results and the index
+        # Reset the queries, the results, the index and the object caches.
+        # Objects created during the transaction no longer exist in the DB
         self._queries = []
         self._results = []
+        self._object_cache = {}
+        self._row_cache = {}
         try:
             self._connection.rollback()
         except Exception:
@@ -779,6 +1069,119 @@ class Transaction(object):
     def index(self):
         return len(self._queries) + len(self._results)
 
+    def get_cached_object(self, cls, id_):
+        """Returns the object of type `cls` with id `id_` if already cached
+
+        Parameters
+        ----------
+        cls : type
+            The type of the object
+        id_ : object
+            The id of the object
+
+        Returns
+        -------
+        object or None
+            The cached object, or None if the object has not been cached in
+            the current transaction
+
+        Notes
+        -----
+        Objects are only cached while inside the context manager. The cache
+        is emptied when the transaction is either committed or rolled back.
+        """
+        if self._contexts_entered == 0:
+            return None
+        return self._object_cache.get((cls, id_))
+
+    def cache_object(self, obj):
+        """Adds the object to the cache of the current transaction
+
+        Parameters
+        ----------
+        obj : labman.db.base.LabmanObject
+            The object to cache
+
+        Notes
+        -----
+        This is a no-op if invoked outside the context manager
+        """
+        if self._contexts_entered == 0:
+            return
+        self._object_cache[(type(obj), obj.id)] = obj
+
+    def get_cached_row(self, table, id_, join_table=None):
+        """Returns the row of `table` with id `id_` if already cached
+
+        Parameters
+        ----------
+        table : str
+            The table of the row
+        id_ : object
+            The id of the row
+        join_table : str, optional
+            The table joined to `table` to build the row
+
+        Returns
+        -------
+        dict or None
+            The cached row, as a {column: value} dict, or None if the row
+            has not been cached in the current transaction
+        """
+        if self._contexts_entered == 0:
+            return None
+        return self._row_cache.get((table, id_), {}).get(join_table)
+
+    def cache_row(self, table, id_, row, join_table=None):
+        """Adds the row to the cache of the current transaction
+
+        Parameters
+        ----------
+        table : str
+            The table of the row
+        id_ : object
+            The id of the row
+        row : dict
+            The row values, as a {column: value} dict
+        join_table : str, optional
+            The table joined to `table` to build the row
+
+        Notes
+        -----
+        This is a no-op if invoked outside the context manager
+        """
+        if self._contexts_entered == 0:
+            return
+        self._row_cache.setdefault((table, id_), {})[join_table] = row
+
+    def update_cached_rows(self, table, id_, column, value):
+        """Updates the value of a column in the cached rows
+
+        Parameters
+        ----------
+        table : str
+            The table of the row
+        id_ : object
+            The id of the row
+        column : str
+            The column being updated
+        value : object
+            The new value of the column
+        """
+        for row in self._row_cache.get((table, id_), {}).values():
+            if column in row:
+                row[column] = value
+
+    def clear_row_cache(self):
+        """Empties the row cache of the current transaction
+
+        Notes
+        -----
+        This should be called after any UPDATE that is not issued through
+        the LabmanObject setters, so the cached rows are not stale
+        """
+        self._row_cache = {}
+
     @_checker
     def add_post_commit_func(self, func, *args, **kwargs):
         """Adds a post commit function
@@ -820,5 +1223,91 @@ class Transaction(object):
         self._post_rollback_funcs.append((func, args, kwargs))
 
 
-# Singleton pattern, create the transaction for the entire system
-TRN = Transaction()
+class TransactionContext(object):
+    """Gives access to the transaction bound to the current thread
+
+    Each thread has its own transaction, so the database can be accessed
+    concurrently from multiple threads. By default, a transaction is
+    created for the thread the first time that it is used, but a different
+    transaction can be bound to the thread for the duration of a task (see
+    `bind` and `bound`). Any attribute of the transaction can be
+    accessed through this object.
+    """
+    def __init__(self):
+        object.__setattr__(self, '_local', local())
+
+    @property
+    def current(self):
+        """The transaction bound to the current thread"""
+        trn = getattr(self._local, 'transaction', None)
+        if trn is None:
+            trn = self._local.transaction = Transaction()
+        return trn
+
+    def bind(self, transaction):
+        """Binds the transaction to the current thread
+
+        Parameters
+        ----------
+        transaction : Transaction
+            The transaction to bind
+
+        Returns
+        -------
+        Transaction or None
+            The transaction previously bound to the thread, to be passed to
+            `unbind`
+        """
+        previous = getattr(self._local, 'transaction', None)
+        self._local.transaction = transaction
+        return previous
+
+    def unbind(self, transaction, previous=None):
+        """Unbinds the transaction from the current thread
+
+        Parameters
+        ----------
+        transaction : Transaction
+            The transaction to unbind
+        previous : Transaction, optional
+            The transaction to bind back to the thread, as returned by `bind`
+        """
+        if getattr(self._local, 'transaction', None) is transaction:
+            self._local.transaction = previous
+
+    @contextmanager
+    def bound(self, transaction=None):
+        """Binds a transaction to the current thread inside the context
+
+        The connection of the transaction is returned to the pool when
+        leaving the context
+
+        Parameters
+        ----------
+        transaction : Transaction, optional
+            The transaction to bind. Default: a new transaction
+        """
+        if transaction is None:
+            transaction = Transaction()
+        previous = self.bind(transaction)
+        try:
+            yield transaction
+        finally:
+            self.unbind(transaction, previous)
+            transaction.release()
+
+    def __enter__(self):
+        return self.current.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.current.__exit__(exc_type, exc_value, traceback)
+
+    def __getattr__(self, name):
+        return getattr(self.current, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.current, name, value)
+
+
+# Singleton pattern, create the transaction context for the entire system
+TRN = TransactionContext()
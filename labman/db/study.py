@@ -34,25 +34,81 @@ class Study(base.LabmanObject):
     _id_column = "study_id"
 
     @classmethod
-    def list_studies(cls):
+    def list_studies(cls, search=None, order_by=None, descending=False,
+                     limit=None, offset=None, after=None):
         """Generates a list of studies with some information about them
 
+        Parameters
+        ----------
+        search : str, optional
+            If provided, return only the studies whose id, title, alias or
+            owner contain the given term
+        order_by : str, optional
+            The column used to sort the studies: 'study_id', 'study_title',
+            'study_alias' or 'owner'. Default: study_id
+        descending : bool, optional
+            Whether to sort the studies in descending order. Default: False
+        limit : int, optional
+            The maximum number of studies to return. Default: all of them
+        offset : int, optional
+            The number of studies to skip
+        after : list, optional
+            The values of `order_by` and study_id of the last study of the
+            previous page
+
         Returns
         -------
-        list of dicts
+        labman.db.base.ListPage of dicts
             The list of studies with a dictionary with the structure:
             {'study_id': int, 'study_title': string, 'study_alias': string,
              'owner': string, 'num_samples': int}
+
+        See Also
+        --------
+        labman.db.base.list_page
         """
         with sql_connection.TRN as TRN:
-            sql = """SELECT study_id, study_title, study_alias, email as owner,
-                            COUNT(sample_id) as num_samples
-                     FROM qiita.study
-                        LEFT JOIN qiita.study_sample USING (study_id)
-                     GROUP BY study_id, study_title, study_alias, email
-                     ORDER BY study_id"""
-            TRN.add(sql)
-            return [dict(r) for r in TRN.execute_fetchindex()]
+            sql = """SELECT study_id, study_title, study_alias, email as owner
+                     FROM qiita.study"""
+            res = base.list_page(
+                sql, [], 'study_id',
+                ['study_id', 'study_title', 'study_alias', 'owner'],
+                search=search, order_by=order_by, descending=descending,
+                limit=limit, offset=offset, after=after)
+
+            # The samples are only counted for the studies in the page
+            num_samples = {}
+            if res:
+                sql = """SELECT study_id, COUNT(sample_id)
+                         FROM qiita.study_sample
+                         WHERE study_id IN %s
+                         GROUP BY study_id"""
+                TRN.add(sql, [tuple(r['study_id'] for r in res)])
+                num_samples = dict(TRN.execute_fetchindex())
+            for r in res:
+                r['num_samples'] = num_samples.get(r['study_id'], 0)
+            return res
+
+    @staticmethod
+    def refresh_progress(study_ids=None):
+        """Recomputes the progress counters of the studies
+
+        The counters are kept up to date as the samples are processed. This
+        is only needed after modifying the compositions directly in the
+        database.
+
+        Parameters
+        ----------
+        study_ids : list of int, optional
+            The studies to refresh. Default: all the studies
+        """
+        with sql_connection.TRN as TRN:
+            if study_ids is None:
+                TRN.add("SELECT qiita.rebuild_study_progress()")
+            else:
+                TRN.add("SELECT qiita.refresh_study_progress(%s::bigint[])",
+                        [list(study_ids)])
+            TRN.execute()
 
     @property
     def title(self):
@@ -111,154 +167,20 @@ class Study(base.LabmanObject):
 
     @property
     def sample_numbers_summary(self):
-        """Retrieves a summary of the status of the samples"""
+        """Retrieves a summary of the status of the samples
+
+        The numbers of samples on each step of the workflows are read from
+        the progress counters of the study
+        """
         with sql_connection.TRN as TRN:
-            sql = """SELECT * FROM
-                (SELECT COUNT(sample_id) AS num_samples
-                         FROM qiita.study_sample
-                         WHERE study_id = %s) ns,
-                -- Number of samples plated
-                (SELECT COUNT(DISTINCT sample_id) AS number_samples_plated
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                         WHERE study_id = %s) nsp,
-                -- Number of samples extracted
-                (SELECT COUNT(DISTINCT sample_id) AS number_samples_extracted
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                         WHERE study_id = %s) nse,
-                -- Number of samples prepared for amplicon libraries
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_amplicon_libraries
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.library_prep_16s_composition
-                                USING (gdna_composition_id)
-                         WHERE study_id = %s) nsal,
-                -- Number of samples included in amplicon pools
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_amplicon_pools
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.library_prep_16s_composition lib
-                                USING (gdna_composition_id)
-                            JOIN qiita.pool_composition_components p
-                                ON lib.composition_id = p.input_composition_id
-                         WHERE study_id = %s) nsap,
-                -- Number of samples included in amplicon sequencing pools
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_amplicon_sequencing_pools
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.library_prep_16s_composition lib
-                                USING (gdna_composition_id)
-                            JOIN qiita.pool_composition_components p
-                                ON lib.composition_id = p.input_composition_id
-                            JOIN qiita.pool_composition pc
-                                ON p.output_pool_composition_id =
-                                    pc.pool_composition_id
-                            JOIN qiita.pool_composition_components p2
-                                ON p2.input_composition_id = pc.composition_id
-                         WHERE study_id = %s) nsasp,
-                -- Number of samples amplicon sequenced
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_amplicon_sequencing_runs
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.library_prep_16s_composition lib
-                                USING (gdna_composition_id)
-                            JOIN qiita.pool_composition_components p
-                                ON lib.composition_id = p.input_composition_id
-                            JOIN qiita.pool_composition pc
-                                ON p.output_pool_composition_id =
-                                    pc.pool_composition_id
-                            JOIN qiita.pool_composition_components p2
-                                ON p2.input_composition_id = pc.composition_id
-                            JOIN qiita.sequencing_process_lanes s
-                                ON s.pool_composition_id =
-                                    p2.output_pool_composition_id
-                         WHERE study_id = %s) nsasr,
-                -- Number of samples compressed
-                (SELECT COUNT(DISTINCT sample_id) AS number_samples_compressed
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.compressed_gdna_composition
-                                USING (gdna_composition_id)
-                         WHERE study_id = %s) nsc,
-                -- Number of samples normalized
-                (SELECT COUNT(DISTINCT sample_id) AS number_samples_normalized
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.compressed_gdna_composition
-                                USING (gdna_composition_id)
-                            JOIN qiita.normalized_gdna_composition
-                                USING (compressed_gdna_composition_id)
-                         WHERE study_id = %s) nsn,
-                -- Number of samples prepared for shotgun libraries
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_shotgun_libraries
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.compressed_gdna_composition
-                                USING (gdna_composition_id)
-                            JOIN qiita.normalized_gdna_composition
-                                USING (compressed_gdna_composition_id)
-                            JOIN qiita.library_prep_shotgun_composition
-                                USING (normalized_gdna_composition_id)
-                         WHERE study_id = %s) nssl,
-                -- Number of samples included in a shotgun pool
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_shotgun_pool
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.compressed_gdna_composition
-                                USING (gdna_composition_id)
-                            JOIN qiita.normalized_gdna_composition
-                                USING (compressed_gdna_composition_id)
-                            JOIN qiita.library_prep_shotgun_composition lib
-                                USING (normalized_gdna_composition_id)
-                            JOIN qiita.pool_composition_components p
-                                ON lib.composition_id = p.input_composition_id
-                         WHERE study_id = %s) nssp,
-                -- Number of samples shotgun sequenced
-                (SELECT COUNT(DISTINCT sample_id) AS
-                    number_samples_shotgun_sequencing_runs
-                         FROM qiita.study_sample
-                            JOIN qiita.sample_composition USING (sample_id)
-                            JOIN qiita.gdna_composition
-                                USING (sample_composition_id)
-                            JOIN qiita.compressed_gdna_composition
-                                USING (gdna_composition_id)
-                            JOIN qiita.normalized_gdna_composition
-                                USING (compressed_gdna_composition_id)
-                            JOIN qiita.library_prep_shotgun_composition lib
-                                USING (normalized_gdna_composition_id)
-                            JOIN qiita.pool_composition_components p
-                                ON lib.composition_id = p.input_composition_id
-                            JOIN qiita.sequencing_process_lanes l
-                                ON p.output_pool_composition_id =
-                                    l.pool_composition_id
-                         WHERE study_id = %s) nsssr"""
-            # Magic number 12 -> the number of times the study id appears
-            # as parameter in the previous query
-            TRN.add(sql, [self.id] * 12)
-            # Magic number 0 -> the previous query only outputs a single row
-            return dict(TRN.execute_fetchindex()[0])
+            sql = """SELECT (SELECT COUNT(sample_id)
+                             FROM qiita.study_sample
+                             WHERE study_id = %s) AS num_samples, sp.*
+                     FROM (SELECT 1) AS s
+                        LEFT JOIN qiita.study_progress sp
+                            ON sp.study_id = %s"""
+            TRN.add(sql, [self.id, self.id])
+            res = dict(TRN.execute_fetchindex()[0])
+            res.pop('study_id')
+            # The counters of a study not processed yet may not be present
+            return {k: v if v is not None else 0 for k, v in res.items()}
@@ -3603,3 +3603,325 @@ BEGIN
     END IF;
 END
 $$ LANGUAGE plpgsql;
+
+-- Materialized lineage of the compositions derived from a sample: maps each
+-- sample, gDNA, 16S library prep, compressed gDNA, normalized gDNA and
+-- shotgun library prep composition to the sample composition it originates
+-- from, and the number of steps from it (depth). The rows are added by the
+-- Composition.create methods. The sample and study are not stored, since
+-- the contents of a sample composition can change after plating; they are
+-- retrieved joining the sample_composition table on its primary key.
+CREATE TABLE qiita.composition_lineage (
+	composition_id       bigint  NOT NULL,
+	sample_composition_id bigint  NOT NULL,
+	depth                integer  NOT NULL,
+	CONSTRAINT pk_composition_lineage PRIMARY KEY ( composition_id ),
+	CONSTRAINT fk_composition_lineage_composition FOREIGN KEY ( composition_id ) REFERENCES qiita.composition( composition_id ),
+	CONSTRAINT fk_composition_lineage_sample_composition FOREIGN KEY ( sample_composition_id ) REFERENCES qiita.sample_composition( sample_composition_id )
+ );
+
+CREATE INDEX idx_composition_lineage ON qiita.composition_lineage ( sample_composition_id );
+
+-- Recomputes the composition lineage from the composition tables. Used to
+-- fill the table when the compositions are created directly in the DB.
+CREATE OR REPLACE FUNCTION qiita.rebuild_composition_lineage() RETURNS void AS $$
+    DELETE FROM qiita.composition_lineage;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT composition_id, sample_composition_id, 0
+        FROM qiita.sample_composition;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT g.composition_id, l.sample_composition_id, l.depth + 1
+        FROM qiita.gdna_composition g
+            JOIN qiita.sample_composition s ON g.sample_composition_id = s.sample_composition_id
+            JOIN qiita.composition_lineage l ON s.composition_id = l.composition_id;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT lp.composition_id, l.sample_composition_id, l.depth + 1
+        FROM qiita.library_prep_16s_composition lp
+            JOIN qiita.gdna_composition g ON lp.gdna_composition_id = g.gdna_composition_id
+            JOIN qiita.composition_lineage l ON g.composition_id = l.composition_id;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT cg.composition_id, l.sample_composition_id, l.depth + 1
+        FROM qiita.compressed_gdna_composition cg
+            JOIN qiita.gdna_composition g ON cg.gdna_composition_id = g.gdna_composition_id
+            JOIN qiita.composition_lineage l ON g.composition_id = l.composition_id;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT ng.composition_id, l.sample_composition_id, l.depth + 1
+        FROM qiita.normalized_gdna_composition ng
+            JOIN qiita.compressed_gdna_composition cg ON ng.compressed_gdna_composition_id = cg.compressed_gdna_composition_id
+            JOIN qiita.composition_lineage l ON cg.composition_id = l.composition_id;
+    INSERT INTO qiita.composition_lineage (composition_id, sample_composition_id, depth)
+        SELECT lp.composition_id, l.sample_composition_id, l.depth + 1
+        FROM qiita.library_prep_shotgun_composition lp
+            JOIN qiita.normalized_gdna_composition ng ON lp.normalized_gdna_composition_id = ng.normalized_gdna_composition_id
+            JOIN qiita.composition_lineage l ON ng.composition_id = l.composition_id;
+$$ LANGUAGE sql;
+
+SELECT qiita.rebuild_composition_lineage();
+
+-- Number of samples of each study that have reached each step of the
+-- amplicon and shotgun workflows. The counters of a study are refreshed
+-- when a process or a change in the plated samples affects it, so the
+-- study summary does not need to walk the whole lab history.
+CREATE TABLE qiita.study_progress (
+	study_id             bigint  NOT NULL,
+	number_samples_plated bigint  NOT NULL DEFAULT 0,
+	number_samples_extracted bigint  NOT NULL DEFAULT 0,
+	number_samples_amplicon_libraries bigint  NOT NULL DEFAULT 0,
+	number_samples_amplicon_pools bigint  NOT NULL DEFAULT 0,
+	number_samples_amplicon_sequencing_pools bigint  NOT NULL DEFAULT 0,
+	number_samples_amplicon_sequencing_runs bigint  NOT NULL DEFAULT 0,
+	number_samples_compressed bigint  NOT NULL DEFAULT 0,
+	number_samples_normalized bigint  NOT NULL DEFAULT 0,
+	number_samples_shotgun_libraries bigint  NOT NULL DEFAULT 0,
+	number_samples_shotgun_pool bigint  NOT NULL DEFAULT 0,
+	number_samples_shotgun_sequencing_runs bigint  NOT NULL DEFAULT 0,
+	CONSTRAINT pk_study_progress PRIMARY KEY ( study_id ),
+	CONSTRAINT fk_study_progress_study FOREIGN KEY ( study_id ) REFERENCES qiita.study( study_id ) ON DELETE CASCADE
+ );
+
+-- Recomputes the progress counters of the given studies. The counters are
+-- numbers of distinct samples, so only the studies affected by a change are
+-- recomputed, instead of adding the samples of the change to the counters.
+-- The rows of the studies are locked first, in order, so the transactions
+-- refreshing the same study run one after the other and the second one
+-- deletes the counters inserted by the first one.
+CREATE OR REPLACE FUNCTION qiita.refresh_study_progress(in_study_ids BIGINT[]) RETURNS void AS $$
+    SELECT study_id
+        FROM qiita.study
+        WHERE study_id = ANY(in_study_ids)
+        ORDER BY study_id
+        FOR NO KEY UPDATE;
+    DELETE FROM qiita.study_progress WHERE study_id = ANY(in_study_ids);
+    INSERT INTO qiita.study_progress (
+            study_id, number_samples_plated, number_samples_extracted,
+            number_samples_amplicon_libraries, number_samples_amplicon_pools,
+            number_samples_amplicon_sequencing_pools,
+            number_samples_amplicon_sequencing_runs, number_samples_compressed,
+            number_samples_normalized, number_samples_shotgun_libraries,
+            number_samples_shotgun_pool, number_samples_shotgun_sequencing_runs)
+        WITH compositions AS (
+            -- All the compositions derived from the samples of the studies
+            SELECT study_id, sample_id, l.composition_id, ct.description AS composition_type
+            FROM qiita.study_sample
+                JOIN qiita.sample_composition sc USING (sample_id)
+                JOIN qiita.composition_lineage l ON sc.sample_composition_id = l.sample_composition_id
+                JOIN qiita.composition c ON l.composition_id = c.composition_id
+                JOIN qiita.composition_type ct USING (composition_type_id)
+            WHERE study_id = ANY(in_study_ids)),
+        pools AS (
+            SELECT study_id, sample_id, composition_type, pcc.output_pool_composition_id AS pool_composition_id
+            FROM compositions c
+                JOIN qiita.pool_composition_components pcc ON c.composition_id = pcc.input_composition_id),
+        sequencing_pools AS (
+            SELECT study_id, sample_id, composition_type, pcc.output_pool_composition_id AS pool_composition_id
+            FROM pools p
+                JOIN qiita.pool_composition pc USING (pool_composition_id)
+                JOIN qiita.pool_composition_components pcc ON pc.composition_id = pcc.input_composition_id),
+        steps AS (
+            SELECT study_id, sample_id, composition_type AS step
+            FROM compositions
+            UNION
+            SELECT study_id, sample_id, 'pool ' || composition_type
+            FROM pools
+            UNION
+            SELECT study_id, sample_id, 'sequencing pool ' || composition_type
+            FROM sequencing_pools
+            UNION
+            SELECT study_id, sample_id, 'pool run ' || composition_type
+            FROM pools
+                JOIN qiita.sequencing_process_lanes USING (pool_composition_id)
+            UNION
+            SELECT study_id, sample_id, 'sequencing pool run ' || composition_type
+            FROM sequencing_pools
+                JOIN qiita.sequencing_process_lanes USING (pool_composition_id))
+        SELECT s.study_id,
+               COUNT(DISTINCT CASE WHEN step = 'sample' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'gDNA' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = '16S library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'pool 16S library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'sequencing pool 16S library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'sequencing pool run 16S library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'compressed gDNA' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'normalized gDNA' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'shotgun library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'pool shotgun library prep' THEN sample_id END),
+               COUNT(DISTINCT CASE WHEN step = 'pool run shotgun library prep' THEN sample_id END)
+        FROM (SELECT DISTINCT unnest(in_study_ids) AS study_id) s
+            LEFT JOIN steps USING (study_id)
+        GROUP BY s.study_id;
+$$ LANGUAGE sql;
+
+-- Recomputes the progress counters of the studies of the samples processed
+-- by the given process: the samples of the compositions generated by the
+-- process, of the pools sequenced by the process and of their components
+CREATE OR REPLACE FUNCTION qiita.refresh_process_study_progress(in_process_id BIGINT) RETURNS void AS $$
+    WITH RECURSIVE compositions AS (
+        SELECT composition_id
+        FROM qiita.composition
+        WHERE upstream_process_id = in_process_id
+        UNION
+        SELECT pc.composition_id
+        FROM qiita.sequencing_process
+            JOIN qiita.sequencing_process_lanes USING (sequencing_process_id)
+            JOIN qiita.pool_composition pc USING (pool_composition_id)
+        WHERE process_id = in_process_id
+        UNION
+        SELECT pcc.input_composition_id
+        FROM compositions c
+            JOIN qiita.pool_composition pc ON c.composition_id = pc.composition_id
+            JOIN qiita.pool_composition_components pcc ON pc.pool_composition_id = pcc.output_pool_composition_id)
+    SELECT qiita.refresh_study_progress(array_agg(DISTINCT study_id))
+    FROM compositions
+        JOIN qiita.composition_lineage l USING (composition_id)
+        JOIN qiita.sample_composition sc ON l.sample_composition_id = sc.sample_composition_id
+        JOIN qiita.study_sample USING (sample_id);
+$$ LANGUAGE sql;
+
+-- Recomputes the progress counters of all the studies
+CREATE OR REPLACE FUNCTION qiita.rebuild_study_progress() RETURNS void AS $$
+    SELECT qiita.refresh_study_progress(array_agg(study_id)) FROM qiita.study;
+$$ LANGUAGE sql;
+
+SELECT qiita.rebuild_study_progress();
+
+-- Full-text search of the plate and well notes. The notes are indexed in a
+-- stored tsvector column, kept in sync with the notes by a trigger, so the
+-- searches use the GIN indexes instead of parsing the notes of every row.
+-- The english configuration is used so common words are ignored.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE qiita.plate ADD COLUMN notes_tsv tsvector;
+ALTER TABLE qiita.composition ADD COLUMN notes_tsv tsvector;
+
+CREATE OR REPLACE FUNCTION qiita.update_notes_tsv() RETURNS trigger AS $$
+BEGIN
+    NEW.notes_tsv := to_tsvector('english', NEW.notes);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_plate_notes_tsv BEFORE INSERT OR UPDATE OF notes ON qiita.plate
+    FOR EACH ROW EXECUTE PROCEDURE qiita.update_notes_tsv();
+CREATE TRIGGER trg_composition_notes_tsv BEFORE INSERT OR UPDATE OF notes ON qiita.composition
+    FOR EACH ROW EXECUTE PROCEDURE qiita.update_notes_tsv();
+
+UPDATE qiita.plate SET notes_tsv = to_tsvector('english', notes) WHERE notes IS NOT NULL;
+UPDATE qiita.composition SET notes_tsv = to_tsvector('english', notes) WHERE notes IS NOT NULL;
+
+CREATE INDEX idx_plate_notes_tsv ON qiita.plate USING gin ( notes_tsv );
+CREATE INDEX idx_composition_notes_tsv ON qiita.composition USING gin ( notes_tsv );
+
+-- Trigram index to search the plated samples by part of their id
+CREATE INDEX idx_sample_composition_sample_id_trgm ON qiita.sample_composition USING gin ( sample_id gin_trgm_ops );
+
+-- Formats the well position in the "A1", "H12" form, as
+-- labman.db.container._format_well_id
+CREATE OR REPLACE FUNCTION qiita.format_well_id(in_row INTEGER, in_col INTEGER) RETURNS VARCHAR AS $$
+DECLARE
+    result  VARCHAR := '';
+    r       INTEGER := in_row;
+BEGIN
+    WHILE r > 0 LOOP
+        result := chr(ascii('A') + (r - 1) % 26) || result;
+        r := (r - 1) / 26;
+    END LOOP;
+    RETURN result || in_col;
+END
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Updates the contents of the given sample compositions, applying the same
+-- rules as the GUI: a control is stored as control.plate.well, a sample that
+-- exists in qiita.study_sample is stored in sample_id and an unknown sample
+-- is only stored in the content. The samples plated in more than one well of
+-- a plate are renamed to sample.plate.well, while a sample left in a single
+-- well of a plate recovers its name. The progress counters of the studies of
+-- the samples involved are refreshed. If a composition is given more than
+-- once, its last content is used. Returns the new content and sample of
+-- each of the given compositions, and whether it is a known sample or a
+-- control.
+CREATE OR REPLACE FUNCTION qiita.update_sample_compositions(in_sc_ids BIGINT[], in_contents VARCHAR[])
+        RETURNS TABLE (sample_composition_id BIGINT, content VARCHAR, sample_id VARCHAR, sample_ok BOOLEAN) AS $$
+#variable_conflict use_column
+DECLARE
+    es_type_id          BIGINT;
+    affected_samples    VARCHAR[];
+    affected_plates     BIGINT[];
+BEGIN
+    SELECT t.sample_composition_type_id INTO es_type_id
+        FROM qiita.sample_composition_type t
+        WHERE t.external_id = 'experimental sample';
+
+    WITH requested AS (
+        SELECT DISTINCT ON (r.sc_id) r.sc_id, r.new_content
+        FROM (SELECT in_sc_ids[i] AS sc_id, in_contents[i] AS new_content, i AS idx
+              FROM generate_subscripts(in_sc_ids, 1) AS i) r
+        ORDER BY r.sc_id, r.idx DESC),
+    changes AS (
+        -- The compositions whose contents change
+        SELECT sc.sample_composition_id AS sc_id, sc.sample_id AS old_sample_id,
+               rq.new_content, ctrl.sample_composition_type_id AS ctrl_type_id,
+               w.plate_id, w.plate_id || '.' || qiita.format_well_id(w.row_num, w.col_num) AS well_suffix,
+               EXISTS (SELECT 1 FROM qiita.study_sample ss WHERE ss.sample_id = rq.new_content) AS known
+        FROM requested rq
+            JOIN qiita.sample_composition sc ON sc.sample_composition_id = rq.sc_id
+            JOIN qiita.sample_composition_type t ON t.sample_composition_type_id = sc.sample_composition_type_id
+            JOIN qiita.composition c ON c.composition_id = sc.composition_id
+            JOIN qiita.well w ON w.container_id = c.container_id
+            LEFT JOIN qiita.sample_composition_type ctrl ON ctrl.external_id = rq.new_content
+        WHERE NOT (t.external_id = rq.new_content
+                   OR (sc.sample_composition_type_id = es_type_id
+                       AND (sc.sample_id = rq.new_content
+                            OR (sc.sample_id IS NULL AND sc.content = rq.new_content))))),
+    updated AS (
+        UPDATE qiita.sample_composition sc
+            SET sample_composition_type_id = COALESCE(ch.ctrl_type_id, es_type_id),
+                sample_id = CASE WHEN ch.ctrl_type_id IS NULL AND ch.known THEN ch.new_content END,
+                content = CASE WHEN ch.ctrl_type_id IS NULL THEN ch.new_content
+                               ELSE ch.new_content || '.' || ch.well_suffix END
+            FROM changes ch
+            WHERE sc.sample_composition_id = ch.sc_id
+            RETURNING ch.plate_id, ch.old_sample_id, sc.sample_id AS new_sample_id)
+    SELECT (SELECT array_agg(DISTINCT s.sample_id)
+            FROM updated u, LATERAL (VALUES (u.old_sample_id), (u.new_sample_id)) AS s (sample_id)
+            WHERE s.sample_id IS NOT NULL),
+           (SELECT array_agg(DISTINCT u.plate_id) FROM updated u)
+        INTO affected_samples, affected_plates;
+
+    IF affected_samples IS NOT NULL THEN
+        -- Rename the duplicated samples in the plates modified
+        WITH plated AS (
+            SELECT sc.sample_composition_id AS sc_id, sc.sample_id,
+                   w.plate_id || '.' || qiita.format_well_id(w.row_num, w.col_num) AS well_suffix,
+                   COUNT(*) OVER (PARTITION BY w.plate_id, sc.sample_id) AS num_wells
+            FROM qiita.sample_composition sc
+                JOIN qiita.composition c ON c.composition_id = sc.composition_id
+                JOIN qiita.well w ON w.container_id = c.container_id
+            WHERE sc.sample_id = ANY(affected_samples)
+                AND w.plate_id = ANY(affected_plates)),
+        new_contents AS (
+            SELECT p.sc_id,
+                   CASE WHEN p.num_wells > 1 THEN p.sample_id || '.' || p.well_suffix
+                        ELSE p.sample_id END AS new_content
+            FROM plated p)
+        UPDATE qiita.sample_composition sc
+            SET content = nc.new_content
+            FROM new_contents nc
+            WHERE sc.sample_composition_id = nc.sc_id
+                AND sc.content != nc.new_content;
+
+        PERFORM qiita.refresh_study_progress(array_agg(DISTINCT ss.study_id))
+            FROM qiita.study_sample ss
+            WHERE ss.sample_id = ANY(affected_samples);
+    END IF;
+
+    RETURN QUERY
+        SELECT sc.sample_composition_id, sc.content, sc.sample_id,
+               sc.sample_composition_type_id != es_type_id OR sc.sample_id IS NOT NULL
+        FROM generate_subscripts(in_sc_ids, 1) AS i
+            JOIN qiita.sample_composition sc ON sc.sample_composition_id = in_sc_ids[i]
+        ORDER BY i;
+END
+$$ LANGUAGE plpgsql;
+
+-- Index to find the other wells where a sample has been plated
+CREATE INDEX idx_sample_composition_sample_id ON qiita.sample_composition ( sample_id );
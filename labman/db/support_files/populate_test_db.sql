@@ -1029,4 +1029,8 @@ BEGIN
     -- Update the combo index value
     UPDATE qiita.shotgun_primer_set SET current_combo_index = combo_idx;
 
-END $do$
+END $do$;
+
+-- The compositions have been inserted directly, fill their lineage
+SELECT qiita.rebuild_composition_lineage();
+SELECT qiita.rebuild_study_progress();
@@ -48,6 +48,8 @@ def reset_test_db():
         with open(db_test, 'r') as f:
             TRN.add(f.read())
         TRN.execute()
+    # The lookup tables have been recreated, make sure that they are reloaded
+    labman.db.base.clear_lookup_tables()
 
 
 class LabmanTestCase(TestCase):
@@ -1,21 +1,20 @@
 #!/usr/bin/env python
 
 from datetime import datetime
-from itertools import chain
 import re
 
-import numpy as np
 import click
 
-from labman.db.process import (
-    SamplePlatingProcess, GDNAExtractionProcess, GDNAPlateCompressionProcess,
-    LibraryPrep16SProcess, NormalizationProcess, QuantificationProcess,
-    LibraryPrepShotgunProcess, PoolingProcess, SequencingProcess)
+from labman.db.process import SamplePlatingProcess
 from labman.db.user import User
-from labman.db.plate import PlateConfiguration, Plate
-from labman.db.equipment import Equipment
-from labman.db.composition import ReagentComposition
+from labman.db.plate import PlateConfiguration
 from labman.db.sql_connection import TRN
+from labman.benchmark.workflows import (
+    create_gdna_extraction_process, create_amplicon_prep,
+    create_compression_process, create_quantification_process,
+    create_pool_quantification_process, create_normalization_process,
+    create_shotgun_process, create_plate_pool_process,
+    create_pools_pool_process, create_sequencing_process)
 
 
 def get_samples():
@@ -46,108 +45,6 @@ def create_sample_plate_process(user, samples):
     return sp_process, sample_plate
 
 
-def create_gdna_extraction_process(user, plate):
-    kingfisher = Equipment(11)
-    epmotion = Equipment(6)
-    epmotion_tool = Equipment(15)
-    extraction_kit = ReagentComposition(1)
-    ext_process = GDNAExtractionProcess.create(
-        user, plate, kingfisher, epmotion, epmotion_tool, extraction_kit, 100,
-        'GDNA test plate %s' % datetime.now())
-    gdna_plate = ext_process.plates[0]
-    return ext_process, gdna_plate
-
-
-def create_amplicon_prep(user, plate):
-    primer_plate = Plate(11)
-    epmotion = Equipment(6)
-    master_mix = ReagentComposition(2)
-    water_lot = ReagentComposition(3)
-    epmotion_tool_tm300 = Equipment(16)
-    epmotion_tool_tm50 = Equipment(17)
-    amplicon_process = LibraryPrep16SProcess.create(
-        user, plate, primer_plate, 'Amplicon test plate %s' % datetime.now(),
-        epmotion, epmotion_tool_tm300, epmotion_tool_tm50, master_mix,
-        water_lot, 75,)
-    amplicon_plate = amplicon_process.plates[0]
-    return amplicon_process, amplicon_plate
-
-
-def create_compression_process(user, gdna_plates):
-    comp_process = GDNAPlateCompressionProcess.create(
-        user, gdna_plates, 'Compressed test plate %s' % datetime.now(),
-        Equipment(6))
-    compressed_plate = comp_process.plates[0]
-    return comp_process, compressed_plate
-
-
-def create_quantification_process(user, plate):
-    plate_config = plate.plate_configuration
-    concentrations = np.around(
-        np.random.rand(plate_config.num_rows, plate_config.num_columns), 6)
-    quant_process = QuantificationProcess.create(user, plate, concentrations)
-    return quant_process
-
-
-def create_pool_quantification_process(user, pools):
-    concentrations = np.around(np.random.rand(len(pools)), 6)
-    concentrations = [{'composition': p, 'concentration': c}
-                      for p, c in zip(pools, concentrations)]
-    return QuantificationProcess.create_manual(user, concentrations)
-
-
-def create_normalization_process(user, quant_process):
-    water = ReagentComposition(3)
-    norm_process = NormalizationProcess.create(
-        user, quant_process, water,
-        'Normalized test plate %s' % datetime.now())
-    norm_plate = norm_process.plates[0]
-    return norm_process, norm_plate
-
-
-def create_shotgun_process(user, norm_plate):
-    kappa = ReagentComposition(4)
-    stub = ReagentComposition(5)
-    shotgun_process = LibraryPrepShotgunProcess.create(
-        user, norm_plate, 'Test Shotgun Library %s' % datetime.now(), kappa,
-        stub, 4000, Plate(19), Plate(20))
-    shotgun_plate = shotgun_process.plates[0]
-    return shotgun_process, shotgun_plate
-
-
-def create_plate_pool_process(user, quant_process, plate, func_data):
-    input_compositions = []
-    echo = Equipment(8)
-    for well in chain.from_iterable(plate.layout):
-        if well is not None:
-            input_compositions.append({
-                'composition': well.composition, 'input_volume': 1,
-                'percentage_of_output': 1/9.0})
-    pool_process = PoolingProcess.create(
-        user, quant_process, 'New test pool name %s' % datetime.now(),
-        4, input_compositions, func_data, robot=echo)
-    return pool_process
-
-
-def create_pools_pool_process(user, quant_process, pools):
-    input_compositions = [
-        {'composition': p, 'input_volume': 1, 'percentage_of_output': 1/9.0}
-        for p in pools]
-    pool_process = PoolingProcess.create(
-        user, quant_process, 'New pool name %s' % datetime.now(), 5,
-        input_compositions, {"function": "amplicon_pool", "parameters": {}})
-    return pool_process
-
-
-def create_sequencing_process(user, pools):
-    seq_process = SequencingProcess.create(
-        user, pools, 'New sequencing run %s' % datetime.now(),
-        'Run experiment %s' % datetime.now(), Equipment(18), 151, 151,
-        User('admin@foo.bar'),
-        contacts=[User('test@foo.bar'), User('demo@microbio.me')])
-    return seq_process
-
-
 def amplicon_workflow(user, samples):
     # Sample Plating
     sp_process, sample_plate = create_sample_plate_process(user, samples[:96])
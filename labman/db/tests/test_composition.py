@@ -9,7 +9,9 @@
 from unittest import main
 
 from labman.db.exceptions import LabmanUnknownIdError
+from labman.db.base import get_column_types
 from labman.db.testing import LabmanTestCase
+from labman.db.sql_connection import TRN
 from labman.db.container import Tube, Well
 from labman.db.study import Study
 from labman.db.plate import Plate
@@ -43,6 +45,16 @@ class TestsComposition(LabmanTestCase):
                          LibraryPrepShotgunComposition(1))
         self.assertEqual(Composition.factory(3078), PoolComposition(1))
 
+    def test_composition_factory_many(self):
+        obs = Composition.factory_many([3081, 3073, 3078, 3081])
+        exp = [SampleComposition(1), ReagentComposition(1),
+               PoolComposition(1), SampleComposition(1)]
+        self.assertEqual(obs, exp)
+        self.assertEqual(Composition.factory_many([]), [])
+
+        with self.assertRaises(LabmanUnknownIdError):
+            Composition.factory_many([3081, 1000000])
+
     def test_reagent_composition_list_reagents(self):
         obs = ReagentComposition.list_reagents()
         exp = ['157022406', '443912', 'KHP1', 'RNBF7110', 'STUBS1']
@@ -187,6 +199,9 @@ class TestsComposition(LabmanTestCase):
         self.assertEqual(tester.sample_composition_type, 'experimental sample')
         self.assertEqual(tester.sample_id, '1.SKM8.640201')
         self.assertEqual(tester.content, '1.SKM8.640201')
+        # The progress counters of the study have been updated
+        self.assertEqual(
+            Study(1).sample_numbers_summary['number_samples_plated'], 13)
 
         # This test here tests that the code automatically detects when a
         # sample is duplicated in the plate and adds the plate ID and
@@ -239,6 +254,17 @@ class TestsComposition(LabmanTestCase):
         self.assertEqual(tester.sample_composition_type, 'blank')
         self.assertIsNone(tester.sample_id)
         self.assertEqual(tester.content, 'blank.21.H1')
+        self.assertEqual(
+            Study(1).sample_numbers_summary['number_samples_plated'], 12)
+
+        # The update, including the renaming of the duplicated samples, takes
+        # a single query
+        with TRN:
+            count = TRN.query_count
+            self.assertEqual(tester.update('1.SKB1.640202'),
+                             ('1.SKB1.640202.21.H1', True))
+            self.assertEqual(TRN.query_count - count, 1)
+        self.assertEqual(SampleComposition(1).content, '1.SKB1.640202.21.A1')
 
     def test_gDNA_composition_attributes(self):
         obs = GDNAComposition(1)
@@ -291,6 +317,35 @@ class TestsComposition(LabmanTestCase):
         self.assertEqual(obs.composition_id, 3086)
         self.assertEqual(obs.study, Study(1))
 
+    def test_root_sample(self):
+        self.assertEqual(SampleComposition(1).root_sample,
+                         SampleComposition(1))
+        self.assertEqual(GDNAComposition(1).root_sample, SampleComposition(1))
+        self.assertEqual(LibraryPrep16SComposition(1).root_sample,
+                         SampleComposition(1))
+        self.assertEqual(CompressedGDNAComposition(1).root_sample,
+                         SampleComposition(1))
+        self.assertEqual(NormalizedGDNAComposition(1).root_sample,
+                         SampleComposition(1))
+        self.assertEqual(LibraryPrepShotgunComposition(1).root_sample,
+                         SampleComposition(1))
+        # Compositions not derived from a single sample
+        self.assertIsNone(ReagentComposition(1).root_sample)
+        self.assertIsNone(PoolComposition(1).root_sample)
+
+    def test_get_root_samples(self):
+        comps = [LibraryPrepShotgunComposition(1), ReagentComposition(1),
+                 GDNAComposition(1)]
+        with TRN:
+            obs = Composition.get_root_samples(comps)
+            self.assertEqual(obs, [SampleComposition(1), None,
+                                   SampleComposition(1)])
+            # The rows of the sample compositions are cached
+            count = TRN.query_count
+            self.assertEqual(obs[0].content, '1.SKB1.640202.21.A1')
+            self.assertEqual(TRN.query_count, count)
+        self.assertEqual(Composition.get_root_samples([]), [])
+
     def test_pool_composition_pools(self):
         obs = PoolComposition.list_pools()
         exp = [{'pool_composition_id': 1,
@@ -384,6 +439,20 @@ class TestCreateControlSample(LabmanTestCase):
                             'Represents an extraction well loaded with Zymo '
                             'Mock community.'}]
         self.assertEqual(obs, exp)
+        # The new type is available through the lookup table cache
+        self.assertIsNotNone(
+            SampleComposition._get_sample_composition_type_id(
+                'testing.control'))
+
+    def test_get_column_types(self):
+        obs = get_column_types('qiita.normalized_gdna_composition',
+                               ['water_volume', 'dna_volume',
+                                'compressed_gdna_composition_id'])
+        self.assertEqual(obs, ['real', 'real', 'bigint'])
+
+        with self.assertRaises(ValueError):
+            get_column_types('qiita.normalized_gdna_composition',
+                             ['dna_volume', 'not_a_column'])
 
 
 if __name__ == '__main__':
@@ -6,9 +6,12 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from os import environ
 from unittest import main, TestCase
 from tempfile import NamedTemporaryFile
 
+from mock import patch
+
 from labman.db.configuration_manager import ConfigurationManager
 
 
@@ -18,7 +21,7 @@ class TestConfigurationManager(TestCase):
             ConfigurationManager.create(
                 tmp_f.name, True, 'db_host', 'db_port', 'db_name', 'db_user',
                 'db_password', 'db_admin_user', 'db_admin_password',
-                '/path/to/logdir', '')
+                '/path/to/logdir', '', cookie_secret='secret')
 
             with open(tmp_f.name) as obs_f:
                 obs = obs_f.read()
@@ -44,8 +47,38 @@ class TestConfigurationManager(TestCase):
             exp = EXP_CONFIG_FILE_QIITA.splitlines()
 
             # Removing the first line as it contains a date that is generated
-            # when the test is run
-            self.assertEqual(obs[1:], exp)
+            # when the test is run, and the last one as it contains the
+            # randomly generated cookie secret
+            self.assertEqual(obs[1:-1], exp)
+            self.assertTrue(obs[-1].startswith('COOKIE_SECRET='))
+            self.assertGreater(len(obs[-1]), len('COOKIE_SECRET='))
+
+    def test_pool_size(self):
+        with NamedTemporaryFile() as tmp_f:
+            ConfigurationManager.create(
+                tmp_f.name, True, 'db_host', 5432, 'db_name', 'db_user',
+                'db_password', 'db_admin_user', 'db_admin_password',
+                '/path/to/logdir', '', workers=8)
+            with patch.dict(environ, {'LABMAN_CONFIG_FP': tmp_f.name}):
+                obs = ConfigurationManager()
+            self.assertEqual(obs.workers, 8)
+            self.assertEqual(obs.pool_size, 9)
+
+            ConfigurationManager.create(
+                tmp_f.name, True, 'db_host', 5432, 'db_name', 'db_user',
+                'db_password', 'db_admin_user', 'db_admin_password',
+                '/path/to/logdir', '', workers=8, pool_size=20)
+            with patch.dict(environ, {'LABMAN_CONFIG_FP': tmp_f.name}):
+                obs = ConfigurationManager()
+            self.assertEqual(obs.pool_size, 20)
+
+            ConfigurationManager.create(
+                tmp_f.name, True, 'db_host', 5432, 'db_name', 'db_user',
+                'db_password', 'db_admin_user', 'db_admin_password',
+                '/path/to/logdir', '', workers=8, pool_size=8)
+            with patch.dict(environ, {'LABMAN_CONFIG_FP': tmp_f.name}):
+                with self.assertRaises(ValueError):
+                    ConfigurationManager()
 
 
 EXP_CONFIG_FILE = """
@@ -63,10 +96,19 @@ ADMIN_PASSWORD=db_admin_password
 DATABASE=db_name
 HOST=db_host
 PORT=db_port
+QUERY_LOG=False
+SLOW_QUERY_THRESHOLD=500
+# Maximum number of connections of each process. Default: WORKERS + 1
+POOL_SIZE=
 
 # ------------------------- QIITA SETTINGS ----------------------------------
 [qiita]
 SERVER_CERT=
+
+# ------------------------- WEB SETTINGS ------------------------------------
+[web]
+WORKERS=4
+COOKIE_SECRET=secret
 """
 
 EXP_CONFIG_FILE_QIITA = """
@@ -84,10 +126,18 @@ ADMIN_PASSWORD=db_admin_password
 DATABASE=db_name
 HOST=db_host
 PORT=db_port
+QUERY_LOG=False
+SLOW_QUERY_THRESHOLD=500
+# Maximum number of connections of each process. Default: WORKERS + 1
+POOL_SIZE=
 
 # ------------------------- QIITA SETTINGS ----------------------------------
 [qiita]
 SERVER_CERT=server_cert
+
+# ------------------------- WEB SETTINGS ------------------------------------
+[web]
+WORKERS=4
 """
 
 
@@ -9,6 +9,7 @@
 from unittest import main
 
 from labman.db.testing import LabmanTestCase
+from labman.db.sql_connection import TRN
 from labman.db.container import Well, Tube, Container
 from labman.db.plate import Plate
 from labman.db.process import SamplePlatingProcess, PoolingProcess
@@ -20,6 +21,11 @@ class TestContainer(LabmanTestCase):
         self.assertEqual(Container.factory(3076), Tube(4))
         self.assertEqual(Container.factory(1824), Well(1824))
 
+    def test_factory_many(self):
+        self.assertEqual(Container.factory_many([1824, 3076]),
+                         [Well(1824), Tube(4)])
+        self.assertEqual(Container.factory_many([]), [])
+
 
 class TestTube(LabmanTestCase):
     # The creation of a tube is always linked to a Process, we are going to
@@ -65,6 +71,16 @@ class TestWell(LabmanTestCase):
         self.assertEqual(Well(54).well_id, 'E6')
         self.assertEqual(Well(96).well_id, 'H12')
 
+    def test_identity_map(self):
+        with TRN:
+            tester = Well(1)
+            self.assertIs(Well(1), tester)
+            self.assertIsNot(Well(2), tester)
+            self.assertIsNot(Well(1, bypass_cache=True), tester)
+        # Outside the transaction, objects are not shared
+        self.assertIsNot(Well(1), Well(1))
+        self.assertEqual(Well(1), Well(1))
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,83 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import main, TestCase
+
+from labman.db.instrumentation import QueryLog, QUERY_LOG, get_call_site
+from labman.db.sql_connection import Transaction
+from labman.db.plate import Plate
+
+
+class TestQueryLog(TestCase):
+    def test_get_call_site(self):
+        obs = get_call_site()
+        self.assertTrue(obs.startswith('db/tests/test_instrumentation.py:'))
+        self.assertTrue(obs.endswith('(test_get_call_site)'))
+
+    def test_record_query(self):
+        log = QueryLog(True, 10)
+        log.record_query('SELECT  *\n FROM qiita.plate', 0.002, 3, 'site1')
+        log.record_query('SELECT * FROM qiita.well', 0.02, 5, 'site2')
+        log.record_query('INSERT INTO qiita.well', 0.001, 4, 'site2',
+                         count=4)
+        obs = log.summary()
+        self.assertTrue(obs['enabled'])
+        self.assertEqual(obs['slow_query_threshold'], 10)
+        self.assertEqual(
+            [(cs['call_site'], cs['count'], cs['rows'])
+             for cs in obs['call_sites']],
+            [('site2', 5, 9), ('site1', 1, 3)])
+        self.assertAlmostEqual(obs['call_sites'][0]['max_ms'], 20)
+        self.assertEqual([q['sql'] for q in obs['queries']],
+                         ['INSERT INTO qiita.well', 'SELECT * FROM qiita.well',
+                          'SELECT * FROM qiita.plate'])
+        self.assertEqual(len(obs['slow_queries']), 1)
+        self.assertEqual(obs['slow_queries'][0]['call_site'], 'site2')
+
+        log.record_request('GET', '/plate/21/', 200, 12, 0.5)
+        obs = log.summary()
+        self.assertEqual(len(obs['requests']), 1)
+        self.assertEqual(obs['requests'][0]['queries'], 12)
+        self.assertEqual(obs['requests'][0]['db_time_ms'], 500)
+
+        log.reset()
+        obs = log.summary()
+        self.assertEqual(obs['call_sites'], [])
+        self.assertEqual(obs['queries'], [])
+        self.assertEqual(obs['requests'], [])
+
+    def test_transaction_instrumentation(self):
+        QUERY_LOG.reset()
+        trn = Transaction()
+        with trn:
+            trn.add("SELECT 42")
+            trn.add("SELECT 43")
+            trn.execute()
+        self.assertEqual(trn.query_count, 2)
+        self.assertGreater(trn.query_time, 0)
+
+        obs = QUERY_LOG.summary()
+        self.assertEqual(len(obs['queries']), 2)
+        self.assertTrue(obs['queries'][0]['call_site'].endswith(
+            '(test_transaction_instrumentation)'))
+
+        # The attribute accesses are attributed to the property, not to the
+        # attribute retrieval helpers
+        plate = Plate(21)
+        QUERY_LOG.reset()
+        plate.external_id
+        obs = QUERY_LOG.summary()
+        self.assertEqual(len(obs['call_sites']), 1)
+        self.assertTrue(obs['call_sites'][0]['call_site'].startswith(
+            'db/plate.py:'))
+        self.assertTrue(obs['call_sites'][0]['call_site'].endswith(
+            '(external_id)'))
+
+
+if __name__ == '__main__':
+    main()
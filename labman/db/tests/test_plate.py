@@ -10,8 +10,10 @@ from unittest import main
 from types import GeneratorType
 
 from labman.db.testing import LabmanTestCase
+from labman.db.sql_connection import TRN
 from labman.db.plate import PlateConfiguration, Plate
 from labman.db.container import Well
+from labman.db.composition import SampleComposition
 from labman.db.exceptions import LabmanError
 from labman.db.study import Study
 from labman.db.user import User
@@ -86,6 +88,39 @@ class TestPlate(LabmanTestCase):
             Plate.search(plate_notes='interesting', well_notes='write',
                          query_type='UNION'), [plate22, plate23])
 
+        # The results are sorted by relevance: plate 23 matches both the
+        # plate and the well notes
+        obs = Plate.search(plate_notes='notes', well_notes='write',
+                           query_type='UNION')
+        self.assertEqual(obs, [plate23, plate22])
+        self.assertEqual(obs.total, 2)
+        obs = Plate.search(plate_notes='notes', well_notes='write',
+                           query_type='UNION', limit=1)
+        self.assertEqual(obs, [plate23])
+        self.assertEqual(obs.total, 2)
+        obs = Plate.search(plate_notes='notes', well_notes='write',
+                           query_type='UNION', limit=1, offset=1)
+        self.assertEqual(obs, [plate22])
+        obs = Plate.search(plate_notes='notes', well_notes='write',
+                           query_type='UNION', limit=1, offset=5)
+        self.assertEqual(obs, [])
+        self.assertEqual(obs.total, 2)
+
+        # The search index is updated with the notes
+        plate22.notes = None
+        self.assertEqual(Plate.search(plate_notes='interesting'), [])
+
+        # Search by part of the sample ids
+        self.assertEqual(Plate.search(samples=['SKB1.6402']), [])
+        self.assertEqual(
+            Plate.search(samples=['SKB1.6402'], partial_sample_match=True),
+            [plate21])
+        self.assertEqual(
+            Plate.search(samples=['skb1', '%'], partial_sample_match=True),
+            [plate21])
+        self.assertEqual(
+            Plate.search(samples=['%'], partial_sample_match=True), [])
+
     def test_list_plates(self):
         # Test returning all plates
         obs = Plate.list_plates()
@@ -171,6 +206,45 @@ class TestPlate(LabmanTestCase):
                    'studies': ['Identification of the Microbiomes '
                                'for Cannabis Soils']}])
 
+    def test_list_plates_paginated(self):
+        obs = Plate.list_plates(limit=2)
+        self.assertEqual(obs, [{'plate_id': 1,
+                                'external_id': 'EMP 16S V4 primer plate 1'},
+                               {'plate_id': 2,
+                                'external_id': 'EMP 16S V4 primer plate 2'}])
+        self.assertGreaterEqual(obs.total, 26)
+        self.assertEqual(obs.filtered, obs.total)
+
+        obs = Plate.list_plates(limit=1, offset=20)
+        self.assertEqual(obs, [{'plate_id': 21,
+                                'external_id': 'Test plate 1'}])
+
+        # Keyset pagination, starting after plate 2
+        obs = Plate.list_plates(limit=1, after=[2, 2])
+        self.assertEqual(obs[0]['plate_id'], 3)
+
+        obs = Plate.list_plates(['sample'], search='test PLATE',
+                                include_study_titles=True)
+        self.assertEqual(
+            obs, [{'plate_id': 21,
+                   'external_id': 'Test plate 1',
+                   'studies': ['Identification of the Microbiomes '
+                               'for Cannabis Soils']}])
+        self.assertEqual(obs.total, 1)
+        self.assertEqual(obs.filtered, 1)
+
+        obs = Plate.list_plates(['gDNA', 'sample'], order_by='external_id',
+                                descending=True)
+        self.assertEqual([p['plate_id'] for p in obs], [21, 22])
+
+        obs = Plate.list_plates(search='%')
+        self.assertEqual(obs, [])
+        self.assertGreaterEqual(obs.total, 26)
+        self.assertEqual(obs.filtered, 0)
+
+        with self.assertRaises(ValueError):
+            Plate.list_plates(order_by='discarded')
+
     def test_plate_list_discarded_functionality(self):
         # test case based on the test_list_plates
         obs = Plate.list_plates()
@@ -252,6 +326,22 @@ class TestPlate(LabmanTestCase):
         # the wells.
         self.assertEqual(obs.layout, [[None] * 12] * 8)
 
+    def test_properties_cached(self):
+        with TRN:
+            tester = Plate(21)
+            self.assertEqual(tester.external_id, 'Test plate 1')
+            # The whole row has been cached
+            obs = TRN.get_cached_row('qiita.plate', 21)
+            self.assertEqual(obs['external_id'], 'Test plate 1')
+            self.assertFalse(obs['discarded'])
+            # The setters write through the cache
+            tester.discarded = True
+            self.assertTrue(obs['discarded'])
+            self.assertTrue(tester.discarded)
+            TRN.rollback()
+            self.assertIsNone(TRN.get_cached_row('qiita.plate', 21))
+            self.assertFalse(tester.discarded)
+
     def test_properties(self):
         # Plate 21 - Defined in the test DB
         tester = Plate(21)
@@ -358,6 +448,46 @@ class TestPlate(LabmanTestCase):
         self.assertEqual(tester.unknown_samples, [exp])
         exp.composition.update('1.SKB1.640202')
 
+    def test_studies(self):
+        # The studies are found following the lineage of the compositions,
+        # for all the plate types
+        for plate_id in (21, 22, 23, 24, 25, 26):
+            self.assertEqual(Plate(plate_id).studies, {Study(1)})
+        # Primer plates do not contain samples
+        self.assertEqual(Plate(11).studies, set())
+
+        with TRN:
+            count = TRN.query_count
+            Plate(26).studies
+            self.assertEqual(TRN.query_count - count, 1)
+
+    def test_layout_view(self):
+        tester = Plate(21).layout_view()
+        self.assertEqual(tester.num_rows, 8)
+        self.assertEqual(tester.num_columns, 12)
+        self.assertEqual(len(tester), 96)
+
+        rec = tester.data[-1]
+        self.assertEqual((rec['row'], rec['col']), (8, 12))
+
+        self.assertEqual(tester.get_well(1, 1), Well(3073))
+        self.assertIs(tester.get_well(1, 1), tester.get_well(1, 1))
+        self.assertEqual(tester.get_composition(8, 1), SampleComposition(85))
+
+        contents = tester.matrix('content')
+        self.assertEqual(contents.shape, (8, 12))
+        self.assertEqual(contents[7][0], 'blank.21.H1')
+        self.assertEqual(set(tester.matrix('composition_type').ravel()),
+                         {'sample'})
+
+        # Empty positions
+        plate_conf = PlateConfiguration.create('96-well Test desc', 8, 12)
+        tester = Plate.create('New plate', plate_conf).layout_view()
+        self.assertEqual(len(tester), 0)
+        self.assertIsNone(tester.get_well(1, 1))
+        self.assertIsNone(tester.get_composition(1, 1))
+        self.assertEqual(tester.matrix('notes').tolist(), [[None] * 12] * 8)
+
     def test_get_well(self):
         # Plate 21 - Defined in the test DB
         tester = Plate(21)
@@ -379,22 +509,56 @@ class TestPlate(LabmanTestCase):
 
     def test_get_previously_plated_wells(self):
         tester = Plate(21)
-        self.assertEqual(tester.get_previously_plated_wells(), {})
+        self.assertEqual(tester.get_previously_plated_wells(), [])
 
         # Create another plate and plate some samples in it
         spp = SamplePlatingProcess.create(
             User('test@foo.bar'), PlateConfiguration(1), 'New Plate For Prev')
         spp.update_well(1, 1, '1.SKD1.640179')
-        exp = {}
         plate = spp.plate
-        exp[Well(3208)] = [plate]
-        exp[Well(3388)] = [plate]
-        exp[Well(3568)] = [plate]
-        exp[Well(3748)] = [plate]
-        exp[Well(3928)] = [plate]
-        exp[Well(4108)] = [plate]
+        exp = [(row, 10, plate.id, 'New Plate For Prev')
+               for row in range(1, 7)]
         obs = tester.get_previously_plated_wells()
         self.assertEqual(obs, exp)
+        self.assertEqual(plate.get_previously_plated_wells(),
+                         [(1, 1, 21, 'Test plate 1')])
+
+    def test_summary(self):
+        obs = Plate(21).summary()
+        obs_duplicates = obs.pop('duplicates')
+        exp = {'plate_id': 21,
+               'external_id': 'Test plate 1',
+               'discarded': False,
+               'notes': None,
+               'plate_configuration': (1, '96-well deep-well plate', 8, 12),
+               'studies': [1],
+               'previous_plates': [],
+               'unknowns': []}
+        self.assertEqual(obs, exp)
+        self.assertEqual(len(obs_duplicates), 72)
+        self.assertEqual(obs_duplicates[:2],
+                         [(1, 1, '1.SKB1.640202.21.A1'),
+                          (2, 1, '1.SKB1.640202.21.B1')])
+
+        spp = SamplePlatingProcess.create(
+            User('test@foo.bar'), PlateConfiguration(1), 'New Plate Summary')
+        spp.update_well(1, 1, '1.SKD1.640179')
+        spp.update_well(1, 2, 'Not a sample')
+        plate = spp.plate
+        with TRN:
+            count = TRN.query_count
+            obs = plate.summary()
+            self.assertEqual(TRN.query_count - count, 1)
+        exp = {'plate_id': plate.id,
+               'external_id': 'New Plate Summary',
+               'discarded': False,
+               'notes': None,
+               'plate_configuration': (1, '96-well deep-well plate', 8, 12),
+               'studies': [1],
+               'duplicates': [],
+               'previous_plates': [(1, 1, 21, 'Test plate 1')],
+               'unknowns': [(1, 2)]}
+        self.assertEqual(obs, exp)
 
 
 if __name__ == '__main__':
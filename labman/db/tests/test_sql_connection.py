@@ -10,6 +10,7 @@ from unittest import TestCase, main
 from os import remove, close
 from os.path import exists
 from tempfile import mkstemp
+from threading import Thread
 
 from psycopg2._psycopg import connection
 from psycopg2.extras import DictCursor
@@ -18,7 +19,8 @@ from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 
 
 from labman.db.settings import labman_settings
-from labman.db.sql_connection import SQLConnectionHandler, Transaction, TRN
+from labman.db.sql_connection import (
+    SQLConnectionHandler, Transaction, TRN, _group_queries)
 
 
 DB_CREATE_TEST_TABLE = """CREATE TABLE qiita.test_table (
@@ -304,6 +306,38 @@ class TestTransaction(TestBase):
                                 ('insert3', True, 3),
                                 ('insert2', False, 20)])
 
+    def test_execute_many_batch(self):
+        with TRN:
+            sql = """INSERT INTO qiita.test_table (str_column, int_column)
+                     VALUES (%s, %s)"""
+            args = [['insert%s' % i, i] for i in range(2500)]
+            TRN.add(sql, args, many=True)
+            sql = """UPDATE qiita.test_table SET bool_column = %s
+                     WHERE int_column = %s"""
+            TRN.add(sql, [[False, i] for i in range(0, 2500, 2)], many=True)
+            sql = """SELECT COUNT(*) FROM qiita.test_table
+                     WHERE bool_column = %s"""
+            TRN.add(sql, [False])
+            obs = TRN.execute()
+            self.assertEqual(len(obs), 3751)
+            self.assertEqual(obs[:3750], [None] * 3750)
+            self.assertEqual(obs[-1], [[1250]])
+
+    def test_group_queries(self):
+        insert = "INSERT INTO qiita.test_table (int_column) VALUES (%s)"
+        insert_ret = ("INSERT INTO qiita.test_table (int_column) VALUES (%s) "
+                      "RETURNING int_column")
+        select = "SELECT * FROM qiita.test_table WHERE int_column = %s"
+        queries = [(insert, [1]), (insert, [2]), (select, [1]),
+                   (select, [2]), (insert, [3]), (insert_ret, [4]),
+                   (insert_ret, [5]), (insert, None), (insert, [6])]
+        obs = list(_group_queries(queries))
+        exp = [(insert, [[1], [2]], True), (select, [1], False),
+               (select, [2], False), (insert, [3], False),
+               (insert_ret, [4], False), (insert_ret, [5], False),
+               (insert, None, False), (insert, [6], False)]
+        self.assertEqual(obs, exp)
+
     def test_execute_return(self):
         with TRN:
             sql = """INSERT INTO qiita.test_table (str_column, int_column)
@@ -474,6 +508,33 @@ class TestTransaction(TestBase):
             obs = TRN.execute_fetchflatten(idx=3)
             self.assertEqual(obs, ['insert1', 1, 'insert2', 2, 'insert3', 3])
 
+    def test_execute_iter(self):
+        with TRN:
+            sql = """INSERT INTO qiita.test_table (str_column, int_column)
+                     VALUES (%s, %s)"""
+            args = [['insert1', 1], ['insert2', 2], ['insert3', 3]]
+            TRN.add(sql, args, many=True)
+
+            # The pending queries are executed before iterating
+            count = TRN.query_count
+            sql = """SELECT str_column, int_column FROM qiita.test_table
+                     WHERE int_column > %s ORDER BY int_column"""
+            obs = [dict(r) for r in TRN.execute_iter(sql, [1], itersize=1)]
+            self.assertEqual(obs, [{'str_column': 'insert2', 'int_column': 2},
+                                   {'str_column': 'insert3', 'int_column': 3}])
+            self.assertEqual(TRN.query_count - count, 4)
+
+            # Stop iterating in the middle of the results
+            obs = TRN.execute_iter(sql, [0], itersize=1)
+            self.assertEqual(next(obs)['str_column'], 'insert1')
+            obs.close()
+
+            with self.assertRaises(ValueError):
+                list(TRN.execute_iter("SELECT * FROM qiita.no_table"))
+
+        with self.assertRaises(RuntimeError):
+            TRN.execute_iter("SELECT 42")
+
     def test_context_manager_rollback(self):
         try:
             with TRN:
@@ -670,6 +731,118 @@ class TestTransaction(TestBase):
 
         self.assertEqual(TRN.index, 0)
 
+    def test_object_cache(self):
+        class Obj(object):
+            id = 1
+
+        obj = Obj()
+        # Objects are not cached outside the context manager
+        TRN.cache_object(obj)
+        self.assertIsNone(TRN.get_cached_object(Obj, 1))
+
+        with TRN:
+            self.assertIsNone(TRN.get_cached_object(Obj, 1))
+            TRN.cache_object(obj)
+            self.assertIs(TRN.get_cached_object(Obj, 1), obj)
+            self.assertIsNone(TRN.get_cached_object(Obj, 2))
+            self.assertIsNone(TRN.get_cached_object(str, 1))
+
+            # The cache is emptied on rollback
+            TRN.add("SELECT 42")
+            TRN.rollback()
+            self.assertIsNone(TRN.get_cached_object(Obj, 1))
+
+            # and on commit
+            TRN.cache_object(obj)
+            TRN.commit()
+            self.assertIsNone(TRN.get_cached_object(Obj, 1))
+
+    def test_row_cache(self):
+        # Rows are not cached outside the context manager
+        TRN.cache_row('qiita.test_table', 1, {'int_column': 1})
+        self.assertIsNone(TRN.get_cached_row('qiita.test_table', 1))
+
+        with TRN:
+            row = {'int_column': 1, 'str_column': 'foo'}
+            TRN.cache_row('qiita.test_table', 1, row)
+            TRN.cache_row('qiita.test_table', 1, {'int_column': 1},
+                          join_table='qiita.other_table')
+            self.assertEqual(TRN.get_cached_row('qiita.test_table', 1), row)
+            self.assertIsNone(TRN.get_cached_row('qiita.test_table', 2))
+
+            TRN.update_cached_rows('qiita.test_table', 1, 'str_column', 'bar')
+            self.assertEqual(TRN.get_cached_row('qiita.test_table', 1),
+                             {'int_column': 1, 'str_column': 'bar'})
+            self.assertEqual(
+                TRN.get_cached_row('qiita.test_table', 1,
+                                   join_table='qiita.other_table'),
+                {'int_column': 1})
+
+            TRN.clear_row_cache()
+            self.assertIsNone(TRN.get_cached_row('qiita.test_table', 1))
+
+            TRN.cache_row('qiita.test_table', 1, row)
+            TRN.add("SELECT 42")
+            TRN.rollback()
+            self.assertIsNone(TRN.get_cached_row('qiita.test_table', 1))
+
+    def test_release(self):
+        obs = Transaction()
+        with obs:
+            obs.add("SELECT 42")
+            with self.assertRaises(RuntimeError):
+                obs.release()
+            conn = obs._connection
+        obs.release()
+        self.assertIsNone(obs._connection)
+
+        # The connection is reused by the next transaction
+        obs2 = Transaction()
+        with obs2:
+            obs2.add("SELECT 42")
+            self.assertEqual(obs2.execute_fetchlast(), 42)
+            self.assertIs(obs2._connection, conn)
+        obs2.release()
+
+    def test_transaction_context_bind(self):
+        default = TRN.current
+        trn = Transaction()
+        previous = TRN.bind(trn)
+        self.assertIs(previous, default)
+        self.assertIs(TRN.current, trn)
+        with TRN:
+            TRN.add("SELECT 42")
+            self.assertEqual(trn._queries, [("SELECT 42", None)])
+            self.assertEqual(default._queries, [])
+            TRN.execute()
+        TRN.unbind(trn, previous)
+        self.assertIs(TRN.current, default)
+
+        with TRN.bound() as obs:
+            self.assertIs(TRN.current, obs)
+            with TRN:
+                TRN.add("SELECT 42")
+                self.assertEqual(TRN.execute_fetchlast(), 42)
+        self.assertIs(TRN.current, default)
+        self.assertIsNone(obs._connection)
+
+    def test_transaction_context_threads(self):
+        main_trn = TRN.current
+        obs = []
+
+        def tester():
+            with TRN:
+                TRN.add("SELECT 42")
+                obs.append((TRN.current, TRN.execute_fetchlast()))
+
+        thread = Thread(target=tester)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(obs), 1)
+        self.assertIsNot(obs[0][0], main_trn)
+        self.assertEqual(obs[0][1], 42)
+        self.assertEqual(main_trn._queries, [])
+
 
 if __name__ == "__main__":
     main()
@@ -9,6 +9,7 @@
 from unittest import main
 
 from labman.db.testing import LabmanTestCase
+from labman.db.sql_connection import TRN
 from labman.db.exceptions import LabmanUnknownIdError
 from labman.db.study import Study
 from labman.db.user import User
@@ -49,6 +50,28 @@ class TestStudy(LabmanTestCase):
                'number_samples_shotgun_sequencing_runs': 12}
         self.assertEqual(s.sample_numbers_summary, exp)
 
+    def test_refresh_progress(self):
+        s = Study(1)
+        with TRN:
+            TRN.add("DELETE FROM qiita.study_progress")
+            TRN.execute()
+            obs = s.sample_numbers_summary
+            self.assertEqual(obs['num_samples'], 27)
+            self.assertEqual(obs['number_samples_plated'], 0)
+
+            Study.refresh_progress([1])
+            obs = s.sample_numbers_summary
+            self.assertEqual(obs['number_samples_plated'], 12)
+            self.assertEqual(obs['number_samples_shotgun_sequencing_runs'], 12)
+
+            TRN.add("DELETE FROM qiita.study_progress")
+            TRN.execute()
+            Study.refresh_progress()
+            obs = s.sample_numbers_summary
+            self.assertEqual(obs['number_samples_amplicon_sequencing_runs'],
+                             12)
+            TRN.rollback()
+
     def test_samples(self):
         s = Study(1)
         exp_samples = ['1.SKB1.640202', '1.SKB2.640194', '1.SKB3.640195',
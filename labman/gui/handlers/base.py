@@ -6,15 +6,333 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Semaphore
+from time import perf_counter
 from traceback import format_exception
 
-from tornado.web import RequestHandler
+from psycopg2.pool import PoolError
+from tornado.web import RequestHandler, HTTPError
+from tornado.escape import json_decode
+from tornado.gen import coroutine
+from tornado.ioloop import IOLoop
+from tornado.queues import Queue
 
 from labman.db.user import User
+from labman.db.settings import labman_settings
+from labman.db.sql_connection import TRN
+from labman.db.instrumentation import QUERY_LOG
+from labman.gui.metrics import METRICS
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = Lock()
+
+
+def get_executor():
+    """Returns the executor used to run the heavy requests
+
+    The executor is created on first use, so the webserver processes
+    started with `start_webserver --processes` have their own executor.
+
+    Returns
+    -------
+    concurrent.futures.ThreadPoolExecutor
+        The executor, with as many threads as the `WORKERS` option of the
+        configuration file
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=labman_settings.workers)
+    return _EXECUTOR
+
+
+def _run_with_transaction(transactions, func, *args, **kwargs):
+    """Runs `func` with a new transaction bound to the executor thread
+
+    The connection of the transaction is retrieved from the pool the first
+    time that `func` accesses the database, and it is returned to the pool
+    when `func` returns
+
+    Parameters
+    ----------
+    transactions : list of Transaction
+        The list where the transaction is added, to account its queries
+    func : callable
+        The function to run
+    args, kwargs
+        The arguments to pass to `func`
+
+    Returns
+    -------
+    object
+        The result of `func`
+
+    Raises
+    ------
+    HTTPError
+        503 If all the connections of the pool are in use
+    """
+    try:
+        with TRN.bound() as transaction:
+            transactions.append(transaction)
+            return func(*args, **kwargs)
+    except PoolError:
+        raise HTTPError(503, reason='All the database connections are in '
+                                    'use, please try again later')
 
 
 class BaseHandler(RequestHandler):
-    """Base class for all labman's handlers"""
+    """Base class for all labman's handlers
+
+    The code of the handlers runs on the transaction of the IOLoop thread,
+    which is never used while a request waits, as the `with TRN` blocks do
+    not span a `yield`. The code run with `run_in_executor` gets a new
+    transaction for each call, so the coroutines of the requests served at
+    the same time never share a transaction.
+    """
+
+    def prepare(self):
+        """Starts recording the queries of the request"""
+        self._start_time = perf_counter()
+        self._transactions = []
+        self._loop_start = (TRN.query_count, TRN.query_time)
+        self._loop_stats = None
+
+    def _stop_loop_stats(self):
+        """Stops counting the queries run on the IOLoop thread
+
+        Other requests can run queries on the IOLoop thread while a request
+        waits, so only the queries run before the first wait are counted
+        """
+        if self._loop_stats is None:
+            count, time = self._loop_start
+            self._loop_stats = (TRN.query_count - count,
+                                TRN.query_time - time)
+
+    def _query_stats(self):
+        """Returns the number of queries of the request and their time
+
+        Returns
+        -------
+        (int, float) or None
+            The number of queries and the time spent running them, in
+            seconds. None if the request was not prepared
+        """
+        if getattr(self, '_start_time', None) is None:
+            return None
+        self._stop_loop_stats()
+        count, time = self._loop_stats
+        for transaction in self._transactions:
+            count += transaction.query_count
+            time += transaction.query_time
+        return count, time
+
+    def finish(self, chunk=None):
+        """Adds the Server-Timing header before finishing the request"""
+        if not self._headers_written:
+            server_timing = self._server_timing()
+            if server_timing is not None:
+                self.set_header('Server-Timing', server_timing)
+        return super(BaseHandler, self).finish(chunk)
+
+    def on_finish(self):
+        """Records the request metrics"""
+        stats = self._query_stats()
+        if stats is None:
+            return
+        query_count, query_time = stats
+
+        status = self.get_status()
+        if QUERY_LOG.enabled:
+            QUERY_LOG.record_request(
+                self.request.method, self.request.path, status,
+                query_count, query_time)
+        METRICS.observe_request(
+            self.route_pattern, self.request.method, status,
+            perf_counter() - self._start_time, query_time, query_count)
+
+    @property
+    def route_pattern(self):
+        """The route pattern of the handler, as defined in the application"""
+        return self.settings.get('route_patterns', {}).get(
+            type(self), type(self).__name__)
+
+    def _server_timing(self):
+        """Returns the value of the Server-Timing header of the request
+
+        Returns
+        -------
+        str or None
+            The wall time and database time, in milliseconds, and the number
+            of queries executed. None if the request was not prepared
+        """
+        stats = self._query_stats()
+        if stats is None:
+            return None
+        query_count, query_time = stats
+        return 'total;dur=%.3f, db;dur=%.3f, queries;desc="%d"' % (
+            (perf_counter() - self._start_time) * 1000, query_time * 1000,
+            query_count)
+
+    def run_in_executor(self, func, *args, **kwargs):
+        """Runs `func` in the executor, outside of the IOLoop
+
+        Use it for the requests that need to do a lot of work in the
+        database or compute intensive tasks, so the webserver keeps serving
+        other requests in the meantime. Each call runs `func` on a new
+        transaction, which is committed and releases its connection when
+        `func` returns, so a transaction can't be kept open across calls.
+        `func` should not call the handler methods that write the response.
+
+        Parameters
+        ----------
+        func : callable
+            The function to run
+        args, kwargs
+            The arguments to pass to `func`
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future with the result of `func`, to be yielded from a
+            coroutine
+        """
+        # The request is about to wait for the executor
+        self._stop_loop_stats()
+        return get_executor().submit(
+            _run_with_transaction, self._transactions, func, *args, **kwargs)
+
+    @coroutine
+    def write_from_executor(self, chunks, max_pending=2):
+        """Writes the chunks of a generator run in the executor
+
+        The whole generator runs in a single executor call, so it can keep a
+        database cursor open while it generates the chunks. The generator
+        waits while `max_pending` chunks have not been sent to the client,
+        and it is closed if the client goes away.
+
+        Parameters
+        ----------
+        chunks : generator of bytes or str
+            The chunks to write
+        max_pending : int, optional
+            The maximum number of chunks generated and not sent yet.
+            Default: 2
+
+        Returns
+        -------
+        tornado.concurrent.Future
+            The future resolved when all the chunks have been sent, to be
+            yielded from a coroutine
+        """
+        io_loop = IOLoop.current()
+        queue = Queue()
+        slots = Semaphore(max_pending)
+        stopped = Event()
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    slots.acquire()
+                    if stopped.is_set():
+                        break
+                    io_loop.add_callback(queue.put_nowait, chunk)
+            finally:
+                chunks.close()
+                # Signals the end of the chunks
+                io_loop.add_callback(queue.put_nowait, None)
+
+        producer = self.run_in_executor(produce)
+        try:
+            while True:
+                chunk = yield queue.get()
+                if chunk is None:
+                    break
+                self.write(chunk)
+                yield self.flush()
+                slots.release()
+        finally:
+            # Wakes up the producer if it is waiting to stop it
+            stopped.set()
+            slots.release()
+            # Raises the errors of the generator
+            yield producer
+
+    def get_list_page_arguments(self, columns):
+        """Parses the paging arguments of a DataTables server-side request
+
+        Parameters
+        ----------
+        columns : list of str
+            The column of the listing shown in each column of the table, in
+            order. None for the columns of the table that can't be sorted
+
+        Returns
+        -------
+        dict or None
+            The keyword arguments of `labman.db.base.list_page`, or None if
+            the request is not a DataTables server-side request
+
+        Raises
+        ------
+        HTTPError
+            400 If the paging arguments are not valid
+        """
+        if self.get_argument('draw', None) is None:
+            return None
+        try:
+            int(self.get_argument('draw'))
+            start = int(self.get_argument('start', 0))
+            length = int(self.get_argument('length', -1))
+            order_column = int(self.get_argument('order[0][column]', -1))
+            after = self.get_argument('after', None)
+            after = json_decode(after) if after else None
+        except ValueError:
+            raise HTTPError(400, reason='Invalid paging arguments')
+        order_by = None
+        if 0 <= order_column < len(columns):
+            order_by = columns[order_column]
+        return {'search': self.get_argument('search[value]', None) or None,
+                'order_by': order_by,
+                'descending': self.get_argument('order[0][dir]', '') == 'desc',
+                'limit': length if length >= 0 else None,
+                'offset': max(start, 0),
+                'after': after}
+
+    def write_list_page(self, page, data, id_column, page_args):
+        """Writes a page of a listing as a DataTables server-side response
+
+        Parameters
+        ----------
+        page : labman.db.base.ListPage
+            The page of the listing
+        data : list of list
+            The rows of the table
+        id_column : str
+            The column identifying the rows of the listing
+        page_args : dict
+            The arguments used to retrieve the page, as returned by
+            `get_list_page_arguments`
+
+        Notes
+        -----
+        The response includes the `next` cursor, which can be passed as the
+        `after` argument to retrieve the next page without an offset. It is
+        None if there are no more rows.
+        """
+        next_cursor = None
+        limit = page_args['limit']
+        if page and limit is not None and len(page) == limit:
+            order_by = page_args['order_by'] or id_column
+            next_cursor = [page[-1][order_by], page[-1][id_column]]
+        self.write({'draw': int(self.get_argument('draw', 0)),
+                    'recordsTotal': page.total,
+                    'recordsFiltered': page.filtered,
+                    'data': data,
+                    'next': next_cursor})
 
     def get_current_user(self):
         """Get the current connected user"""
@@ -0,0 +1,42 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from tornado.web import authenticated, HTTPError
+
+from labman.gui.handlers.base import BaseHandler
+from labman.db.instrumentation import QUERY_LOG
+from labman.gui.metrics import METRICS
+
+
+class DebugQueriesHandler(BaseHandler):
+    @authenticated
+    def get(self):
+        if not QUERY_LOG.enabled:
+            raise HTTPError(404, reason='The query log is not enabled. Set '
+                                        'QUERY_LOG in the configuration file')
+        summary = QUERY_LOG.summary()
+        if self.get_argument('format', None) == 'json':
+            self.write(summary)
+        else:
+            self.render('debug_queries.html', **summary)
+
+    @authenticated
+    def post(self):
+        QUERY_LOG.reset()
+        self.redirect('/debug/queries')
+
+
+class MetricsHandler(BaseHandler):
+    """Exports the request metrics in the Prometheus text format
+
+    It doesn't require authentication so the metrics can be scraped. Only
+    aggregated timings per route are exported.
+    """
+    def get(self):
+        self.set_header('Content-Type', 'text/plain; version=0.0.4')
+        self.write(METRICS.render())
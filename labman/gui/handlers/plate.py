@@ -6,7 +6,7 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
-from itertools import chain
+from itertools import groupby
 
 from tornado.web import authenticated, HTTPError
 from tornado.escape import json_encode, json_decode
@@ -55,12 +55,24 @@ class PlateSearchHandler(BaseHandler):
         well_comment_keywords = self.get_argument("well_comment_keywords")
         operation = self.get_argument("operation")
         sample_names = json_decode(self.get_argument('sample_names'))
-
-        res = {"data": [[p.id, p.external_id]
-               for p in Plate.search(samples=sample_names,
-                                     plate_notes=plate_comment_keywords,
-                                     well_notes=well_comment_keywords,
-                                     query_type=operation)]}
+        partial_sample_match = self.get_argument(
+            'partial_sample_match', 'false') == 'true'
+        try:
+            limit = self.get_argument('limit', None)
+            limit = int(limit) if limit is not None else None
+            offset = int(self.get_argument('offset', 0))
+        except ValueError:
+            raise HTTPError(400, reason='Invalid paging arguments')
+
+        plates = Plate.search(samples=sample_names,
+                              plate_notes=plate_comment_keywords,
+                              well_notes=well_comment_keywords,
+                              query_type=operation,
+                              partial_sample_match=partial_sample_match,
+                              limit=limit, offset=offset)
+        res = {"data": [[p.id, p.external_id] for p in plates]}
+        if limit is not None:
+            res['recordsTotal'] = plates.total
 
         self.write(res)
 
@@ -79,11 +91,18 @@ class PlateListHandler(BaseHandler):
         plate_type = (json_decode(plate_type)
                       if plate_type is not None else None)
         only_quantified = True if only_quantified == 'true' else False
-        res = {"data": [[p['plate_id'], p['external_id'], p['studies']]
-                        for p in Plate.list_plates(
-                            plate_type, only_quantified=only_quantified,
-                            include_study_titles=True)]}
-        self.write(res)
+        # Columns of the table in the plate list page
+        page_args = self.get_list_page_arguments(
+            [None, 'plate_id', 'external_id', None, None])
+        plates = Plate.list_plates(
+            plate_type, only_quantified=only_quantified,
+            include_study_titles=True, **(page_args or {}))
+        data = [[p['plate_id'], p['external_id'], p['studies']]
+                for p in plates]
+        if page_args is None:
+            self.write({"data": data})
+        else:
+            self.write_list_page(plates, data, 'plate_id', page_args)
 
 
 def plate_map_handler_get_request(process_id):
@@ -168,29 +187,28 @@ def plate_handler_patch_request(user, plate_id, req_op, req_path,
 class PlateHandler(BaseHandler):
     @authenticated
     def get(self, plate_id):
-        plate = _get_plate(plate_id)
-        duplicates = [
-            [sample_info[0].row, sample_info[0].column, sample_info[1]]
-            for sample_info in chain.from_iterable(plate.duplicates.values())]
-        previous_plates = [
-            [[w.row, w.column],
-             [{'plate_id': p.id, 'plate_name': p.external_id} for p in plates]]
-            for w, plates in plate.get_previously_plated_wells().items()]
-        unknowns = [[well.row, well.column] for well in plate.unknown_samples]
-
-        plate_config = plate.plate_configuration
-        result = {'plate_id': plate.id,
-                  'plate_name': plate.external_id,
-                  'discarded': plate.discarded,
-                  'plate_configuration': [
-                        plate_config.id, plate_config.description,
-                        plate_config.num_rows, plate_config.num_columns],
-                  'notes': plate.notes,
-                  'studies': sorted(s.id for s in plate.studies),
-                  'duplicates': duplicates,
-                  'previous_plates': previous_plates,
-                  'unknowns': unknowns}
-
+        summary = _get_plate(plate_id).summary()
+        result = {'plate_id': summary['plate_id'],
+                  'plate_name': summary['external_id'],
+                  'discarded': summary['discarded'],
+                  'plate_configuration': summary['plate_configuration'],
+                  'notes': summary['notes'],
+                  'studies': summary['studies'],
+                  'duplicates': summary['duplicates'],
+                  'previous_plates': [
+                        [[row, col],
+                         [{'plate_id': p_id, 'plate_name': p_name}
+                          for _, _, p_id, p_name in plates]]
+                        for (row, col), plates in groupby(
+                            summary['previous_plates'],
+                            key=lambda x: (x[0], x[1]))],
+                  'unknowns': summary['unknowns']}
+
+        # The plate editor requests the plate information after each change,
+        # so let the browser revalidate its copy instead of downloading it
+        # again when the plate has not changed. Tornado computes the Etag of
+        # the response and replies 304 when it matches the request's one
+        self.set_header('Cache-Control', 'no-cache')
         self.write(result)
         self.finish()
 
@@ -220,16 +238,12 @@ def plate_layout_handler_get_request(plate_id):
     list of lists of {'sample': str, 'notes': str}
     """
     plate = _get_plate(plate_id)
-    plate_layout = plate.layout
+    plate_layout = plate.layout_view()
     result = []
-    for l_row in plate_layout:
-        row = []
-        for l_well in l_row:
-            composition = l_well.composition
-            sample = composition.content
-            row.append({'sample': sample, 'notes': composition.notes})
-
-        result.append(row)
+    for s_row, n_row in zip(plate_layout.matrix('content'),
+                            plate_layout.matrix('notes')):
+        result.append([{'sample': sample, 'notes': notes}
+                       for sample, notes in zip(s_row, n_row)])
 
     return result
 
@@ -22,9 +22,16 @@ class PoolListingHandler(BaseHandler):
 class PoolListHandler(BaseHandler):
     @authenticated
     def get(self):
-        res = {"data": [[p['pool_composition_id'], p['external_id']]
-                        for p in PoolComposition.list_pools()]}
-        self.write(res)
+        # Columns of the table in the pool list page
+        page_args = self.get_list_page_arguments(
+            [None, 'pool_composition_id', 'external_id'])
+        pools = PoolComposition.list_pools(**(page_args or {}))
+        data = [[p['pool_composition_id'], p['external_id']] for p in pools]
+        if page_args is None:
+            self.write({"data": data})
+        else:
+            self.write_list_page(pools, data, 'pool_composition_id',
+                                 page_args)
 
 
 class PoolHandler(BaseHandler):
@@ -11,6 +11,7 @@ from datetime import datetime
 from copy import deepcopy
 
 from tornado.web import authenticated, HTTPError
+from tornado.gen import coroutine
 from tornado.escape import json_decode, json_encode
 import numpy as np
 
@@ -18,8 +19,10 @@ from labman.gui.handlers.base import BaseHandler
 from labman.db.process import PoolingProcess, QuantificationProcess
 from labman.db.plate import Plate
 from labman.db.equipment import Equipment
-from labman.db.composition import (PoolComposition, LibraryPrep16SComposition,
+from labman.db.composition import (Composition, PoolComposition,
+                                   LibraryPrep16SComposition,
                                    LibraryPrepShotgunComposition)
+from labman.db.sql_connection import TRN
 from labman.db.exceptions import LabmanUnknownIdError
 
 
@@ -112,30 +115,30 @@ def make_2D_arrays(plate, quant_process):
         Two 2D np.arrays containing the raw concentration values and the
         the computed concentration values, respectivelly.
     """
-    layout = plate.layout
+    pc = plate.plate_configuration
+    layout = np.empty((pc.num_rows, pc.num_columns))
     raw_concs = np.zeros_like(layout, dtype=float)
     comp_concs = np.zeros_like(layout, dtype=float)
     comp_is_blank = np.zeros_like(layout, dtype=bool)
     plate_names = np.empty_like(layout, dtype='object')
-    for comp, raw_conc, conc in quant_process.concentrations:
-        well = comp.container
-        row = well.row - 1
-        column = well.column - 1
-        raw_concs[row][column] = raw_conc
-        comp_concs[row][column] = conc
-
-        # cache the sample compositions to avoid extra intermediate queries
-        if isinstance(comp, LibraryPrep16SComposition):
-            smp = comp.gdna_composition.sample_composition
-
-            comp_is_blank[row][column] = smp.sample_composition_type == 'blank'
-            plate_names[row][column] = smp.sample_id
-        elif isinstance(comp, LibraryPrepShotgunComposition):
-            smp = comp.normalized_gdna_composition.compressed_gdna_composition\
-                .gdna_composition.sample_composition
-
-            comp_is_blank[row][column] = smp.sample_composition_type == 'blank'
-            plate_names[row][column] = smp.sample_id
+    with TRN:
+        concentrations = quant_process.concentrations
+        # retrieve the sample compositions of all the wells at once, to
+        # avoid the intermediate queries of each well
+        samples = Composition.get_root_samples(
+            [comp for comp, _, _ in concentrations])
+        for (comp, raw_conc, conc), smp in zip(concentrations, samples):
+            well = comp.container
+            row = well.row - 1
+            column = well.column - 1
+            raw_concs[row][column] = raw_conc
+            comp_concs[row][column] = conc
+
+            if isinstance(comp, (LibraryPrep16SComposition,
+                                 LibraryPrepShotgunComposition)):
+                comp_is_blank[row][column] = (
+                    smp.sample_composition_type == 'blank')
+                plate_names[row][column] = smp.sample_id
 
     return raw_concs, comp_concs, comp_is_blank, plate_names
 
@@ -325,9 +328,28 @@ class LibraryPoolProcessHandler(BasePoolHandler):
                     plate_names=plate_names)
 
     @authenticated
+    @coroutine
     def post(self):
         plates_info = json_decode(self.get_argument('plates-info'))
+        results = yield self.run_in_executor(
+            self._create_pools, self.current_user, plates_info)
+        self.write(json_encode(results))
 
+    def _create_pools(self, user, plates_info):
+        """Creates a pooling process for each of the plates
+
+        Parameters
+        ----------
+        user : labman.db.user.User
+            The user creating the pools
+        plates_info : list of dict
+            The pooling parameters of each plate
+
+        Returns
+        -------
+        list of dict
+            The plate id and the id of the pooling process of each plate
+        """
         results = []
         for pinfo in plates_info:
             plate_result = self._compute_pools(pinfo)
@@ -351,13 +373,13 @@ class LibraryPoolProcessHandler(BasePoolHandler):
             robot = (Equipment(plate_result['robot'])
                      if plate_result['robot'] is not None else None)
             process = PoolingProcess.create(
-                self.current_user, quant_process, pool_name,
+                user, quant_process, pool_name,
                 plate_result['pool_vals'].sum(), input_compositions,
                 plate_result['func_data'], robot=robot,
                 destination=plate_result['destination'])
             results.append({'plate-id': plate.id, 'process-id': process.id})
 
-        self.write(json_encode(results))
+        return results
 
 
 # The ComputeLibraryPoolValueslHandler is meant to calculate the results from
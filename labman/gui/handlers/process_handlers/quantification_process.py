@@ -7,6 +7,7 @@
 # ----------------------------------------------------------------------------
 
 from tornado.web import authenticated
+from tornado.gen import coroutine
 from tornado.escape import json_decode
 
 import numpy as np
@@ -16,6 +17,31 @@ from labman.db.plate import Plate
 from labman.db.process import QuantificationProcess
 
 
+def quantification_process_parse_post_request(files):
+    """Parses the quantification files of the plates
+
+    Parameters
+    ----------
+    files : list of (str, str)
+        The plate id and the contents of its quantification file
+
+    Returns
+    -------
+    list of dict
+        The plate name, plate id and parsed concentrations of each plate
+    """
+    plates = []
+    for plate_id, file_content in files:
+        plate = Plate(plate_id)
+        pc = plate.plate_configuration
+        concentrations = QuantificationProcess.parse(
+            file_content, rows=pc.num_rows, cols=pc.num_columns)
+        plates.append({'plate_name': plate.external_id,
+                       'plate_id': plate_id,
+                       'concentrations': concentrations.tolist()})
+    return plates
+
+
 class QuantificationProcessParseHandler(BaseHandler):
     @authenticated
     def get(self):
@@ -23,23 +49,18 @@ class QuantificationProcessParseHandler(BaseHandler):
         self.render('parse_quantification.html', plate_ids=plate_ids)
 
     @authenticated
+    @coroutine
     def post(self):
         # We will receive as many files as plates the user has selected
         # The key of the self.request.files dictionary is of the form
         # plate-file-<PLATE_ID> so use the keys to know the plates
         # that we need to quantify
-        plates = []
-        for key in self.request.files:
-            plate_id = key.rsplit('-', 1)[1]
-            # The 0 is because for each key we have a single file
-            file_content = self.request.files[key][0]['body'].decode('utf-8')
-            plate = Plate(plate_id)
-            pc = plate.plate_configuration
-            concentrations = QuantificationProcess.parse(
-                file_content, rows=pc.num_rows, cols=pc.num_columns)
-            plates.append({'plate_name': plate.external_id,
-                           'plate_id': plate_id,
-                           'concentrations': concentrations.tolist()})
+        # The 0 is because for each key we have a single file
+        files = [(key.rsplit('-', 1)[1],
+                  self.request.files[key][0]['body'].decode('utf-8'))
+                 for key in self.request.files]
+        plates = yield self.run_in_executor(
+            quantification_process_parse_post_request, files)
 
         self.render('quantification.html', plates=plates)
 
@@ -7,8 +7,10 @@
 # ----------------------------------------------------------------------------
 
 from tornado.web import authenticated, HTTPError
+from tornado.escape import json_decode
 
 from labman.gui.handlers.base import BaseHandler
+from labman.db.exceptions import LabmanUnknownIdError
 from labman.db.process import SamplePlatingProcess
 from labman.db.plate import PlateConfiguration, Plate
 
@@ -111,3 +113,31 @@ class SamplePlatingProcessHandler(BaseHandler):
             req_value, req_from)
         self.write(res)
         self.finish()
+
+
+class SamplePlatingProcessWellsHandler(BaseHandler):
+    @authenticated
+    def post(self, process_id):
+        # The wells are sent as a JSON list of [row, col, content], e.g.
+        # when pasting a range of cells or a full plate map
+        try:
+            wells = json_decode(self.get_argument('wells'))
+            wells = [(int(row), int(col), content)
+                     for row, col, content in wells]
+        except (ValueError, TypeError):
+            raise HTTPError(400, 'The wells should be a list of '
+                                 '[row, column, content]')
+
+        try:
+            process = SamplePlatingProcess(int(process_id))
+        except LabmanUnknownIdError:
+            raise HTTPError(404, 'Sample plating process %s doesn\'t exist'
+                            % process_id)
+
+        try:
+            res = process.update_wells(wells)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        self.write({'wells': res})
+        self.finish()
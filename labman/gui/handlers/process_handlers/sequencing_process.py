@@ -7,14 +7,13 @@
 # ----------------------------------------------------------------------------
 
 import re
-import zipfile
-
-from io import BytesIO
 
 from tornado.web import authenticated
+from tornado.gen import coroutine
 from tornado.escape import json_decode
 
 from labman.gui.handlers.base import BaseHandler
+from labman.gui.zipstream import ZipStreamWriter
 from labman.db.user import User
 from labman.db.composition import PoolComposition
 from labman.db.equipment import Equipment
@@ -53,47 +52,167 @@ class SequencingProcessHandler(BaseHandler):
         self.write({'process': process.id})
 
 
+# The minimum size of the chunks of the downloaded files written to the client
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def download_sample_sheet_get_request(process_id):
+    """Starts the generation of the sample sheet of the sequencing process
+
+    Parameters
+    ----------
+    process_id : int
+        The sequencing process id
+
+    Returns
+    -------
+    (str, generator of str)
+        The file name and the generator of the contents of the sample sheet
+    """
+    process = SequencingProcess(int(process_id))
+    filename = 'SampleSheet_%s_%s.csv' % (
+        re.sub('[^0-9a-zA-Z\-\_]+', '_', process.run_name), process.id)
+    return filename, iter_chunks(process.iter_sample_sheet(),
+                                 DOWNLOAD_CHUNK_SIZE)
+
+
+def read_chunk(chunks, size=DOWNLOAD_CHUNK_SIZE):
+    """Joins the next elements of `chunks` until they reach `size`
+
+    Parameters
+    ----------
+    chunks : iterator of str
+        The chunks to read
+    size : int, optional
+        The minimum size of the result, unless `chunks` is exhausted.
+        Default: DOWNLOAD_CHUNK_SIZE
+
+    Returns
+    -------
+    str
+        The joined chunks. An empty string if `chunks` is exhausted
+    """
+    result = []
+    length = 0
+    for chunk in chunks:
+        result.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            break
+    return ''.join(result)
+
+
+def iter_chunks(chunks, size=DOWNLOAD_CHUNK_SIZE):
+    """Joins the consecutive elements of `chunks` in chunks of `size`
+
+    Parameters
+    ----------
+    chunks : generator of str
+        The chunks to join. It is closed when the result is closed
+    size : int, optional
+        The minimum size of the chunks, except the last one.
+        Default: DOWNLOAD_CHUNK_SIZE
+
+    Returns
+    -------
+    generator of str
+        The joined chunks
+    """
+    try:
+        while True:
+            chunk = read_chunk(chunks, size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def iter_preparation_sheets_zip(process, size=DOWNLOAD_CHUNK_SIZE):
+    """Generates the zip file with the prep sheets of the sequencing process
+
+    Parameters
+    ----------
+    process : labman.db.process.SequencingProcess
+        The sequencing process
+    size : int, optional
+        The minimum size of the chunks, except the last one.
+        Default: DOWNLOAD_CHUNK_SIZE
+
+    Returns
+    -------
+    generator of bytes
+        The consecutive chunks of the zip file
+    """
+    zf = ZipStreamWriter()
+    studies = process.iter_prep_information()
+    try:
+        for study, lines in studies:
+            zf.start_entry('PrepSheet_process_%s_study_%s.csv' % (process.id,
+                                                                  study.id))
+            for line in lines:
+                zf.write(line.encode('utf-8'))
+                if zf.buffered >= size:
+                    yield zf.pop()
+    finally:
+        # Closes the database cursor if the zip file is not completed
+        studies.close()
+    zf.close()
+    yield zf.pop()
+
+
+def download_preparation_sheets_get_request(process_id):
+    """Starts the generation of the zip file with the prep sheets
+
+    Parameters
+    ----------
+    process_id : int
+        The sequencing process id
+
+    Returns
+    -------
+    (str, generator of bytes)
+        The file name and the generator of the contents of the zip file
+    """
+    process = SequencingProcess(int(process_id))
+    zip_name = (re.sub('[^0-9a-zA-Z\-\_]+', '_', process.run_name) +
+                '_PrepSheets.zip')
+    return zip_name, iter_preparation_sheets_zip(process, DOWNLOAD_CHUNK_SIZE)
+
+
 class DownloadSampleSheetHandler(BaseHandler):
     @authenticated
+    @coroutine
     def get(self, process_id):
-        process = SequencingProcess(int(process_id))
-        text = process.generate_sample_sheet()
-
-        filename = 'SampleSheet_%s_%s.csv' % (
-            re.sub('[^0-9a-zA-Z\-\_]+', '_', process.run_name), process.id)
+        filename, chunks = yield self.run_in_executor(
+            download_sample_sheet_get_request, process_id)
 
         self.set_header('Content-Type', 'text/csv')
         self.set_header('Expires', '0')
         self.set_header('Cache-Control', 'no-cache')
         self.set_header('Content-Disposition',
                         'attachment; filename=%s' % filename)
-        self.write(text)
+        # The sample sheet is generated in a single executor call and sent
+        # in chunks, so the whole sample sheet is never built as a single
+        # string
+        yield self.write_from_executor(chunks)
         self.finish()
 
 
 class DownloadPreparationSheetsHandler(BaseHandler):
     @authenticated
+    @coroutine
     def get(self, process_id):
-        process = SequencingProcess(int(process_id))
-
-        with BytesIO() as content:
-
-            with zipfile.ZipFile(content, mode='w',
-                                 compression=zipfile.ZIP_DEFLATED) as zf:
-                for study, prep in process.generate_prep_information().items():
-                    name = 'PrepSheet_process_%s_study_%s.csv' % (process.id,
-                                                                  study.id)
-                    zf.writestr(name, prep)
-
-            zip_name = (re.sub('[^0-9a-zA-Z\-\_]+', '_', process.run_name) +
-                        '_PrepSheets.zip')
-
-            self.set_header('Content-Type', 'application/zip')
-            self.set_header('Expires', '0')
-            self.set_header('Cache-Control', 'no-cache')
-            self.set_header("Content-Disposition", "attachment; filename=%s" %
-                            zip_name)
-
-            self.write(content.getvalue())
+        zip_name, chunks = yield self.run_in_executor(
+            download_preparation_sheets_get_request, process_id)
 
+        self.set_header('Content-Type', 'application/zip')
+        self.set_header('Expires', '0')
+        self.set_header('Cache-Control', 'no-cache')
+        self.set_header("Content-Disposition", "attachment; filename=%s" %
+                        zip_name)
+        # The prep sheets are read from the database with a cursor while the
+        # zip file is sent, so the whole zip file is generated in a single
+        # executor call, on a single transaction
+        yield self.write_from_executor(chunks)
         self.finish()
@@ -6,6 +6,7 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from json import dumps
 from unittest import main
 
 from tornado.web import HTTPError
@@ -136,6 +137,34 @@ class TestSamplePlatingProcessHandlers(TestHandlerBase):
                           'previous_plates': [],
                           'sample_ok': True})
 
+    def test_post_sample_plating_process_wells_handler(self):
+        data = {'wells': dumps([[8, 1, '1.SKM8.640201'],
+                                [8, 2, 'Unknown.sample']])}
+        response = self.post('/process/sample_plating/10/wells', data)
+        self.assertEqual(response.code, 200)
+        self.assertEqual(SampleComposition(85).sample_id, '1.SKM8.640201')
+        self.assertEqual(
+            json_decode(response.body),
+            {'wells': [{'row': 8, 'col': 1, 'sample_id': '1.SKM8.640201',
+                        'sample_ok': True, 'previous_plates': []},
+                       {'row': 8, 'col': 2, 'sample_id': 'Unknown.sample',
+                        'sample_ok': False, 'previous_plates': []}]})
+
+        # Well not in the plate
+        data = {'wells': dumps([[9, 1, '1.SKM8.640201']])}
+        response = self.post('/process/sample_plating/10/wells', data)
+        self.assertEqual(response.code, 400)
+
+        # Malformed wells
+        data = {'wells': dumps([[8, 1]])}
+        response = self.post('/process/sample_plating/10/wells', data)
+        self.assertEqual(response.code, 400)
+
+        # Unknown process
+        data = {'wells': dumps([[8, 1, '1.SKM8.640201']])}
+        response = self.post('/process/sample_plating/10000/wells', data)
+        self.assertEqual(response.code, 404)
+
 
 if __name__ == '__main__':
     main()
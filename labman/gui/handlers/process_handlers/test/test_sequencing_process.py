@@ -10,9 +10,17 @@ import zipfile
 
 from io import BytesIO
 from unittest import main
+from mock import patch
 from tornado.escape import json_encode, json_decode
+from tornado.web import RequestHandler
 
 from labman.gui.testing import TestHandlerBase
+from labman.db.process import SequencingProcess
+from labman.db.study import Study
+from labman.gui.handlers.process_handlers import sequencing_process
+from labman.gui.handlers.process_handlers.sequencing_process import (
+    read_chunk, iter_chunks, iter_preparation_sheets_zip,
+    DownloadPreparationSheetsHandler)
 
 
 class TestSequencingProcessHandler(TestHandlerBase):
@@ -38,6 +46,34 @@ class TestSequencingProcessHandler(TestHandlerBase):
         self.assertEqual(response.code, 200)
         self.assertTrue(response.body.startswith(b'# PI,Dude,test@foo.bar\n'))
 
+        # Shotgun run, sent in chunks
+        response = self.get('/process/sequencing/2/sample_sheet')
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers['Content-Disposition'],
+                         'attachment; filename='
+                         'SampleSheet_TestShotgunRun1_2.csv')
+        self.assertEqual(response.body.decode('utf-8'),
+                         SequencingProcess(2).generate_sample_sheet())
+
+    def test_read_chunk(self):
+        chunks = iter(['a', 'bc', 'def', 'g'])
+        self.assertEqual(read_chunk(chunks, size=3), 'abc')
+        self.assertEqual(read_chunk(chunks, size=3), 'def')
+        self.assertEqual(read_chunk(chunks, size=3), 'g')
+        self.assertEqual(read_chunk(chunks, size=3), '')
+
+    def test_iter_chunks(self):
+        chunks = (c for c in ['a', 'bc', 'def', 'g'])
+        self.assertEqual(list(iter_chunks(chunks, size=3)),
+                         ['abc', 'def', 'g'])
+
+        # Closing the result closes the chunks
+        chunks = (c for c in ['a', 'bc', 'def', 'g'])
+        obs = iter_chunks(chunks, size=3)
+        self.assertEqual(next(obs), 'abc')
+        obs.close()
+        self.assertEqual(list(chunks), [])
+
     def test_get_download_preparation_sheet_handler(self):
         response = self.get('/process/sequencing/1/preparation_sheets')
         self.assertNotEqual(response.body, '')
@@ -50,8 +86,41 @@ class TestSequencingProcessHandler(TestHandlerBase):
                          'attachment; filename=Test_Run_1_PrepSheets.zip')
 
         archive = zipfile.ZipFile(BytesIO(response.body), 'r')
+        self.assertIsNone(archive.testzip())
         contents = archive.open('PrepSheet_process_1_study_1.csv').read()
         self.assertNotEqual(contents, '')
+        self.assertEqual(
+            contents.decode('utf-8'),
+            SequencingProcess(1).generate_prep_information()[Study(1)])
+
+    def test_get_download_preparation_sheet_handler_chunks(self):
+        # Small chunks, so the zip file is sent in several chunks
+        with patch.object(sequencing_process, 'DOWNLOAD_CHUNK_SIZE', 1024), \
+                patch.object(DownloadPreparationSheetsHandler, 'flush',
+                             autospec=True,
+                             side_effect=RequestHandler.flush) as flush:
+            response = self.get('/process/sequencing/2/preparation_sheets')
+        self.assertEqual(response.code, 200)
+        self.assertGreater(flush.call_count, 1)
+
+        archive = zipfile.ZipFile(BytesIO(response.body), 'r')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(),
+                         ['PrepSheet_process_2_study_1.csv'])
+        self.assertEqual(
+            archive.read('PrepSheet_process_2_study_1.csv').decode('utf-8'),
+            SequencingProcess(2).generate_prep_information()[Study(1)])
+
+    def test_iter_preparation_sheets_zip(self):
+        chunks = list(iter_preparation_sheets_zip(SequencingProcess(2),
+                                                  size=1024))
+        self.assertGreater(len(chunks), 1)
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)), 'r')
+        self.assertEqual(archive.namelist(),
+                         ['PrepSheet_process_2_study_1.csv'])
+        self.assertEqual(
+            archive.read('PrepSheet_process_2_study_1.csv').decode('utf-8'),
+            SequencingProcess(2).generate_prep_information()[Study(1)])
 
 
 if __name__ == '__main__':
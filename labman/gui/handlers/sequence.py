@@ -21,11 +21,19 @@ class SequenceRunListingHandler(BaseHandler):
 class SequenceRunListHandler(BaseHandler):
     @authenticated
     def get(self):
-        res = {"data": [[p['process_id'],
-                         p['run_name'],
-                         p['experiment'],
-                         p['assay'],
-                         p['principal_investigator'],
-                         p['sequencing_process_id']]
-                        for p in SequencingProcess.list_sequencing_runs()]}
-        self.write(res)
+        # Columns of the table in the sequence run list page
+        page_args = self.get_list_page_arguments(
+            ['process_id', 'run_name', 'experiment', 'assay',
+             'principal_investigator', None, None])
+        runs = SequencingProcess.list_sequencing_runs(**(page_args or {}))
+        data = [[p['process_id'],
+                 p['run_name'],
+                 p['experiment'],
+                 p['assay'],
+                 p['principal_investigator'],
+                 p['sequencing_process_id']]
+                for p in runs]
+        if page_args is None:
+            self.write({"data": data})
+        else:
+            self.write_list_page(runs, data, 'process_id', page_args)
@@ -23,11 +23,17 @@ class StudyListingHandler(BaseHandler):
 class StudyListHandler(BaseHandler):
     @authenticated
     def get(self):
-        # Get all arguments that DataTables send us
-        res = {"data": [
-            [s['study_id'], s['study_title'], s['study_alias'], s['owner'],
-             s['num_samples']] for s in Study.list_studies()]}
-        self.write(res)
+        # Get all arguments that DataTables send us. The columns are the
+        # ones of the table in the study list page
+        page_args = self.get_list_page_arguments(
+            [None, 'study_id', 'study_title', 'owner', None])
+        studies = Study.list_studies(**(page_args or {}))
+        data = [[s['study_id'], s['study_title'], s['study_alias'],
+                 s['owner'], s['num_samples']] for s in studies]
+        if page_args is None:
+            self.write({"data": data})
+        else:
+            self.write_list_page(studies, data, 'study_id', page_args)
         self.finish()
 
 
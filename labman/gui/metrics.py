@@ -0,0 +1,149 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from bisect import bisect_left
+from threading import Lock
+
+
+# Buckets of the request and database duration histograms, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                    10.0, 30.0)
+# Buckets of the histogram of the number of queries per request
+QUERIES_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram(object):
+    """Cumulative histogram in the Prometheus style
+
+    Parameters
+    ----------
+    buckets : tuple of float
+        The upper bounds of the buckets, sorted. The +Inf bucket is implicit
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Adds a value to the histogram
+
+        Parameters
+        ----------
+        value : float
+            The value to add
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Returns the number of values less or equal than each bucket bound
+
+        Returns
+        -------
+        list of (str, int)
+            The bucket bound, formatted for Prometheus, and the count
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+
+def _escape_label(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+class MetricsRegistry(object):
+    """Aggregates the performance metrics of the requests of the process
+
+    The metrics are aggregated per route pattern (as defined in
+    `labman.gui.webserver.Application`), HTTP method and status code. Each
+    webserver process has its own registry.
+    """
+    _METRICS = (
+        ('labman_request_duration_seconds', 'duration',
+         'Wall time spent serving the request', DURATION_BUCKETS),
+        ('labman_request_db_duration_seconds', 'db_time',
+         'Time spent executing database queries during the request',
+         DURATION_BUCKETS),
+        ('labman_request_queries', 'queries',
+         'Number of database queries executed during the request',
+         QUERIES_BUCKETS))
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """Removes all the observed values"""
+        with self._lock:
+            self._histograms = {name: {} for name, _, _, _ in self._METRICS}
+
+    def observe_request(self, route, method, status, duration, db_time,
+                        queries):
+        """Adds the metrics of a request
+
+        Parameters
+        ----------
+        route : str
+            The route pattern that served the request
+        method : str
+            The HTTP method of the request
+        status : int
+            The HTTP status of the response
+        duration : float
+            The wall time spent serving the request, in seconds
+        db_time : float
+            The time spent executing database queries, in seconds
+        queries : int
+            The number of database queries executed
+        """
+        values = {'duration': duration, 'db_time': db_time,
+                  'queries': queries}
+        labels = (route, method, status)
+        with self._lock:
+            for name, key, _, buckets in self._METRICS:
+                hist = self._histograms[name].get(labels)
+                if hist is None:
+                    hist = self._histograms[name][labels] = Histogram(buckets)
+                hist.observe(values[key])
+
+    def render(self):
+        """Returns the metrics in the Prometheus text exposition format
+
+        Returns
+        -------
+        str
+            The metrics
+        """
+        lines = []
+        with self._lock:
+            for name, _, description, _ in self._METRICS:
+                lines.append('# HELP %s %s' % (name, description))
+                lines.append('# TYPE %s histogram' % name)
+                for labels, hist in sorted(self._histograms[name].items()):
+                    label_str = 'route="%s",method="%s",status="%s"' % tuple(
+                        _escape_label(label) for label in labels)
+                    for bound, count in hist.cumulative_counts():
+                        lines.append('%s_bucket{%s,le="%s"} %d'
+                                     % (name, label_str, bound, count))
+                    lines.append('%s_sum{%s} %s' % (name, label_str,
+                                                    repr(float(hist.sum))))
+                    lines.append('%s_count{%s} %d' % (name, label_str,
+                                                      hist.count))
+        return '\n'.join(lines) + '\n'
+
+
+# Singleton pattern, create the metrics registry for the entire process
+METRICS = MetricsRegistry()
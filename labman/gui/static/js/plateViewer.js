@@ -228,32 +228,14 @@ PlateViewer.prototype.initialize = function (rows, cols) {
   this.grid.setSelectionModel(new Slick.CellSelectionModel({selectActiveCell: false}));
   this.grid.registerPlugin(new Slick.CellExternalCopyManager(pluginOptions));
 
-  // When a cell changes, update the server with the new cell information
+  // When a cell changes, update the server with the new cell information.
+  // The changes done at once (e.g. pasting a range of cells) are sent to
+  // the server in a single request
+  this._pendingWells = [];
   this.grid.onCellChange.subscribe(function(e, args) {
-    var row = args.row;
-    var col = args.cell;
-    var content = args.item[col];
-
-    if (that.plateId == null) {
-      // This is a new plate, we need to create the plate
-      var plateName = $('#newNameInput').val().trim();
-      var plateConf = $('#plate-conf-select option:selected').val();
-      $.post('/process/sample_plating', {'plate_name': plateName, 'plate_configuration': plateConf}, function (data) {
-        that.plateId = data['plate_id'];
-        that.processId = data['process_id'];
-        $('#plateName').prop('pm-data-plate-id', that.plateId);
-        $('#plateName').prop('pm-data-process-id', that.processId);
-        // Once the plate has been created, we can disable the plate config select
-        $('#plate-conf-select').prop('disabled', true);
-        // The plate has been created, plate the sample
-        that.modifyWell(row, col, content);
-      })
-        .fail(function (jqXHR, textStatus, errorThrown) {
-          bootstrapAlert(jqXHR.responseText, 'danger');
-        });
-    } else {
-      // The plate already exists, simply plate the sample
-      that.modifyWell(row, col, content);
+    that._pendingWells.push([args.row, args.cell, args.item[args.cell]]);
+    if (that._pendingWells.length === 1) {
+      setTimeout(function() { that.flushWellChanges(); }, 0);
     }
   });
 
@@ -343,6 +325,82 @@ PlateViewer.prototype.loadPlateLayout = function () {
     });
 };
 
+/**
+ *
+ * Sends the pending well changes to the server, creating the plate first if
+ * it doesn't exist yet
+ *
+ **/
+PlateViewer.prototype.flushWellChanges = function () {
+  var that = this;
+  var wells = this._pendingWells;
+  this._pendingWells = [];
+  if (wells.length === 0) {
+    return;
+  }
+
+  if (this.plateId == null) {
+    // This is a new plate, we need to create the plate
+    var plateName = $('#newNameInput').val().trim();
+    var plateConf = $('#plate-conf-select option:selected').val();
+    $.post('/process/sample_plating', {'plate_name': plateName, 'plate_configuration': plateConf}, function (data) {
+      that.plateId = data['plate_id'];
+      that.processId = data['process_id'];
+      $('#plateName').prop('pm-data-plate-id', that.plateId);
+      $('#plateName').prop('pm-data-process-id', that.processId);
+      // Once the plate has been created, we can disable the plate config select
+      $('#plate-conf-select').prop('disabled', true);
+      // The plate has been created, plate the samples
+      that.modifyWells(wells);
+    })
+      .fail(function (jqXHR, textStatus, errorThrown) {
+        bootstrapAlert(jqXHR.responseText, 'danger');
+      });
+  } else {
+    // The plate already exists, simply plate the samples
+    this.modifyWells(wells);
+  }
+};
+
+/**
+ *
+ * Modify the contents of several wells in a single request
+ *
+ * @param {Array} wells The [row, column, content] of the wells being modified
+ *
+ **/
+PlateViewer.prototype.modifyWells = function (wells) {
+  var that = this;
+  if (wells.length === 1) {
+    this.modifyWell(wells[0][0], wells[0][1], wells[0][2]);
+    return;
+  }
+  var data = [];
+  for (var well of wells) {
+    data.push([well[0] + 1, well[1] + 1, well[2]]);
+  }
+  $.post('/process/sample_plating/' + this.processId + '/wells', {'wells': JSON.stringify(data)}, function (data) {
+    for (var well of data['wells']) {
+      var row = well['row'] - 1;
+      var col = well['col'] - 1;
+      that.data[row][that.grid.getColumns()[col].field] = well['sample_id'];
+      if (well['previous_plates'].length > 0) {
+        that.wellPreviousPlates[row][col] = well['previous_plates'];
+        addIfNotPresent(that.wellClasses[row][col], 'well-prev-plated');
+      } else {
+        safeArrayDelete(that.wellClasses[row][col], 'well-prev-plated');
+        that.wellPreviousPlates[row][col] = null;
+      }
+    }
+    that.updateDuplicates();
+    that.updateUnknown();
+    that.updateAllRows();
+  })
+    .fail(function (jqXHR, textStatus, errorThrown) {
+      bootstrapAlert(jqXHR.responseText, 'danger');
+    });
+};
+
 /**
  *
  * Modify the contents of a well
@@ -6,9 +6,21 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
-from unittest import main
+from unittest import main, TestCase
+
+from mock import patch
+from psycopg2.pool import PoolError
+from tornado.escape import json_decode
+from tornado.gen import coroutine
+from tornado.locks import Event
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, HTTPError
 
 from labman.gui.testing import TestHandlerBase
+from labman.gui.handlers.base import (
+    BaseHandler, get_executor, _run_with_transaction)
+from labman.db.settings import labman_settings
+from labman.db.sql_connection import TRN, POOL
 
 
 class TestIndexHandler(TestHandlerBase):
@@ -25,5 +37,109 @@ class TestNotFoundHandler(TestHandlerBase):
         self.assertIn(b'404: Page not found!', response.body)
 
 
+class TestExecutor(TestCase):
+    def test_get_executor(self):
+        obs = get_executor()
+        self.assertIs(get_executor(), obs)
+        self.assertEqual(obs._max_workers, labman_settings.workers)
+        # Each worker and the IOLoop thread can hold a connection at the
+        # same time
+        self.assertGreaterEqual(POOL.maxconn, obs._max_workers + 1)
+
+    def test_run_with_transaction(self):
+        def tester():
+            with TRN:
+                TRN.add("SELECT 42")
+                return TRN.current, TRN.execute_fetchlast()
+
+        transactions = []
+        trn, obs = get_executor().submit(
+            _run_with_transaction, transactions, tester).result()
+        self.assertEqual(obs, 42)
+        self.assertEqual(transactions, [trn])
+        self.assertIsNot(trn, TRN.current)
+        self.assertIsNone(trn._connection)
+        self.assertEqual(trn.query_count, 1)
+
+    def test_run_with_transaction_pool_exhausted(self):
+        def tester():
+            with TRN:
+                TRN.add("SELECT 42")
+                return TRN.execute_fetchlast()
+
+        with patch.object(POOL, 'getconn',
+                          side_effect=PoolError('connection pool exhausted')):
+            future = get_executor().submit(_run_with_transaction, [], tester)
+            with self.assertRaises(HTTPError) as ctx:
+                future.result()
+        self.assertEqual(ctx.exception.status_code, 503)
+
+
+class InterleavedHandler(BaseHandler):
+    """The first request resumes while the second one is waiting"""
+    events = {}
+
+    @coroutine
+    def get(self, name):
+        loop_transaction = TRN.current
+        executor_transaction = yield self.run_in_executor(
+            lambda: TRN.current)
+        if name == 'first':
+            self.events['second'].set()
+            yield self.events['first'].wait()
+        else:
+            yield self.events['second'].wait()
+            self.events['first'].set()
+            yield self.events['done'].wait()
+
+        with TRN:
+            TRN.add("SELECT 42")
+            value = TRN.execute_fetchlast()
+        self.write({'value': value,
+                    'same_loop_transaction': TRN.current is loop_transaction,
+                    'released': executor_transaction._connection is None,
+                    'shared': executor_transaction is loop_transaction})
+        self.events['done'].set()
+
+
+class StreamHandler(BaseHandler):
+    """Sends chunks generated inside a transaction"""
+    @coroutine
+    def get(self):
+        def chunks():
+            with TRN:
+                for i in range(5):
+                    TRN.add("SELECT %s", [i])
+                    yield b'%d\n' % TRN.execute_fetchlast()
+
+        yield self.write_from_executor(chunks(), max_pending=1)
+        self.finish()
+
+
+class TestTransactions(AsyncHTTPTestCase):
+    def get_app(self):
+        return Application([(r'/interleaved/(.*)', InterleavedHandler),
+                            (r'/stream', StreamHandler)])
+
+    def test_write_from_executor(self):
+        response = self.fetch('/stream')
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body, b'0\n1\n2\n3\n4\n')
+
+    @gen_test
+    def test_interleaved_requests(self):
+        InterleavedHandler.events = {
+            'first': Event(), 'second': Event(), 'done': Event()}
+        first = self.http_client.fetch(self.get_url('/interleaved/first'))
+        # The second request starts once the first one is waiting
+        yield InterleavedHandler.events['second'].wait()
+        second = self.http_client.fetch(self.get_url('/interleaved/second'))
+        for response in (yield [first, second]):
+            self.assertEqual(response.code, 200)
+            self.assertEqual(json_decode(response.body),
+                             {'value': 42, 'same_loop_transaction': True,
+                              'released': True, 'shared': False})
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,45 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import main
+
+from tornado.escape import json_decode
+
+from labman.gui.testing import TestHandlerBase
+from labman.db.instrumentation import QUERY_LOG
+
+
+class TestDebugQueriesHandler(TestHandlerBase):
+    def test_get(self):
+        QUERY_LOG.reset()
+        response = self.get('/plate/21/')
+        self.assertEqual(response.code, 200)
+
+        response = self.get('/debug/queries')
+        self.assertEqual(response.code, 200)
+        self.assertNotEqual(response.body, '')
+
+        response = self.get('/debug/queries?format=json')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        self.assertTrue(obs['enabled'])
+        self.assertGreater(len(obs['call_sites']), 0)
+        self.assertGreater(len(obs['requests']), 0)
+        self.assertEqual(obs['requests'][-1]['path'], '/plate/21/')
+        self.assertGreater(obs['requests'][-1]['queries'], 0)
+
+    def test_post(self):
+        response = self.post('/debug/queries', {})
+        self.assertEqual(response.code, 200)
+        obs = QUERY_LOG.summary()
+        self.assertEqual(obs['queries'], [])
+        self.assertEqual(obs['call_sites'], [])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import main, TestCase
+
+from labman.gui.testing import TestHandlerBase
+from labman.gui.metrics import Histogram, MetricsRegistry, METRICS
+
+
+class TestHistogram(TestCase):
+    def test_observe(self):
+        hist = Histogram((1, 5, 10))
+        for value in (0.5, 1, 3, 7, 20):
+            hist.observe(value)
+        self.assertEqual(hist.count, 5)
+        self.assertEqual(hist.sum, 31.5)
+        self.assertEqual(hist.cumulative_counts(),
+                         [('1', 2), ('5', 3), ('10', 4), ('+Inf', 5)])
+
+
+class TestMetricsRegistry(TestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.observe_request('/plate/(.*)/', 'GET', 200, 0.02, 0.01, 12)
+        registry.observe_request('/plate/(.*)/', 'GET', 200, 0.2, 0.1, 12)
+        obs = registry.render().splitlines()
+        self.assertIn('# TYPE labman_request_duration_seconds histogram',
+                      obs)
+        self.assertIn('labman_request_duration_seconds_bucket{route="/plate/'
+                      '(.*)/",method="GET",status="200",le="0.025"} 1', obs)
+        self.assertIn('labman_request_duration_seconds_bucket{route="/plate/'
+                      '(.*)/",method="GET",status="200",le="+Inf"} 2', obs)
+        self.assertIn('labman_request_duration_seconds_count{route="/plate/'
+                      '(.*)/",method="GET",status="200"} 2', obs)
+        self.assertIn('labman_request_queries_bucket{route="/plate/(.*)/",'
+                      'method="GET",status="200",le="25"} 2', obs)
+
+        registry.reset()
+        self.assertNotIn('labman_request_queries_count',
+                         registry.render())
+
+
+class TestMetricsHandler(TestHandlerBase):
+    def test_server_timing(self):
+        response = self.get('/plate/21/')
+        self.assertEqual(response.code, 200)
+        obs = response.headers['Server-Timing']
+        self.assertRegex(obs, r'^total;dur=[0-9.]+, db;dur=[0-9.]+, '
+                              r'queries;desc="[0-9]+"$')
+
+    def test_get(self):
+        METRICS.reset()
+        self.get('/plate/21/')
+        response = self.get('/metrics')
+        self.assertEqual(response.code, 200)
+        obs = response.body.decode('utf-8')
+        self.assertIn('labman_request_duration_seconds_count{route="/plate/'
+                      '(.*)/",method="GET",status="200"} 1', obs)
+
+
+if __name__ == '__main__':
+    main()
@@ -182,6 +182,37 @@ class TestPlateHandlers(TestHandlerBase):
             [[24, 'Test compressed gDNA plate 1',
               ['Identification of the Microbiomes for Cannabis Soils']]])
 
+    def test_get_plate_list_handler_server_side(self):
+        response = self.get(
+            '/plate_list?draw=3&start=0&length=2&search%5Bvalue%5D=&'
+            'order%5B0%5D%5Bcolumn%5D=1&order%5B0%5D%5Bdir%5D=asc')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        self.assertEqual(obs['draw'], 3)
+        self.assertEqual(obs['recordsTotal'], 26)
+        self.assertEqual(obs['recordsFiltered'], 26)
+        self.assertEqual(obs['data'],
+                         [[1, 'EMP 16S V4 primer plate 1', None],
+                          [2, 'EMP 16S V4 primer plate 2', None]])
+        self.assertEqual(obs['next'], [2, 2])
+
+        response = self.get(
+            '/plate_list?draw=4&start=0&length=2&search%5Bvalue%5D=test+pl&'
+            'order%5B0%5D%5Bcolumn%5D=2&order%5B0%5D%5Bdir%5D=desc&'
+            'plate_type=%5B%22sample%22%5D')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        self.assertEqual(obs['recordsTotal'], 1)
+        self.assertEqual(obs['recordsFiltered'], 1)
+        self.assertEqual(
+            obs['data'], [[21, 'Test plate 1',
+                           ['Identification of the Microbiomes for '
+                            'Cannabis Soils']]])
+        self.assertIsNone(obs['next'])
+
+        response = self.get('/plate_list?draw=1&start=foo')
+        self.assertEqual(response.code, 400)
+
     def test_get_plate_map_handler(self):
         response = self.get('/plate')
         self.assertEqual(response.code, 200)
@@ -300,6 +331,26 @@ class TestPlateHandlers(TestHandlerBase):
         response = self.get('/plate/100/')
         self.assertEqual(response.code, 404)
 
+    def test_get_plate_handler_etag(self):
+        response = self.get('/plate/21/')
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        etag = response.headers['Etag']
+
+        # The plate has not changed
+        response = self.get('/plate/21/', headers={'If-None-Match': etag})
+        self.assertEqual(response.code, 304)
+        self.assertEqual(response.body, b'')
+
+        # The plate has changed
+        tester = Plate(21)
+        tester.notes = 'New notes'
+        response = self.get('/plate/21/', headers={'If-None-Match': etag})
+        self.assertEqual(response.code, 200)
+        self.assertNotEqual(response.headers['Etag'], etag)
+        self.assertEqual(json_decode(response.body)['notes'], 'New notes')
+        tester.notes = None
+
     def test_patch_plate_handler(self):
         tester = Plate(21)
         data = {'op': 'replace', 'path': '/name/', 'value': 'NewName'}
@@ -432,6 +483,22 @@ class TestPlateHandlers(TestHandlerBase):
         self.assertEqual(len(obs_data), 1)
         self.assertEqual(obs_data[0], [23, 'Test 16S plate 1'])
 
+        # Test search by part of the sample ids, paginated
+        post_data = {
+            'sample_names': dumps(['SKB1']),
+            'plate_comment_keywords': '',
+            'well_comment_keywords': "write",
+            'operation': "UNION",
+            'partial_sample_match': 'true',
+            'limit': '1'
+        }
+        response = self.post('/plate_search', post_data)
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        self.assertCountEqual(obs.keys(), ['data', 'recordsTotal'])
+        self.assertEqual(len(obs['data']), 1)
+        self.assertEqual(obs['recordsTotal'], 2)
+
     def test_get_plate_process_handler(self):
         response = self.get('/plate/21/process')
         self.assertEqual(response.code, 200)
@@ -23,6 +23,37 @@ class TestStudyHandlers(TestHandlerBase):
              'Cannabis Soils', 'test@foo.bar', 27]]}
         self.assertEqual(obs, exp)
 
+    def test_get_study_list_handler_server_side(self):
+        response = self.get(
+            '/study_list?draw=1&start=0&length=10&search%5Bvalue%5D=soils&'
+            'order%5B0%5D%5Bcolumn%5D=2&order%5B0%5D%5Bdir%5D=asc')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        exp = {'draw': 1, 'recordsTotal': 1, 'recordsFiltered': 1,
+               'data': [
+                   [1, 'Identification of the Microbiomes for Cannabis Soils',
+                    'Cannabis Soils', 'test@foo.bar', 27]],
+               'next': None}
+        self.assertEqual(obs, exp)
+
+        response = self.get(
+            '/study_list?draw=2&start=0&length=10&search%5Bvalue%5D=foo')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        exp = {'draw': 2, 'recordsTotal': 1, 'recordsFiltered': 1,
+               'data': [
+                   [1, 'Identification of the Microbiomes for Cannabis Soils',
+                    'Cannabis Soils', 'test@foo.bar', 27]],
+               'next': None}
+        self.assertEqual(obs, exp)
+
+        response = self.get(
+            '/study_list?draw=3&start=0&length=10&search%5Bvalue%5D=Qiita')
+        self.assertEqual(response.code, 200)
+        obs = json_decode(response.body)
+        self.assertEqual(obs['recordsFiltered'], 0)
+        self.assertEqual(obs['data'], [])
+
     def test_get_study_handler(self):
         response = self.get('/study/1/')
         self.assertEqual(response.code, 200)
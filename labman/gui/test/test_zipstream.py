@@ -0,0 +1,58 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import zipfile
+from io import BytesIO
+from unittest import main, TestCase
+
+from labman.gui.zipstream import ZipStreamWriter
+
+
+class TestZipStreamWriter(TestCase):
+    def test_write(self):
+        writer = ZipStreamWriter()
+        with self.assertRaises(ValueError):
+            writer.write(b'No file')
+
+        chunks = []
+        writer.start_entry('first.csv')
+        for i in range(1000):
+            writer.write(b'sample_%d\tA1\n' % i)
+        self.assertEqual(writer.buffered, sum(len(c) for c in writer._buffer))
+        chunks.append(writer.pop())
+        self.assertEqual(writer.buffered, 0)
+        self.assertEqual(writer.pop(), b'')
+
+        # Starting a file ends the previous one
+        writer.start_entry('second.csv')
+        writer.write(b'sample_name\n')
+        writer.start_entry('empty.csv')
+        writer.close()
+        chunks.append(writer.pop())
+        with self.assertRaises(ValueError):
+            writer.start_entry('closed.csv')
+
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(),
+                         ['first.csv', 'second.csv', 'empty.csv'])
+        self.assertEqual(
+            archive.read('first.csv'),
+            b''.join(b'sample_%d\tA1\n' % i for i in range(1000)))
+        self.assertEqual(archive.read('second.csv'), b'sample_name\n')
+        self.assertEqual(archive.read('empty.csv'), b'')
+
+    def test_close_empty(self):
+        writer = ZipStreamWriter()
+        writer.close()
+        archive = zipfile.ZipFile(BytesIO(writer.pop()))
+        self.assertEqual(archive.namelist(), [])
+
+
+if __name__ == '__main__':
+    main()
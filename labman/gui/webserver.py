@@ -7,11 +7,10 @@
 # ----------------------------------------------------------------------------
 
 from os.path import dirname, join
-from base64 import b64encode
-from uuid import uuid4
 
 import tornado
 
+from labman.db.settings import labman_settings
 from labman.gui.handlers.base import IndexHandler, NotFoundHandler
 from labman.gui.handlers.auth import LoginHandler, LogoutHandler, AccessHandler
 from labman.gui.handlers.plate import (
@@ -27,12 +26,22 @@ from labman.gui.handlers.sequence import (
     SequenceRunListingHandler, SequenceRunListHandler)
 from labman.gui.handlers.sample import (
     ControlSamplesHandler, ManageControlsHandler)
+from labman.gui.handlers.debug import DebugQueriesHandler, MetricsHandler
 from labman.gui.handlers.process_handlers import PROCESS_ENDPOINTS
 from labman.gui.handlers.composition_handlers import COMPOSITION_ENDPOINTS
 
 
 class Application(tornado.web.Application):
-    def __init__(self):
+    """The labman web application
+
+    Parameters
+    ----------
+    debug : bool, optional
+        Whether to run the application in debug mode, which reloads the
+        application when the code changes. It should be False when running the
+        webserver in multiple processes. Default: True
+    """
+    def __init__(self, debug=True):
         # Get the path to the folder that contain the templates and the static
         # files (such as images, css and js)
         dirpath = dirname(__file__)
@@ -70,7 +79,10 @@ class Application(tornado.web.Application):
                     (r"/study/([0-9]+)/summary", StudySummaryHandler),
                     # Sample handlers
                     (r"/sample/control", ControlSamplesHandler),
-                    (r"/sample/manage_controls", ManageControlsHandler)]
+                    (r"/sample/manage_controls", ManageControlsHandler),
+                    # Debug handlers
+                    (r"/debug/queries", DebugQueriesHandler),
+                    (r"/metrics", MetricsHandler)]
 
         # Add the process endpoints
         handlers.extend(PROCESS_ENDPOINTS)
@@ -81,15 +93,20 @@ class Application(tornado.web.Application):
         # Add the not found handler - it should always be the last one
         handlers.append((r".*", NotFoundHandler))
 
+        # The request metrics are aggregated by the route pattern of the
+        # handler that served the request
+        route_patterns = {}
+        for spec in handlers:
+            route_patterns.setdefault(spec[1], spec[0])
+
         settings = {
             "template_path": templates_path,
-            # Currently setting debug to True, this can be changed to be
-            # sourced from a config file
-            "debug": True,
-            # We are generating the cookie_secret every time that the webserver
-            # is being reloaded, this can be sourced from the config file so
-            # webserver reboots doesn't log out the users
-            "cookie_secret": b64encode(uuid4().bytes + uuid4().bytes),
-            "login_url": "/auth/login/"
+            "debug": debug,
+            # The cookie_secret is sourced from the config file, so all the
+            # webserver processes share it and the users are not logged out
+            # when the webserver is restarted
+            "cookie_secret": labman_settings.cookie_secret,
+            "login_url": "/auth/login/",
+            "route_patterns": route_patterns
         }
         tornado.web.Application.__init__(self, handlers, **settings)
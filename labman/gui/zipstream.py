@@ -0,0 +1,158 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2017-, labman development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import struct
+import zlib
+from time import localtime
+
+
+# Signatures of the zip file records
+_LOCAL_HEADER = 0x04034b50
+_DATA_DESCRIPTOR = 0x08074b50
+_CENTRAL_HEADER = 0x02014b50
+_END_OF_CENTRAL_DIR = 0x06054b50
+# The sizes and CRC of the entries follow their data (bit 3) and the names
+# are encoded in UTF-8 (bit 11)
+_FLAGS = 0x0808
+_VERSION = 20
+_DEFLATED = 8
+
+
+def _dos_date_time(timestamp):
+    """Returns the date and time in the MS-DOS format used by zip files"""
+    date = ((timestamp.tm_year - 1980) << 9 | timestamp.tm_mon << 5 |
+            timestamp.tm_mday)
+    time = (timestamp.tm_hour << 11 | timestamp.tm_min << 5 |
+            timestamp.tm_sec // 2)
+    return date, time
+
+
+class ZipStreamWriter(object):
+    """Writes a zip file sequentially, so it can be sent while generated
+
+    The entries are compressed with deflate, and their sizes and CRC are
+    written after their data, so the zip file is written without seeking.
+    The bytes of the zip file are buffered until they are retrieved with
+    `pop`. The entries and the zip file can not be larger than 4GB.
+
+    Attributes
+    ----------
+    buffered
+    """
+    def __init__(self):
+        self._buffer = []
+        self._buffered = 0
+        self._offset = 0
+        self._entries = []
+        self._current = None
+        self._closed = False
+
+    @property
+    def buffered(self):
+        """The number of bytes written and not retrieved yet"""
+        return self._buffered
+
+    def _write(self, data):
+        self._buffer.append(data)
+        self._buffered += len(data)
+        self._offset += len(data)
+
+    def start_entry(self, name):
+        """Starts a new file in the zip file, ending the current one
+
+        Parameters
+        ----------
+        name : str
+            The name of the file
+
+        Raises
+        ------
+        ValueError
+            If the zip file is closed
+        """
+        if self._closed:
+            raise ValueError('The zip file is closed')
+        if self._current is not None:
+            self.end_entry()
+
+        name = name.encode('utf-8')
+        date, time = _dos_date_time(localtime())
+        self._current = {'name': name, 'date': date, 'time': time,
+                         'offset': self._offset, 'crc': 0, 'size': 0,
+                         'compressed_size': 0,
+                         'compressor': zlib.compressobj(
+                            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)}
+        self._write(struct.pack(
+            '<IHHHHHIIIHH', _LOCAL_HEADER, _VERSION, _FLAGS, _DEFLATED, time,
+            date, 0, 0, 0, len(name), 0) + name)
+
+    def write(self, data):
+        """Adds data to the current file of the zip file
+
+        Parameters
+        ----------
+        data : bytes
+            The data to add
+
+        Raises
+        ------
+        ValueError
+            If no file has been started
+        """
+        if self._current is None:
+            raise ValueError('No file has been started in the zip file')
+        entry = self._current
+        entry['crc'] = zlib.crc32(data, entry['crc'])
+        entry['size'] += len(data)
+        compressed = entry['compressor'].compress(data)
+        if compressed:
+            entry['compressed_size'] += len(compressed)
+            self._write(compressed)
+
+    def end_entry(self):
+        """Ends the current file of the zip file"""
+        entry = self._current
+        if entry is None:
+            return
+        compressed = entry.pop('compressor').flush()
+        entry['compressed_size'] += len(compressed)
+        self._write(compressed)
+        self._write(struct.pack('<IIII', _DATA_DESCRIPTOR, entry['crc'],
+                                entry['compressed_size'], entry['size']))
+        self._entries.append(entry)
+        self._current = None
+
+    def close(self):
+        """Ends the zip file, writing its central directory"""
+        if self._closed:
+            return
+        self.end_entry()
+        start = self._offset
+        for entry in self._entries:
+            self._write(struct.pack(
+                '<IHHHHHHIIIHHHHHII', _CENTRAL_HEADER, _VERSION, _VERSION,
+                _FLAGS, _DEFLATED, entry['time'], entry['date'], entry['crc'],
+                entry['compressed_size'], entry['size'], len(entry['name']),
+                0, 0, 0, 0, 0o600 << 16, entry['offset']) + entry['name'])
+        self._write(struct.pack(
+            '<IHHHHIIH', _END_OF_CENTRAL_DIR, 0, 0, len(self._entries),
+            len(self._entries), self._offset - start, start, 0))
+        self._closed = True
+
+    def pop(self):
+        """Retrieves the bytes written since the last call
+
+        Returns
+        -------
+        bytes
+            The bytes of the zip file written since the last call
+        """
+        data = b''.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        return data